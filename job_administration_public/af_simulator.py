@@ -0,0 +1,138 @@
+import argparse
+import random
+import threading
+import time
+
+from flask import Flask, jsonify, render_template_string, request
+
+# --- Offline stand-in for the AF "Lägg till aktivitet" page ---
+# Serves the same element ids and labels as af_uploader.LOCATORS, with a delayed
+# job title suggestion list and a slow save, so the uploader can be tested and
+# benchmarked without BankID or the real portal.
+# Usage: python af_simulator.py [--port 5001] [--suggestion-delay 0.8] [--save-latency 0.5]
+# then: python af_uploader.py --jobs-file jobs.json --url http://127.0.0.1:5001/ --headless --no-login-prompt
+
+SUGGESTION_DELAY = 0.8   # seconds before suggestions appear (client side)
+SAVE_LATENCY = 0.5       # seconds the save request takes (server side)
+FAILURE_RATE = 0.0       # share of saves answered with an error
+
+PAGE = '''<!DOCTYPE html>
+<html lang="sv">
+<head><meta charset="UTF-8"><title>Lägg till aktivitet (simulator)</title></head>
+<body>
+    <h1>Aktivitetsrapportering (simulator)</h1>
+    <button type="button" id="open-form"><span>Sökta jobb</span></button>
+    <p id="saved-count">Sparade: 0</p>
+
+    <form id="soktjobb-form" style="display: none" onsubmit="return false;">
+        <label>Sökt tjänst <input id="soktjobb-soktTjanst" autocomplete="off"></label>
+        <ul role="listbox" id="suggestions"></ul>
+        <label>Arbetsgivare <input id="soktjobb-arbetsgivare"></label>
+        <label>Ort <input id="soktjobb-ort"></label>
+        <label>Datum <input id="soktjobb-aktivitetsdatum" value="{{ today }}"></label>
+        <button type="button" id="save"><span>Spara</span></button>
+        <p id="error" role="alert"></p>
+    </form>
+
+    <script>
+        const form = document.getElementById('soktjobb-form');
+        const role = document.getElementById('soktjobb-soktTjanst');
+        const list = document.getElementById('suggestions');
+        let suggestionTimer = null, highlighted = -1, saved = 0;
+
+        document.getElementById('open-form').onclick = () => {
+            form.reset();
+            list.innerHTML = '';
+            document.getElementById('error').textContent = '';
+            form.style.display = 'block';
+        };
+
+        // Suggestions appear {{ suggestion_delay }} s after the last keystroke, like the real autocomplete
+        role.addEventListener('input', () => {
+            clearTimeout(suggestionTimer);
+            list.innerHTML = '';
+            highlighted = -1;
+            suggestionTimer = setTimeout(() => {
+                const text = role.value.trim();
+                if (!text) return;
+                for (const suffix of ['', ' (junior)', ' (senior)']) {
+                    const li = document.createElement('li');
+                    li.setAttribute('role', 'option');
+                    li.textContent = text + suffix;
+                    list.appendChild(li);
+                }
+            }, {{ suggestion_delay * 1000 }});
+        });
+        role.addEventListener('keydown', (event) => {
+            const options = list.querySelectorAll('[role=option]');
+            if (event.key === 'ArrowDown' && options.length) {
+                highlighted = Math.min(highlighted + 1, options.length - 1);
+            } else if (event.key === 'Enter' && highlighted >= 0) {
+                role.value = options[highlighted].textContent;
+                list.innerHTML = '';
+            }
+        });
+
+        document.getElementById('save').onclick = async () => {
+            const response = await fetch('{{ url_for("save_activity") }}', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({
+                    job_tittle: role.value,
+                    company: document.getElementById('soktjobb-arbetsgivare').value,
+                    city: document.getElementById('soktjobb-ort').value,
+                    date_of_apply: document.getElementById('soktjobb-aktivitetsdatum').value
+                })
+            });
+            if (response.ok) {
+                saved += 1;
+                document.getElementById('saved-count').textContent = 'Sparade: ' + saved;
+                form.style.display = 'none';
+            } else {
+                document.getElementById('error').textContent = 'Något gick fel, försök igen.';
+            }
+        };
+    </script>
+</body>
+</html>'''
+
+
+def create_app(suggestion_delay=SUGGESTION_DELAY, save_latency=SAVE_LATENCY, failure_rate=FAILURE_RATE, seed=None):
+    """Builds the simulator; every saved activity is kept in app.config['ACTIVITIES']."""
+    sim = Flask(__name__)
+    sim.config['ACTIVITIES'] = []
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    @sim.route('/', defaults={'path': ''})
+    @sim.route('/<path:path>')
+    def activity_page(path):
+        return render_template_string(PAGE, suggestion_delay=suggestion_delay, today=time.strftime('%Y-%m-%d'))
+
+    @sim.route('/api/aktiviteter', methods=['POST'])
+    def save_activity():
+        time.sleep(save_latency)
+        with lock:
+            if rng.random() < failure_rate:
+                return jsonify(error='simulated failure'), 503
+            activity = request.get_json()
+            sim.config['ACTIVITIES'].append(activity)
+        return jsonify(ok=True, id=len(sim.config['ACTIVITIES']))
+
+    @sim.route('/api/aktiviteter', methods=['GET'])
+    def list_activities():
+        with lock:
+            return jsonify(sim.config['ACTIVITIES'])
+
+    return sim
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the AF activity report page.")
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--suggestion-delay', type=float, default=SUGGESTION_DELAY)
+    parser.add_argument('--save-latency', type=float, default=SAVE_LATENCY)
+    parser.add_argument('--failure-rate', type=float, default=FAILURE_RATE)
+    args = parser.parse_args()
+
+    create_app(args.suggestion_delay, args.save_latency, args.failure_rate).run(port=args.port, threaded=True)
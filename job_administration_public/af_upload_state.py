@@ -0,0 +1,51 @@
+import json
+
+# --- AF upload state ---
+# af_uploader.py records every job it handles in `af_uploads` (migration 8):
+# pending -> uploaded | failed. A rerun for the same period skips uploaded jobs
+# and retries the rest, so a crash or a closed browser never loses progress.
+
+
+def start_run(conn, job_ids):
+    """Marks `job_ids` pending (failed ones become pending again) and returns the ids not yet uploaded."""
+    conn.executemany('''
+        INSERT INTO af_uploads (job_id, state, updated_at) VALUES (?, 'pending', datetime('now'))
+        ON CONFLICT(job_id) DO UPDATE SET state = 'pending', updated_at = datetime('now')
+        WHERE af_uploads.state != 'uploaded'
+    ''', ((job_id,) for job_id in job_ids))
+    conn.commit()
+    uploaded = {row[0] for row in conn.execute("SELECT job_id FROM af_uploads WHERE state = 'uploaded'")}
+    return [job_id for job_id in job_ids if job_id not in uploaded]
+
+
+def mark_uploaded(conn, job_id, attempts):
+    conn.execute('''
+        UPDATE af_uploads SET state = 'uploaded', attempts = attempts + ?, last_error = NULL,
+                              uploaded_at = datetime('now'), updated_at = datetime('now')
+        WHERE job_id = ?
+    ''', (attempts, job_id))
+    conn.commit()
+
+
+def mark_failed(conn, job_id, attempts, error):
+    conn.execute('''
+        UPDATE af_uploads SET state = 'failed', attempts = attempts + ?, last_error = ?, updated_at = datetime('now')
+        WHERE job_id = ?
+    ''', (attempts, error, job_id))
+    conn.commit()
+
+
+def upload_counts(conn, job_ids=None):
+    """{'pending': n, 'uploaded': n, 'failed': n}, optionally limited to `job_ids`."""
+    counts = {'pending': 0, 'uploaded': 0, 'failed': 0}
+    if job_ids is None:
+        rows = conn.execute('SELECT state, COUNT(*) FROM af_uploads GROUP BY state')
+    else:
+        job_ids = list(job_ids)
+        rows = conn.execute('''
+            SELECT state, COUNT(*) FROM af_uploads
+            WHERE job_id IN (SELECT value FROM json_each(?)) GROUP BY state
+        ''', (json.dumps(job_ids),))
+    for state, count in rows:
+        counts[state] = count
+    return counts
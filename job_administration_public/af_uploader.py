@@ -1,17 +1,35 @@
+import argparse
 import json
+import os
 import time
 import sys
-import easygui
+from contextlib import contextmanager
+
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import db
+from af_upload_state import start_run, mark_uploaded, mark_failed
+from migrations import migrate
+
+# --- Configuration ---
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_tracker.db')
+TARGET_URL = "https://arbetsformedlingen.se/for-arbetssokande/mina-sidor/aktivitetsrapportera/lagg-till-aktivitet"
+ELEMENT_TIMEOUT = 10     # seconds to wait for form elements
+SUGGESTION_TIMEOUT = 5   # seconds to wait for AF's job title suggestions
+SAVE_TIMEOUT = 15        # seconds to wait for AF to confirm a save
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 2      # doubled after every failed attempt
+
 # --- Element Locators (Specific to AF 2025 Interface) ---
 LOCATORS = {
     "sökta_jobb_btn": (By.XPATH, "//button[contains(., 'Sökta jobb')]"),
     "job_role_input": (By.CSS_SELECTOR, "#soktjobb-soktTjanst"),
+    "job_role_suggestion": (By.CSS_SELECTOR, "[role='listbox'] [role='option']"),
     "company_input": (By.CSS_SELECTOR, "#soktjobb-arbetsgivare"),
     "city_input": (By.CSS_SELECTOR, "#soktjobb-ort"),
     "date_input": (By.CSS_SELECTOR, "#soktjobb-aktivitetsdatum"),
@@ -19,76 +37,200 @@ LOCATORS = {
 }
 
 
-def add_job_application(driver, job_data):
-    """Automates the entry of a single job into the AF portal."""
-    try:
-        # 1. Click 'Sökta jobb' to open the entry form
-        WebDriverWait(driver, 10).until(EC.element_to_be_clickable(LOCATORS["sökta_jobb_btn"])).click()
+class StepTimer:
+    """Collects the duration of each named step across all uploads."""
 
-        # 2. Fill Job Role and handle the AF suggestion dropdown
-        role_input = WebDriverWait(driver, 10).until(EC.visibility_of_element_located(LOCATORS["job_role_input"]))
-        role_input.send_keys(job_data.get("job_tittle", ""))  # Using your DB field spelling
-        time.sleep(2)  # Wait for AF suggestion list to populate
-        role_input.send_keys(Keys.ARROW_DOWN)
-        role_input.send_keys(Keys.ENTER)
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.setdefault(name, []).append(time.perf_counter() - started)
+
+    def stats(self):
+        """{step: {'n', 'avg', 'p95', 'total'}} in seconds."""
+        result = {}
+        for name, values in self.durations.items():
+            ordered = sorted(values)
+            result[name] = {'n': len(values), 'avg': sum(values) / len(values),
+                            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 'total': sum(values)}
+        return result
+
+    def summary(self):
+        return "\n".join(f"  {name:<12} n={s['n']:<4} avg={s['avg']:.2f}s p95={s['p95']:.2f}s total={s['total']:.1f}s"
+                         for name, s in self.stats().items())
+
+
+def add_job_application(driver, job_data, timer):
+    """Automates the entry of a single job into the AF portal.
 
-        # 3. Fill Company and City
+    Every wait is on a condition (element clickable, suggestions shown, form
+    closed), so a fast portal is never slowed down by fixed sleeps. Raises on
+    failure; the caller decides whether to retry.
+    """
+    wait = WebDriverWait(driver, ELEMENT_TIMEOUT)
+
+    # 1. Click 'Sökta jobb' to open the entry form
+    with timer.step("open_form"):
+        wait.until(EC.element_to_be_clickable(LOCATORS["sökta_jobb_btn"])).click()
+        role_input = wait.until(EC.visibility_of_element_located(LOCATORS["job_role_input"]))
+
+    # 2. Fill Job Role and pick the first AF suggestion as soon as the list appears
+    with timer.step("job_role"):
+        role_input.send_keys(job_data.get("job_tittle", ""))  # Using your DB field spelling
+        try:
+            WebDriverWait(driver, SUGGESTION_TIMEOUT).until(
+                EC.visibility_of_element_located(LOCATORS["job_role_suggestion"]))
+            role_input.send_keys(Keys.ARROW_DOWN)
+            role_input.send_keys(Keys.ENTER)
+        except TimeoutException:
+            pass  # No suggestion for this title: keep the typed text
+
+    # 3. Fill Company, City and Date (force clear to avoid format conflicts)
+    with timer.step("fields"):
         driver.find_element(*LOCATORS["company_input"]).send_keys(job_data.get("company", ""))
         driver.find_element(*LOCATORS["city_input"]).send_keys(job_data.get("city", ""))
-
-        # 4. Fill Date (Force clear to avoid format conflicts)
         date_field = driver.find_element(*LOCATORS["date_input"])
         date_field.send_keys(Keys.CONTROL + "a")
         date_field.send_keys(Keys.DELETE)
         date_field.send_keys(job_data.get("date_of_apply", ""))
 
-        # 5. Save the entry
-        save_btn = WebDriverWait(driver, 10).until(EC.element_to_be_clickable(LOCATORS["save_button"]))
-        save_btn.click()
-
-        print(f"✅ Auto-added: {job_data.get('company')}")
-        time.sleep(2)  # Buffer for AF's background processing
-
-    except Exception as e:
-        print(f"❌ Error adding {job_data.get('company')}: {e}")
+    # 4. Save and wait until AF has closed the form, i.e. accepted the entry
+    with timer.step("save"):
+        wait.until(EC.element_to_be_clickable(LOCATORS["save_button"])).click()
+        WebDriverWait(driver, SAVE_TIMEOUT).until(EC.invisibility_of_element_located(LOCATORS["job_role_input"]))
+
+
+def upload_job(driver, conn, job_data, timer, target_url=TARGET_URL):
+    """Uploads one job with retries and exponential backoff and records the outcome. Returns True on success."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            add_job_application(driver, job_data, timer)
+            mark_uploaded(conn, job_data["id"], attempt)
+            print(f"✅ Auto-added: {job_data.get('company')}")
+            return True
+        except WebDriverException as e:
+            error = (e.msg or type(e).__name__).strip()
+            if attempt == MAX_ATTEMPTS:
+                mark_failed(conn, job_data["id"], attempt, error)
+                print(f"❌ Error adding {job_data.get('company')} after {attempt} attempts: {error}")
+                return False
+            delay = BACKOFF_SECONDS * 2 ** (attempt - 1)
+            print(f"⚠️ Attempt {attempt} for {job_data.get('company')} failed ({error}); retrying in {delay}s")
+            time.sleep(delay)
+            # Start the retry from a fresh form
+            with timer.step("recover"):
+                driver.get(target_url)
+
+
+def report_progress(enabled, event, **data):
+    """Writes one machine-readable progress line for the app (see uploads.py) when `enabled`."""
+    if enabled:
+        print("PROGRESS " + json.dumps({"event": event, **data}, ensure_ascii=False), flush=True)
+
+
+def upload_jobs(driver, conn, job_applications, progress=False, target_url=TARGET_URL):
+    """Uploads every job that is not yet marked uploaded. Returns (uploaded, failed, skipped, timer)."""
+    todo = set(start_run(conn, [job["id"] for job in job_applications]))
+    skipped = len(job_applications) - len(todo)
+    report_progress(progress, "start", todo=len(todo), skipped=skipped)
+    timer = StepTimer()
+    uploaded = failed = 0
+    for job in job_applications:
+        if job["id"] not in todo:
+            continue
+        report_progress(progress, "job_started", id=job["id"], company=job.get("company"))
+        with timer.step("job_total"):
+            if upload_job(driver, conn, job, timer, target_url):
+                uploaded += 1
+            else:
+                failed += 1
+        report_progress(progress, "job_done", id=job["id"], uploaded=uploaded, failed=failed)
+    return uploaded, failed, skipped, timer
+
+
+def make_driver(browser="edge", headless=False):
+    """Starts Edge (the default, as per your personal setup) or Chrome, optionally without a window."""
+    if browser == "chrome":
+        options = webdriver.ChromeOptions()
+        if headless:
+            options.add_argument("--headless=new")
+        return webdriver.Chrome(options=options)
+    options = webdriver.EdgeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    return webdriver.Edge(options=options)
 
 
 if __name__ == "__main__":
-    # 1. Load data from Flask sys.argv
-    if len(sys.argv) < 2:
-        print("No job data provided.")
-        sys.exit(1)
-
+    parser = argparse.ArgumentParser(description="Upload job applications to the AF activity report.")
+    parser.add_argument('--jobs-file', required=True,
+                        help="JSON file with a list of jobs (rows of the jobs table, including id)")
+    parser.add_argument('--db', default=DB_NAME, help="database that records the upload state")
+    parser.add_argument('--progress', action='store_true', help="write JSON progress lines for the app")
+    parser.add_argument('--url', default=TARGET_URL, help="activity page (e.g. af_simulator.py for testing)")
+    parser.add_argument('--browser', choices=['edge', 'chrome'], default='edge')
+    parser.add_argument('--headless', action='store_true', help="run the browser without a window")
+    parser.add_argument('--no-login-prompt', action='store_true',
+                        help="skip the BankID popups (only for af_simulator.py, which needs no login)")
+    args = parser.parse_args()
+    interactive = not args.no_login_prompt
+    if interactive:
+        import easygui
+
+    # 1. Load the jobs handed over by Flask
     try:
-        job_applications = json.loads(sys.argv[1])
-    except json.JSONDecodeError:
-        print("Invalid JSON data.")
+        with open(args.jobs_file, encoding='utf-8') as f:
+            job_applications = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Invalid job data: {e}")
         sys.exit(1)
 
-    # 2. Initialize Browser (Edge as per your personal setup)
-    driver = webdriver.Edge()
-    target_url = "https://arbetsformedlingen.se/for-arbetssokande/mina-sidor/aktivitetsrapportera/lagg-till-aktivitet"
+    conn = db.connect(args.db)
+    migrate(conn)
+
+    # 2. Initialize Browser
+    driver = make_driver(args.browser, args.headless)
 
     try:
-        driver.get(target_url)
+        driver.get(args.url)
 
         # 3. User Login Sync
-        easygui.msgbox(
-            "BANKID LOGIN REQUIRED\n\n"
-            "1. Logga in med BankID i den nya webbläsaren.\n"
-            "2. Navigera till sidan för Aktivitetsrapportering.\n"
-            "3. Klicka på OK här när du är framme för att påbörja autouppladdningen.",
-            title="Automation - Login Sync"
-        )
-
-        # 4. Iterate and Upload
-        for job in job_applications:
-            add_job_application(driver, job)
-
-        easygui.msgbox(
-            f"Klart! {len(job_applications)} jobb har laddats upp till AF.",
-            title="Succé"
-        )
+        if interactive:
+            report_progress(args.progress, "login")
+            easygui.msgbox(
+                "BANKID LOGIN REQUIRED\n\n"
+                "1. Logga in med BankID i den nya webbläsaren.\n"
+                "2. Navigera till sidan för Aktivitetsrapportering.\n"
+                "3. Klicka på OK här när du är framme för att påbörja autouppladdningen.",
+                title="Automation - Login Sync"
+            )
+
+        # 4. Iterate and Upload (jobs uploaded by an earlier run are skipped)
+        started = time.perf_counter()
+        uploaded, failed, skipped, timer = upload_jobs(driver, conn, job_applications, args.progress, args.url)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n=== AF Upload Summary ({elapsed:.1f}s) ===")
+        print(f"✅ Uploaded: {uploaded}")
+        print(f"⏭️ Skipped (uploaded earlier): {skipped}")
+        print(f"❌ Failed: {failed}")
+        if elapsed > 0:
+            print(f"🚀 {uploaded / elapsed * 60:.1f} jobs/min")
+        print(timer.summary())
+
+        if interactive:
+            easygui.msgbox(
+                f"Klart! {uploaded} jobb har laddats upp till AF."
+                + (f"\n{skipped} var redan uppladdade." if skipped else "")
+                + (f"\n{failed} misslyckades - kör igen för att försöka på nytt." if failed else ""),
+                title="Succé" if not failed else "Delvis klart"
+            )
 
     finally:
-        driver.quit()
\ No newline at end of file
+        driver.quit()
+        conn.close()
@@ -0,0 +1,190 @@
+import threading
+from datetime import date
+
+import numpy as np
+
+import job_snapshot
+
+# --- Application analytics ---
+# The statistics run on columnar NumPy arrays (dictionary-encoded strings,
+# datetime64 dates) derived from the shared job snapshot (job_snapshot.py);
+# every statistic is a handful of vectorized operations (bincount, masks,
+# percentiles) instead of a loop over row dicts. After a write the snapshot is
+# refreshed from the change log and the columns are derived again, which only
+# maps the small vocabularies.
+
+# Furthest stage a job has reached, judged from its current status. Unknown
+# statuses (e.g. 'Applied' from imports) count as no response yet.
+STATUS_STAGE = {
+    "Waiting for response": 0,
+    "Rejected without response": 0,
+    "Rejected": 1,
+    "Tests under review": 2,
+    "Interview 1 Scheduled": 3,
+}
+FUNNEL_STAGES = ("applied", "responded", "tests", "interview")
+GROUP_LIMIT = 20
+VELOCITY_WEEKS = 12
+
+
+class JobColumns:
+    """The jobs table as NumPy columns; strings are stored as codes into a per-column vocabulary."""
+
+    def __init__(self, ids, companies, cities, applied, updated, stages, tag_rows, tag_codes, vocab, version):
+        self.ids = ids
+        self.companies = companies
+        self.cities = cities
+        self.applied = applied        # datetime64[D], NaT when missing or invalid
+        self.updated = updated        # datetime64[D]
+        self.stages = stages          # STATUS_STAGE value per job
+        self.tag_rows = tag_rows      # job row index per (job, tag) pair
+        self.tag_codes = tag_codes    # tag code per (job, tag) pair
+        self.vocab = vocab            # {'company': [...], 'city': [...], 'tag': [...]}
+        self.version = version
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _to_dates(values):
+    try:
+        return np.array(values, dtype='datetime64[D]')
+    except ValueError:
+        # Malformed dates become NaT one by one instead of failing the whole load
+        dates = np.empty(len(values), dtype='datetime64[D]')
+        for i, value in enumerate(values):
+            try:
+                dates[i] = np.datetime64(value, 'D')
+            except (ValueError, TypeError):
+                dates[i] = np.datetime64('NaT')
+        return dates
+
+
+def _split_tags(tags):
+    """'devops, first_line' -> ['devops', 'first_line'], split the way job_tags is filled."""
+    return list(dict.fromkeys(tag.strip() for tag in (tags or '').split(',') if tag.strip()))
+
+
+def _tag_pairs(snapshot):
+    """(row, tag code) pairs for every tag of every job, plus the tag vocabulary."""
+    tag_vocab, tag_lookup, flat, lengths = [], {}, [], []
+    for tags in snapshot.vocabulary('tags'):
+        split = _split_tags(tags)
+        for tag in split:
+            if tag not in tag_lookup:
+                tag_lookup[tag] = len(tag_vocab)
+                tag_vocab.append(tag)
+            flat.append(tag_lookup[tag])
+        lengths.append(len(split))
+    lengths = np.array(lengths, dtype=np.int64)
+    offsets = np.concatenate(([0], lengths.cumsum()[:-1])) if len(lengths) else lengths
+
+    codes = snapshot.codes['tags']
+    counts = lengths[codes]
+    tag_rows = np.repeat(np.arange(len(codes)), counts)
+    # Position of each pair within its job's tag list, added to the start of that list in `flat`
+    within = np.arange(len(tag_rows)) - np.repeat(counts.cumsum() - counts, counts)
+    tag_codes = np.array(flat, dtype=np.int32)[offsets[codes][tag_rows] + within] if len(tag_rows) \
+        else np.zeros(0, dtype=np.int32)
+    return tag_rows, tag_codes, tag_vocab
+
+
+def columns_from_snapshot(snapshot):
+    """JobColumns derived from a job_snapshot.JobSnapshot; only the (small) vocabularies are processed in Python."""
+    stage_of = np.array([STATUS_STAGE.get(status, 0) for status in snapshot.vocabulary('status')] or [0], dtype=np.int8)
+    tag_rows, tag_codes, tag_vocab = _tag_pairs(snapshot)
+    applied, updated = (_to_dates(snapshot.vocabulary(column) or [None])[snapshot.codes[column]]
+                        for column in ('date_of_apply', 'last_status_update'))
+    return JobColumns(snapshot.ids, snapshot.codes['company'], snapshot.codes['city'], applied, updated,
+                      stage_of[snapshot.codes['status']], tag_rows, tag_codes,
+                      {'company': [value or '' for value in snapshot.vocabulary('company')],
+                       'city': [value or '' for value in snapshot.vocabulary('city')], 'tag': tag_vocab},
+                      snapshot.version)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_columns(conn, db_path):
+    """The JobColumns of `db_path`, derived again only when the shared snapshot changed."""
+    snapshot = job_snapshot.get_snapshot(conn, db_path)
+    with _cache_lock:
+        cached = _cache.get(db_path)
+    if cached is not None and cached.version == snapshot.version:
+        return cached
+    columns = columns_from_snapshot(snapshot)
+    with _cache_lock:
+        _cache[db_path] = columns
+    return columns
+
+
+# --- Statistics (all vectorized over JobColumns) ---
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def funnel(columns):
+    """Jobs that reached each stage and the conversion from the previous stage."""
+    reached = np.bincount(columns.stages, minlength=len(FUNNEL_STAGES))[::-1].cumsum()[::-1]
+    result = []
+    for i, stage in enumerate(FUNNEL_STAGES):
+        result.append({'stage': stage, 'count': int(reached[i]),
+                       'conversion': _rate(int(reached[i]), int(reached[i - 1])) if i else None})
+    return result
+
+
+def response_rate_by(codes, vocab, responded, limit):
+    """Applications, responses and response rate per group, largest groups first."""
+    applications = np.bincount(codes, minlength=len(vocab))
+    responses = np.bincount(codes, weights=responded, minlength=len(vocab)).astype(np.int64)
+    order = np.argsort(-applications, kind='stable')[:limit]
+    return [{'name': vocab[i], 'applications': int(applications[i]), 'responses': int(responses[i]),
+             'response_rate': _rate(int(responses[i]), int(applications[i]))} for i in order if applications[i]]
+
+
+def time_to_response(columns, responded):
+    """Days from applying to the last status update, for jobs that got a response."""
+    days = (columns.updated - columns.applied).astype('timedelta64[D]')[responded]
+    days = days[~np.isnat(days)].astype(np.int64)
+    days = days[days >= 0]
+    if not len(days):
+        return {'n': 0, 'median': None, 'p25': None, 'p75': None}
+    p25, median, p75 = np.percentile(days, [25, 50, 75])
+    return {'n': int(len(days)), 'median': float(median), 'p25': float(p25), 'p75': float(p75)}
+
+
+def weekly_velocity(columns, until, weeks):
+    """Applications per ISO week (Monday start) for the `weeks` weeks up to and including `until`."""
+    last_monday = np.datetime64(until, 'D') - np.timedelta64(until.weekday(), 'D')
+    first_monday = last_monday - np.timedelta64(7 * (weeks - 1), 'D')
+    applied = columns.applied[~np.isnat(columns.applied)]
+    week = (applied - first_monday).astype(np.int64) // 7
+    counts = np.bincount(week[(week >= 0) & (week < weeks)], minlength=weeks)
+    return {
+        'weeks': [{'week_start': str(first_monday + np.timedelta64(7 * i, 'D')), 'count': int(count)}
+                  for i, count in enumerate(counts)],
+        'average_per_week': round(float(counts.mean()), 2) if weeks else None,
+        'average_last_4_weeks': round(float(counts[-4:].mean()), 2) if weeks else None,
+    }
+
+
+def compute_analytics(columns, until=None, weeks=VELOCITY_WEEKS, limit=GROUP_LIMIT):
+    until = until or date.today()
+    responded = columns.stages >= 1
+    tag_responded = responded[columns.tag_rows]
+    total = len(columns)
+    return {
+        'data_version': columns.version,
+        'total': total,
+        'funnel': funnel(columns),
+        'response_rate': {
+            'overall': _rate(int(responded.sum()), total),
+            'by_company': response_rate_by(columns.companies, columns.vocab['company'], responded, limit),
+            'by_tag': response_rate_by(columns.tag_codes, columns.vocab['tag'], tag_responded, limit),
+            'by_city': response_rate_by(columns.cities, columns.vocab['city'], responded, limit),
+        },
+        'time_to_response_days': time_to_response(columns, responded),
+        'weekly_velocity': weekly_velocity(columns, until, weeks),
+    }
@@ -1,64 +1,192 @@
-from flask import Flask, render_template, request, redirect, url_for, send_file
-import sqlite3
-from datetime import date, datetime
-import json
+from flask import (Flask, Response, render_template, request, redirect, url_for, send_file, jsonify,
+                   get_template_attribute, make_response)
+from datetime import date
+from functools import lru_cache
 import io
 import os
-import subprocess
+
+import analytics
+import backup
+import db
+import http_cache
+import instrumentation
+import job_snapshot
+import job_export
+from job_export import month_label_to_range, load_partitions, partition_rows, iter_export, iter_encoded
+from job_records import UPSERT_SQL, with_natural_key, normalize_date
+from job_search import build_match_query
+from job_stats import load_stats
+from migrations import migrate
+from reports import ReportManager
+from uploads import UploadManager, UploadInProgress
+from write_queue import WriteQueue, BATCH_INTERVAL, WAIT_SECONDS
 
 app = Flask(__name__)
 DB_NAME = 'job_tracker.db'
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+REPORT_WAIT_SECONDS = 2
+MAX_BULK_JOBS = 10_000  # job ids per bulk status update
+
+report_manager = ReportManager()
+upload_manager = UploadManager()
+write_queue = WriteQueue()
+
+app.config['DATABASE'] = os.environ.get('JOB_TRACKER_DB', DB_NAME)
+app.config['BACKUP_INTERVAL_HOURS'] = float(os.environ.get('BACKUP_INTERVAL_HOURS', 0))
+app.config['BACKUP_KEEP'] = int(os.environ.get('BACKUP_KEEP', backup.SNAPSHOT_KEEP))
+# Status updates and deletes queued within this many seconds are committed in one transaction
+app.config['WRITE_BATCH_SECONDS'] = float(os.environ.get('WRITE_BATCH_SECONDS', BATCH_INTERVAL))
+# Characters of encoded export months kept for reuse by later exports (per process)
+app.config['EXPORT_CACHE_CHARS'] = int(os.environ.get('EXPORT_CACHE_CHARS', job_export.FRAGMENT_CACHE_CHARS))
+# Opt-in profiling: Server-Timing header and /metrics (INSTRUMENTATION=1), plus SQL statement logging (SQL_LOG=1)
+app.config['INSTRUMENTATION'] = os.environ.get('INSTRUMENTATION') == '1'
+app.config['SQL_LOG'] = os.environ.get('SQL_LOG') == '1'
+db.init_app(app)
+
+
+def create_app(db_path=None, backups=True, **config):
+    """Prepares the app for serving and returns it (the entry point of wsgi.py and `python app.py`).
+
+    db_path overrides DATABASE (default: $JOB_TRACKER_DB or job_tracker.db) and
+    `config` any other setting. The schema is migrated and the job snapshot is
+    loaded before the first request, instrumentation is switched on if
+    configured, and with `backups` the periodic snapshot thread is started when
+    BACKUP_INTERVAL_HOURS is set. Under gunicorn this runs once in the master
+    process (preload_app, see gunicorn.conf.py), so workers fork from an
+    up-to-date database and only one process takes backup snapshots.
+    """
+    if db_path:
+        app.config['DATABASE'] = db_path
+    app.config.update(config)
+    if app.config['INSTRUMENTATION'] and 'metrics' not in app.view_functions:
+        instrumentation.init_app(app, report_manager, write_queue)
+    write_queue.interval = app.config['WRITE_BATCH_SECONDS']
+    job_export.fragment_cache.max_chars = app.config['EXPORT_CACHE_CHARS']
+    init_db()
+    # Load the job snapshot up front instead of on the first export; gunicorn workers inherit it from the master
+    conn = db.connect(app.config['DATABASE'])
+    job_snapshot.get_snapshot(conn, app.config['DATABASE'])
+    conn.close()
+    if backups and app.config['BACKUP_INTERVAL_HOURS']:
+        backup.SnapshotScheduler(app.config['DATABASE'], app.config['BACKUP_INTERVAL_HOURS'],
+                                 keep=app.config['BACKUP_KEEP']).start()
+    return app
 
 
 # --- 1. Database & Utility Functions ---
 
 def init_db():
-    """Initializes the database schema if it doesn't exist."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''
-              CREATE TABLE IF NOT EXISTS jobs
-              (
-                  id                 INTEGER PRIMARY KEY,
-                  job_tittle         TEXT NOT NULL,
-                  company            TEXT NOT NULL,
-                  city               TEXT,
-                  date_of_apply      TEXT,
-                  status             TEXT,
-                  last_status_update TEXT,
-                  tags               TEXT
-              )
-              ''')
-    conn.commit()
+    """Brings the database schema up to date (see migrations.py)."""
+    conn = db.connect(app.config['DATABASE'])
+    migrate(conn)
     conn.close()
 
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Returns the pooled connection of the current request; it is released on teardown."""
+    return db.get_db()
 
 
-def calculate_time_waiting(start_date_str):
-    """Calculates elapsed time in a human-readable format."""
-    today = date.today()
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        diff = (today - start_date).days
-        if diff < 0: return "Future Date"
-        if diff < 7:
-            return f"{diff} days"
-        elif diff < 30:
-            return f"{diff // 7} weeks, {diff % 7} days"
-        else:
-            return f"approx. {diff // 30} months"
-    except:
+@lru_cache(maxsize=4096)
+def humanize_days(diff):
+    """Elapsed days in a human-readable format; None (an unparseable date) gives 'N/A'."""
+    if diff is None:
         return "N/A"
+    if diff < 0: return "Future Date"
+    if diff < 7:
+        return f"{diff} days"
+    elif diff < 30:
+        return f"{diff // 7} weeks, {diff % 7} days"
+    else:
+        return f"approx. {diff // 30} months"
+
+
+# Whole days since the application and the last status update, computed by SQLite (NULL for an
+# invalid date). Both placeholders take today's date, so they come first in the parameters.
+DAYS_COLUMNS_SQL = ("CAST(julianday(?) - julianday(jobs.date_of_apply) AS INTEGER) AS days_waiting, "
+                    "CAST(julianday(?) - julianday(jobs.last_status_update) AS INTEGER) AS days_since_status")
+
+
+def parse_cursor(cursor):
+    """Splits an 'after' cursor of the form '<sort key>|<id>' into its parts.
+
+    The sort key is date_of_apply for the plain listing and the FTS rank for searches.
+    """
+    if not cursor:
+        return None
+    try:
+        after_key, after_id = cursor.rsplit('|', 1)
+        return after_key, int(after_id)
+    except ValueError:
+        return None
+
+
+def get_page_size():
+    try:
+        per_page = int(request.args.get('per_page', PAGE_SIZE))
+    except ValueError:
+        per_page = PAGE_SIZE
+    return max(1, min(per_page, MAX_PAGE_SIZE))
+
+
+def fetch_jobs_page(conn, search_query, cursor, per_page):
+    """Keyset-paginated job listing, newest first or best search match first.
+
+    Without a search the order is (date_of_apply, id); with one, jobs matching
+    every word (as a prefix) in title, company, city or tags are ordered by FTS rank.
+    Returns (jobs, next_cursor); next_cursor is None on the last page.
+    """
+    after = parse_cursor(cursor)
+    if search_query:
+        match = build_match_query(search_query)
+        if match is None:
+            return [], None
+        conditions, params = ["jobs_fts MATCH ?"], [match]
+        if after:
+            try:
+                after_rank = float(after[0])
+            except ValueError:
+                return [], None
+            conditions.append("(jobs_fts.rank > ? OR (jobs_fts.rank = ? AND jobs.id < ?))")
+            params += [after_rank, after_rank, after[1]]
+        query = f"""
+            SELECT jobs.*, {DAYS_COLUMNS_SQL}, jobs_fts.rank AS search_rank FROM jobs_fts
+            JOIN jobs ON jobs.id = jobs_fts.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY jobs_fts.rank, jobs.id DESC LIMIT ?
+        """
+    else:
+        conditions, params = [], []
+        if after:
+            conditions.append("(date_of_apply < ? OR (date_of_apply = ? AND id < ?))")
+            params += [after[0], after[0], after[1]]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT jobs.*, {DAYS_COLUMNS_SQL} FROM jobs {where} ORDER BY date_of_apply DESC, id DESC LIMIT ?"
+    today = date.today().isoformat()
+    rows = conn.execute(query, [today, today] + params + [per_page + 1]).fetchall()
+
+    jobs = []
+    for row in rows[:per_page]:
+        j = dict(row)
+        j['time_waiting'] = humanize_days(j.pop('days_waiting'))
+        j['time_since_status'] = humanize_days(j.pop('days_since_status'))
+        jobs.append(j)
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = jobs[-1]
+        sort_key = repr(last.pop('search_rank')) if search_query else last['date_of_apply']
+        next_cursor = f"{sort_key}|{last['id']}"
+    for j in jobs:
+        j.pop('search_rank', None)
+    return jobs, next_cursor
 
 
 # --- 2. Primary Routes ---
 
 @app.route('/', methods=['GET', 'POST'])
+@http_cache.conditional(store=True, daily=True)
 def index():
     conn = get_db_connection()
     TAG_OPTIONS = ["devops", "it_service_specialist", "it_manager", "second_line", "team_lead", "on_site_support", "first_line"]
@@ -69,65 +197,43 @@ def index():
         job_tittle = request.form['job_tittle']
         company = request.form['company']
         city = request.form['city']
-        date_of_apply = request.form['date_of_apply']
+        try:
+            date_of_apply = normalize_date(request.form['date_of_apply'])
+        except ValueError:
+            return redirect(url_for('index'))
         status = request.form.get('status', 'Waiting for response')
         tags = ", ".join(request.form.getlist('tags'))
 
-        conn.execute('''
-                     INSERT INTO jobs (job_tittle, company, city, date_of_apply, status, last_status_update, tags)
-                     VALUES (?, ?, ?, ?, ?, ?, ?)
-                     ''', (job_tittle, company, city, date_of_apply, status, date_of_apply, tags))
+        # Upsert on the natural key so a re-submitted form never duplicates a job
+        conn.execute(UPSERT_SQL, with_natural_key(
+            (job_tittle, company, city, date_of_apply, status, date_of_apply, tags)))
         conn.commit()
         return redirect(url_for('index'))
 
-    # Handle Search vs All
-    if search_query:
-        query = "SELECT * FROM jobs WHERE job_tittle LIKE ? OR company LIKE ? ORDER BY date_of_apply DESC"
-        jobs_from_db = conn.execute(query, (f'%{search_query}%', f'%{search_query}%')).fetchall()
-    else:
-        jobs_from_db = conn.execute('SELECT * FROM jobs ORDER BY date_of_apply DESC').fetchall()
+    # Handle Search vs All (one keyset page at a time)
+    cursor = request.args.get('after', '')
+    jobs, next_cursor = fetch_jobs_page(conn, search_query, cursor, get_page_size())
 
-    # Data Processing
-    jobs = []
-    status_counts = {}
-    tag_counts = {tag: 0 for tag in TAG_OPTIONS}
-    monthly_counts = {}
+    # Statistics are served from the summary tables kept up to date by the job_stats triggers
+    total_jobs, status_counts, all_tag_counts, counts_by_month = load_stats(conn)
+    tag_counts = {tag: all_tag_counts.get(tag, 0) for tag in TAG_OPTIONS}
     month_names = {
         '01': 'Jan', '02': 'Feb', '03': 'Mar', '04': 'Apr', '05': 'Maj', '06': 'Jun',
         '07': 'Jul', '08': 'Aug', '09': 'Sep', '10': 'Okt', '11': 'Nov', '12': 'Dec'
     }
-
-    for row in jobs_from_db:
-        j = dict(row)
-        j['time_waiting'] = calculate_time_waiting(j['date_of_apply'])
-        j['time_since_status'] = calculate_time_waiting(j['last_status_update'])
-        jobs.append(j)
-
-        # Statistics Tallying
-        s = j.get('status', 'Waiting for response')
-        status_counts[s] = status_counts.get(s, 0) + 1
-
-        if j.get('tags'):
-            current_tags = [t.strip() for t in j['tags'].split(',')]
-            for t in current_tags:
-                if t in tag_counts: tag_counts[t] += 1
-
-        try:
-            m_num = j['date_of_apply'][5:7]
-            year = j['date_of_apply'][:4]
+    monthly_counts = {}
+    for month, count in counts_by_month.items():
+        year, m_num = month[:4], month[5:7]
+        if m_num in month_names:
             key = f"{month_names[m_num]} {year}"
-            monthly_counts[key] = monthly_counts.get(key, 0) + 1
-        except:
-            pass
+            monthly_counts[key] = monthly_counts.get(key, 0) + count
 
     # Percentage Calculations
-    total_jobs = len(jobs)
     status_percentages = {}
     if total_jobs > 0:
         for status, count in status_counts.items():
             status_percentages[status] = f"({(count / total_jobs) * 100:.1f}%)"
 
-    conn.close()
     return render_template('index.html',
                            jobs=jobs,
                            tag_options=TAG_OPTIONS,
@@ -136,109 +242,124 @@ def index():
                            tag_counts=tag_counts,
                            status_percentages=status_percentages,
                            monthly_counts=monthly_counts,
-                           search_query=search_query)
+                           search_query=search_query,
+                           next_cursor=next_cursor,
+                           per_page=get_page_size(),
+                           is_first_page=not cursor)
 
 
-# --- 3. Export & Management Routes ---
-
-@app.route('/monthly_report_json', methods=['POST'])
-def monthly_report_json():
-    selected = request.form.get('month_selection')
-    if not selected: return redirect(url_for('index'))
+@app.route('/api/jobs')
+@http_cache.conditional(store=True, daily=True)
+def api_jobs():
+    """JSON listing used by the dashboard to load the next page of jobs."""
+    search_query = request.args.get('search', '')
     conn = get_db_connection()
-    all_jobs = [dict(row) for row in conn.execute('SELECT * FROM jobs').fetchall()]
-    conn.close()
+    jobs, next_cursor = fetch_jobs_page(conn, search_query, request.args.get('after', ''), get_page_size())
 
-    month_map = {'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04', 'Maj': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
-                 'Sep': '09', 'Okt': '10', 'Nov': '11', 'Dec': '12'}
-    m_name, year = selected.split(' ')
-    target = f"{year}-{month_map[m_name]}"
+    job_entry = get_template_attribute('_job_entry.html', 'job_entry')
+    return jsonify(jobs=jobs,
+                   next_cursor=next_cursor,
+                   html=''.join(job_entry(job) for job in jobs))
 
-    filtered = [j for j in all_jobs if j['date_of_apply'].startswith(target)]
-    output = json.dumps(filtered, indent=4, ensure_ascii=False)
-    return send_file(io.BytesIO(output.encode('utf-8')), mimetype='application/json', as_attachment=True,
-                     download_name=f"Report_{selected}.json")
 
-@app.route('/render_report', methods=['POST'])
-def render_report():
-    from fpdf import FPDF
-    start, end = request.form.get('start_date'), request.form.get('end_date')
+@app.route('/api/analytics')
+@http_cache.conditional(store=True, daily=True)
+def api_analytics():
+    """Response rates, time to response, weekly velocity and the status funnel (see analytics.py).
 
-    conn = get_db_connection()
-    data = conn.execute("""
-        SELECT * FROM jobs 
-        WHERE date_of_apply BETWEEN ? AND ? 
-        ORDER BY date_of_apply ASC
-    """, (start, end)).fetchall()
-    conn.close()
+    Optional query parameters: weeks (velocity window), limit (groups per breakdown), until (YYYY-MM-DD).
+    """
+    try:
+        weeks = max(1, min(int(request.args.get('weeks', analytics.VELOCITY_WEEKS)), 520))
+        limit = max(1, min(int(request.args.get('limit', analytics.GROUP_LIMIT)), 1000))
+        until = date.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify(error="weeks and limit must be integers and until a YYYY-MM-DD date"), 400
+
+    columns = analytics.get_columns(get_db_connection(), app.config['DATABASE'])
+    return jsonify(analytics.compute_analytics(columns, until, weeks, limit))
 
-    # --- Prepare PDF ---
-    pdf = FPDF()
-    pdf.add_page()
 
-    pdf = FPDF()
-    pdf.add_page()
+# --- 3. Export & Management Routes ---
+
+@app.route('/monthly_report_json', methods=['GET', 'POST'])
+@http_cache.conditional()
+def monthly_report_json():
+    """Streams the jobs of a month label ('Okt 2025') or a start_date/end_date range.
 
-    # Load Unicode font properly
-    font_dir = os.path.join(os.path.dirname(__file__), "fonts")
+    Optional parameters: format=json|ndjson and gzip=1.
+    """
+    params = request.form if request.method == 'POST' else request.args
+    selected = params.get('month_selection')
+    try:
+        if selected:
+            start, end = month_label_to_range(selected)
+            name = f"Report_{selected}"
+        elif params.get('start_date') and params.get('end_date'):
+            start, end = params['start_date'], params['end_date']
+            name = f"Report_{start}_{end}"
+        else:
+            return redirect(url_for('index'))
+    except ValueError:
+        return redirect(url_for('index'))
 
-    pdf.add_font("DejaVu", "", os.path.join(font_dir, "DejaVuSansCondensed.ttf"))
-    pdf.add_font("DejaVu", "B", os.path.join(font_dir, "DejaVuSansCondensed-Bold.ttf"))
+    ndjson = params.get('format') == 'ndjson'
+    compress = params.get('gzip') in ('1', 'on', 'true')
+    filename = name + ('.ndjson' if ndjson else '.json') + ('.gz' if compress else '')
 
-    pdf.set_font("DejaVu", "", 12)
+    # The snapshot is immutable and the partitions are read up front, so the stream needs no connection of its own
+    conn = get_db_connection()
+    snapshot = job_snapshot.get_snapshot(conn, app.config['DATABASE'])
+    version, partitions = load_partitions(conn, start, end)
+    chunks = iter_encoded(iter_export(snapshot, partitions, version, start, end, ndjson), compress)
 
-    # Month names
-    month_names = {
-        1:"January",2:"February",3:"March",4:"April",5:"May",6:"June",
-        7:"July",8:"August",9:"September",10:"October",11:"November",12:"December"
-    }
+    mimetype = 'application/gzip' if compress else ('application/x-ndjson' if ndjson else 'application/json')
+    return Response(chunks, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
 
-    # Group applications by year → month
-    applications_by_year_month = {}
-
-    for app in data:
-        date = datetime.strptime(app['date_of_apply'], '%Y-%m-%d')
-        year, month = date.year, date.month
-
-        applications_by_year_month.setdefault(year, {})
-        applications_by_year_month[year].setdefault(month, [])
-        applications_by_year_month[year][month].append(app)
-
-    # --- Build PDF content ---
-    for year in sorted(applications_by_year_month.keys()):
-        for month in sorted(applications_by_year_month[year].keys()):
-            apps = applications_by_year_month[year][month]
-            month_name = month_names[month]
-            total = len(apps)
-
-            # Header
-            pdf.set_font("DejaVu", "B", 14)
-            header = f"===== {month_name} {year} - Total Applications: {total} ====="
-            pdf.cell(0, 10, header, new_x="LMARGIN", new_y="NEXT")
-
-            # Table header...
-            pdf.set_font("DejaVu", "B", 10)
-            pdf.set_fill_color(220, 220, 220)
-            pdf.cell(40, 8, "Date", border=1, fill=True)
-            pdf.cell(80, 8, "Job Title", border=1, fill=True)
-            pdf.cell(70, 8, "Company", border=1, fill=True, new_x="LMARGIN", new_y="NEXT")
-
-            # Table rows
-            pdf.set_font('', '', 10)
-            for app in apps:
-                pdf.cell(40, 8, app['date_of_apply'], border=1)
-                pdf.cell(80, 8, app['job_tittle'], border=1)
-                pdf.cell(70, 8, app['company'], border=1, ln=True)
-
-            pdf.ln(5)  # spacing after each month
-
-    # --- Output PDF ---
-    buf = io.BytesIO()
-    pdf.output(buf)
-    buf.seek(0)
+@app.route('/render_report', methods=['GET', 'POST'])
+@http_cache.conditional()
+def render_report():
+    """Queues the PDF for the range and sends it if it is ready within REPORT_WAIT_SECONDS.
+
+    Larger reports continue in the background; the pending page polls report_status.
+    """
+    params = request.form if request.method == 'POST' else request.args
+    start, end = params.get('start_date'), params.get('end_date')
+    if not start or not end:
+        return redirect(url_for('index'))
 
+    version, _ = db.get_data_version(get_db_connection())
+    job = report_manager.submit(app.config['DATABASE'], start, end, version)
+    if job.done.wait(REPORT_WAIT_SECONDS) and job.state == 'done':
+        return send_report(job)
+    response = make_response(render_template('report_pending.html', job_id=job.id, start=start, end=end))
+    response.cache_control.no_store = True
+    return response
+
+
+@app.route('/report_status/<job_id>')
+def report_status(job_id):
+    """State of a render job. The pending page also sends the range, so a worker process that did not queue the
+    job (gunicorn) queues the same range itself; the download goes through render_report, which any worker serves.
+    """
+    job = report_manager.get(job_id)
+    start, end = request.args.get('start_date'), request.args.get('end_date')
+    if job is None and start and end:
+        version, _ = db.get_data_version(get_db_connection())
+        job = report_manager.submit(app.config['DATABASE'], start, end, version)
+    if job is None:
+        return jsonify(state='unknown'), 404
+    start, end, _ = job.key
+    return jsonify(state=job.state,
+                   error=job.error,
+                   download_url=url_for('render_report', start_date=start, end_date=end)
+                   if job.state == 'done' else None)
+
+
+def send_report(job):
     return send_file(
-        buf,
+        io.BytesIO(job.pdf),
         mimetype='application/pdf',
         as_attachment=True,
         download_name="Activity_Report.pdf"
@@ -247,43 +368,132 @@ def render_report():
 
 @app.route('/upload_to_af', methods=['POST'])
 def upload_to_af():
+    """Starts the AF uploader for the period; only one upload runs at a time."""
     start, end = request.form.get('start_date'), request.form.get('end_date')
+    if not start or not end:
+        return redirect(url_for('index'))
     conn = get_db_connection()
-    jobs = [dict(row) for row in
-            conn.execute("SELECT * FROM jobs WHERE date_of_apply BETWEEN ? AND ?", (start, end)).fetchall()]
-    conn.close()
-    if jobs: subprocess.Popen(['python', 'af_uploader.py', json.dumps(jobs)])
-    return redirect(url_for('index'))
+    snapshot = job_snapshot.get_snapshot(conn, app.config['DATABASE'])
+    version, partitions = load_partitions(conn, start, end)
+    jobs = list(snapshot.iter_records(partition_rows(snapshot, partitions, version, start, end)))
+    if not jobs:
+        return redirect(url_for('index'))
+    try:
+        upload_manager.start(app.config['DATABASE'], jobs)
+    except UploadInProgress as e:
+        return render_template('upload_status.html', message=str(e)), 409
+    return render_template('upload_status.html', message=None)
+
+
+@app.route('/upload_status')
+def upload_status():
+    status = upload_manager.status()
+    if status is None:
+        return jsonify(state='idle')
+    return jsonify(status)
+
+
+@app.route('/backup_db')
+@http_cache.conditional()
+def backup_db():
+    """Streams an online backup (SQLite backup API); ?compress=1 sends it gzipped."""
+    compress = request.args.get('compress') == '1'
+    path = backup.backup_to_temp(app.config['DATABASE'])
+    filename = f"backup_{date.today()}.db" + ('.gz' if compress else '')
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    if not compress:
+        headers['Content-Length'] = str(os.path.getsize(path))
+    # The temp file is removed once the last chunk has been sent
+    return Response(backup.iter_file(path, compress, remove=True),
+                    mimetype='application/gzip' if compress else 'application/x-sqlite3', headers=headers)
+
+
+# --- 4. Status Updates & Deletes (write queue) ---
+
+def wants_json():
+    """True for fetch() calls from the dashboard and API clients, False for plain form posts."""
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+
+def acknowledge(seq, **result):
+    """Answers a queued write once it is committed, so the page shown next already includes it.
+
+    Plain form posts are redirected to the dashboard; JSON clients get the sequence
+    number, with 202 if the write is still queued after write_queue.WAIT_SECONDS.
+    """
+    committed = write_queue.wait(seq)
+    if not wants_json():
+        return redirect(url_for('index'))
+    return jsonify(seq=seq, committed=committed, **result), 200 if committed else 202
 
 
 @app.route('/update_status/<int:job_id>', methods=['POST'])
 def update_status(job_id):
     new_status = request.form.get('status')
-    conn = get_db_connection()
-    conn.execute('UPDATE jobs SET status = ?, last_status_update = ? WHERE id = ?',
-                 (new_status, date.today().isoformat(), job_id))
-    conn.commit()
-    conn.close()
-    return redirect(url_for('index'))
+    if not new_status:
+        return redirect(url_for('index'))
+    seq = write_queue.update_status(app.config['DATABASE'], [job_id], new_status, date.today().isoformat())
+    return acknowledge(seq, job_ids=[job_id], status=new_status)
 
 
 @app.route('/delete_job/<int:job_id>', methods=['POST'])
 def delete_job(job_id):
-    conn = get_db_connection()
-    conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
-    conn.commit()
-    conn.close()
-    return redirect(url_for('index'))
+    seq = write_queue.delete(app.config['DATABASE'], [job_id])
+    return acknowledge(seq, job_ids=[job_id])
 
 
-@app.route('/backup_db')
-def backup_db():
-    with open(DB_NAME, 'rb') as f:
-        data = f.read()
-    return send_file(io.BytesIO(data), mimetype='application/x-sqlite3', as_attachment=True,
-                     download_name=f"backup_{date.today()}.db")
+@app.route('/api/jobs/status', methods=['POST'])
+def bulk_update_status():
+    """Sets one status on many jobs: JSON {"job_ids": [...], "status": "..."} or the dashboard's form fields.
+
+    With wait=0 (JSON field or query parameter) it answers 202 at once; POST /api/writes/flush waits later.
+    """
+    if request.is_json:
+        params = request.get_json(silent=True)
+        params = params if isinstance(params, dict) else {}
+        raw_ids = params.get('job_ids') if isinstance(params.get('job_ids'), list) else []
+    else:
+        params = request.form
+        raw_ids = params.getlist('job_ids')
+    status = params.get('status')
+    try:
+        job_ids = list(dict.fromkeys(int(job_id) for job_id in raw_ids))
+    except (TypeError, ValueError):
+        job_ids = None
+    if not status or not isinstance(status, str) or not job_ids or len(job_ids) > MAX_BULK_JOBS:
+        if not wants_json():
+            return redirect(url_for('index'))
+        return jsonify(error=f"status and 1-{MAX_BULK_JOBS} integer job_ids are required"), 400
+
+    seq = write_queue.update_status(app.config['DATABASE'], job_ids, status, date.today().isoformat())
+    if str(params.get('wait', request.args.get('wait', '1'))).lower() in ('0', 'false'):
+        return jsonify(seq=seq, committed=False, job_ids=job_ids, status=status), 202
+    return acknowledge(seq, job_ids=job_ids, status=status)
+
+
+@app.route('/api/writes/flush', methods=['POST'])
+def flush_writes():
+    """Waits until queued writes are committed: up to ?seq=N (a seq returned by a write) or everything queued."""
+    try:
+        seq = int(request.args['seq']) if request.args.get('seq') else None
+        timeout = max(0.0, min(float(request.args.get('timeout', WAIT_SECONDS)), 30.0))
+    except ValueError:
+        return jsonify(error="seq must be an integer and timeout a number of seconds"), 400
+
+    if seq is None:
+        committed, _ = write_queue.flush(timeout)
+    else:
+        try:
+            committed = write_queue.wait(seq, timeout)
+        except Exception as e:
+            return jsonify(seq=seq, committed=False, error=str(e)), 500
+    version, _ = db.get_data_version(get_db_connection())
+    return jsonify(committed=committed, acknowledged=write_queue.acknowledged(), version=version), \
+        200 if committed else 202
 
 
 if __name__ == '__main__':
-    init_db()
-    app.run(debug=True)
\ No newline at end of file
+    # Development server with the debugger; serve wsgi.py (gunicorn / waitress) for anything else.
+    # Only the reloader's serving child (WERKZEUG_RUN_MAIN) takes backup snapshots, not the watcher process.
+    create_app(backups=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+    app.run(debug=True)
@@ -0,0 +1,254 @@
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import zlib
+from datetime import datetime
+
+import db
+from migrations import migrate, bump_data_version, log_all_jobs_changed
+
+# --- Online backups ---
+# Backups are taken with SQLite's backup API, which copies the database page by
+# page from a consistent snapshot while the app keeps reading and writing.
+# Copying the file directly could capture a half-written page or miss the WAL.
+
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_tracker.db')
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+BACKUP_PAGES = 1024           # pages copied per step (the source is only locked during a step)
+CHUNK_SIZE = 1 << 16          # bytes per streamed chunk
+SNAPSHOT_KEEP = 14            # snapshots kept by the retention policy
+SNAPSHOT_PREFIX = 'job_tracker_'
+
+
+def backup_to_file(db_path, dest_path, pages=BACKUP_PAGES):
+    """Copies the live database at `db_path` into `dest_path` with the backup API."""
+    src = db.connect(db_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        src.backup(dest, pages=pages)
+        # A standalone copy: no WAL side files next to the backup
+        dest.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        dest.close()
+        src.close()
+
+
+def backup_to_temp(db_path, pages=BACKUP_PAGES):
+    """Backs up to a new temp file and returns its path; the caller deletes it."""
+    fd, path = tempfile.mkstemp(prefix='job_tracker_backup_', suffix='.db')
+    os.close(fd)
+    try:
+        backup_to_file(db_path, path, pages)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def iter_file(path, compress=False, remove=False, chunk_size=CHUNK_SIZE):
+    """Yields the file in chunks, optionally as one gzip stream; deletes it afterwards with `remove`."""
+    try:
+        packer = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31 writes gzip framing
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                if packer is not None:
+                    chunk = packer.compress(chunk)
+                if chunk:
+                    yield chunk
+        if packer is not None:
+            yield packer.flush()
+    finally:
+        if remove and os.path.exists(path):
+            os.remove(path)
+
+
+# --- Snapshots with retention ---
+
+def snapshot(db_path=DB_NAME, backup_dir=BACKUP_DIR, keep=SNAPSHOT_KEEP, compress=True):
+    """Writes a timestamped backup into `backup_dir`, then prunes all but the newest `keep` (None: no pruning)."""
+    os.makedirs(backup_dir, exist_ok=True)
+    final_path = _snapshot_path(backup_dir, '.db.gz' if compress else '.db')
+    partial_path = final_path + '.partial'
+
+    temp_path = backup_to_temp(db_path)
+    try:
+        with open(partial_path, 'wb') as out:
+            for chunk in iter_file(temp_path, compress):
+                out.write(chunk)
+        os.replace(partial_path, final_path)  # never leave a truncated snapshot under its final name
+    finally:
+        os.remove(temp_path)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    if keep is not None:
+        prune_snapshots(backup_dir, keep)
+    return final_path
+
+
+def _snapshot_path(backup_dir, suffix):
+    """A new snapshot name; microseconds keep snapshots of the same second apart (os.replace would overwrite)."""
+    while True:
+        path = os.path.join(backup_dir, f"{SNAPSHOT_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{suffix}")
+        if not os.path.exists(path):
+            return path
+
+
+def list_snapshots(backup_dir=BACKUP_DIR):
+    """Snapshot paths in `backup_dir`, newest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [n for n in os.listdir(backup_dir)
+             if n.startswith(SNAPSHOT_PREFIX) and (n.endswith('.db') or n.endswith('.db.gz'))]
+    # The timestamp in the name sorts chronologically
+    return [os.path.join(backup_dir, n) for n in sorted(names, reverse=True)]
+
+
+def prune_snapshots(backup_dir=BACKUP_DIR, keep=SNAPSHOT_KEEP):
+    removed = []
+    for path in list_snapshots(backup_dir)[keep:]:
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+
+class SnapshotScheduler:
+    """Takes a snapshot every `interval_hours` on a daemon thread."""
+
+    def __init__(self, db_path, interval_hours, backup_dir=BACKUP_DIR, keep=SNAPSHOT_KEEP):
+        self.db_path = db_path
+        self.interval = interval_hours * 3600
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='snapshot-scheduler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                path = snapshot(self.db_path, self.backup_dir, self.keep)
+                print(f"💾 Snapshot written: {path}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"❌ Snapshot failed: {e}")
+
+
+# --- Restore ---
+
+def check_integrity(path):
+    """Returns None if `path` is a healthy job tracker database, otherwise the problem found."""
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            if result != 'ok':
+                return f"integrity_check: {result}"
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'").fetchone():
+                return "no jobs table"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return str(e)
+    return None
+
+
+def restore(backup_path, db_path=DB_NAME, backup_dir=BACKUP_DIR):
+    """Replaces the contents of `db_path` with `backup_path` (.db or .db.gz) after validating it.
+
+    The backup is first copied into a temp file and checked there, so nothing
+    that happens to `backup_path` afterwards can affect the restore. The current
+    database is then saved as a snapshot in `backup_dir`, without pruning: the
+    backup being restored may well be the oldest snapshot there. The copy
+    goes through the backup API into the live database, which holds the write
+    lock until the copy is complete, so a running app sees either the old or the
+    new data, never a mix, and the WAL stays consistent.
+    """
+    fd, source = tempfile.mkstemp(prefix='job_tracker_restore_', suffix='.db')
+    try:
+        if backup_path.endswith('.gz'):
+            with os.fdopen(fd, 'wb') as out, gzip.open(backup_path, 'rb') as f:
+                shutil.copyfileobj(f, out, CHUNK_SIZE)
+        else:
+            os.close(fd)
+            # Read-only, so a missing file is an error instead of a new empty database
+            original = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True)
+            copy = sqlite3.connect(source)
+            try:
+                original.backup(copy, pages=BACKUP_PAGES)
+            finally:
+                copy.close()
+                original.close()
+
+        problem = check_integrity(source)
+        if problem:
+            raise ValueError(f"{backup_path} is not a valid backup ({problem}); nothing was restored.")
+
+        safety_copy = snapshot(db_path, backup_dir, keep=None) if os.path.exists(db_path) else None
+
+        live = db.connect(db_path)
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            before = db.get_data_version(live)[0] if _has_table(live, 'data_version') else 0
+            before_seq = live.execute('SELECT IFNULL(MAX(seq), 0) FROM job_changes').fetchone()[0] \
+                if _has_table(live, 'job_changes') else 0
+            src.backup(live, pages=BACKUP_PAGES)
+            migrate(live)  # an older backup may predate the current schema
+            # Versions must keep growing, or caches keyed on them would serve pre-restore data
+            live.execute('UPDATE data_version SET version = MAX(version, ?) WHERE id = 1', (before,))
+            bump_data_version(live)
+            # Likewise the change log: in-memory snapshots must see a full reload after every entry they applied
+            log_all_jobs_changed(live, before_seq)
+            live.commit()
+        finally:
+            src.close()
+            live.close()
+    finally:
+        os.remove(source)
+    return safety_copy
+
+
+def _has_table(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Back up or restore the job tracker database.")
+    parser.add_argument('--db', default=DB_NAME, help="SQLite database to back up / restore into")
+    parser.add_argument('--dir', default=BACKUP_DIR, help="snapshot directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    snap = commands.add_parser('snapshot', help="write a snapshot and apply the retention policy")
+    snap.add_argument('--keep', type=int, default=SNAPSHOT_KEEP)
+    snap.add_argument('--no-compress', action='store_true')
+    commands.add_parser('list', help="list snapshots, newest first")
+    rest = commands.add_parser('restore', help="validate a backup and restore it")
+    rest.add_argument('file')
+    args = parser.parse_args()
+
+    if args.command == 'snapshot':
+        print(f"💾 Snapshot written: {snapshot(args.db, args.dir, args.keep, not args.no_compress)}")
+    elif args.command == 'list':
+        for path in list_snapshots(args.dir):
+            print(f"{path}  ({os.path.getsize(path):,} bytes)")
+    else:
+        try:
+            safety_copy = restore(args.file, args.db, args.dir)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"❌ Restore failed: {e}")
+            sys.exit(1)
+        print(f"✅ Restored {args.db} from {args.file}")
+        if safety_copy:
+            print(f"💾 Previous database saved as: {safety_copy}")
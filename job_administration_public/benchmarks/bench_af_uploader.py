@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+# Make the app modules importable when run as `python benchmarks/bench_af_uploader.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from af_simulator import create_app, SUGGESTION_DELAY, SAVE_LATENCY
+from af_uploader import make_driver, upload_jobs
+from job_records import UPSERT_SQL, with_natural_key
+from migrations import migrate
+from mock_up_data_script import TITTLES_CONFIG, COMPANIES, CITIES
+
+# --- End-to-end throughput of af_uploader against the offline AF simulator ---
+# Starts af_simulator.py on a local port, uploads synthetic jobs with a headless
+# browser and reports jobs/minute plus the latency of every uploader step.
+# Usage: python benchmarks/bench_af_uploader.py [--jobs 20] [--browser chrome] [--save-latency 0.5]
+# Requires Selenium and a matching Edge/Chrome driver.
+
+
+def build_database(path, count):
+    """A fresh database with `count` jobs; returns them as the dicts upload_to_af would send."""
+    conn = db.connect(path)
+    migrate(conn)
+    tags = list(TITTLES_CONFIG)
+    rows = []
+    for i in range(count):
+        tag = tags[i % len(tags)]
+        day = f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+        rows.append(with_natural_key((TITTLES_CONFIG[tag][i % len(TITTLES_CONFIG[tag])], COMPANIES[i % len(COMPANIES)],
+                                      CITIES[i % len(CITIES)], day, 'Applied', day, tag)))
+    conn.executemany(UPSERT_SQL, rows)
+    conn.commit()
+    jobs = [dict(row) for row in conn.execute('SELECT * FROM jobs ORDER BY id')]
+    return conn, jobs
+
+
+def run(count, browser, suggestion_delay, save_latency, failure_rate):
+    sim = create_app(suggestion_delay, save_latency, failure_rate, seed=42)
+    server = make_server('127.0.0.1', 0, sim, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/for-arbetssokande/mina-sidor/aktivitetsrapportera/lagg-till-aktivitet"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, jobs = build_database(os.path.join(tmp, 'bench.db'), count)
+        driver = make_driver(browser, headless=True)
+        try:
+            driver.get(url)
+            started = time.perf_counter()
+            uploaded, failed, skipped, timer = upload_jobs(driver, conn, jobs, target_url=url)
+            elapsed = time.perf_counter() - started
+        finally:
+            driver.quit()
+            conn.close()
+            server.shutdown()
+
+    return {
+        'jobs': count, 'uploaded': uploaded, 'failed': failed, 'skipped': skipped,
+        'received_by_portal': len(sim.config['ACTIVITIES']),
+        'seconds': round(elapsed, 2),
+        'jobs_per_minute': round(uploaded / elapsed * 60, 1) if elapsed > 0 else None,
+        'simulator': {'suggestion_delay': suggestion_delay, 'save_latency': save_latency,
+                      'failure_rate': failure_rate},
+        'steps': {name: {key: round(value, 3) for key, value in stats.items()}
+                  for name, stats in timer.stats().items()},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark af_uploader.py against the offline AF simulator.")
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--browser', choices=['edge', 'chrome'], default='edge')
+    parser.add_argument('--suggestion-delay', type=float, default=SUGGESTION_DELAY)
+    parser.add_argument('--save-latency', type=float, default=SAVE_LATENCY)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    result = run(args.jobs, args.browser, args.suggestion_delay, args.save_latency, args.failure_rate)
+    print(json.dumps(result, indent=4))
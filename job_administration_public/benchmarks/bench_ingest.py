@@ -0,0 +1,79 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Make the app modules importable when run as `python benchmarks/bench_ingest.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_importer import import_jobs_from_json, ingest_directory
+from mock_up_data_script import iter_job_chunks
+
+# --- Compares importing a folder of exports file by file with the directory ingest ---
+# Writes --files monthly exports (alternating JSON and NDJSON) with --rows jobs in
+# total, then imports them into fresh databases: once with one json_importer run
+# per file, and with `json_importer.py <directory>` for each --workers count. The
+# last line is a rerun of the directory ingest, which should do no work.
+# Usage: python benchmarks/bench_ingest.py [--rows 200000] [--files 24] [--workers 1 4]
+
+COLUMNS = ('job_tittle', 'company', 'city', 'date_of_apply', 'status', 'last_status_update', 'tags')
+
+
+def write_exports(directory, rows, files, seed=42):
+    """One file per month starting 2024-01, `rows` jobs spread over them."""
+    rng = np.random.default_rng(seed)
+    months = np.arange(np.datetime64('2024-01'), np.datetime64('2024-01') + files)
+    last_day = (months[-1] + 1).astype('datetime64[D]') - 1
+    by_month = {str(month): [] for month in months}
+    for chunk in iter_job_chunks(rows, str(months[0].astype('datetime64[D]')), str(last_day), rng):
+        for row in chunk:
+            by_month[row[3][:7]].append(dict(zip(COLUMNS, row)))
+    for i, (month, records) in enumerate(by_month.items()):
+        if i % 2:
+            with open(os.path.join(directory, f"{month}.ndjson"), 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        else:
+            with open(os.path.join(directory, f"{month}.json"), 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False)
+
+
+def timed(call):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        call()
+    return time.perf_counter() - started
+
+
+def run(rows, files, worker_counts):
+    with tempfile.TemporaryDirectory() as tmp:
+        exports = os.path.join(tmp, 'exports')
+        os.mkdir(exports)
+        write_exports(exports, rows, files)
+        paths = sorted(os.path.join(exports, name) for name in os.listdir(exports))
+
+        print(f"{'mode':<22} {'seconds':>9} {'rows/sec':>11}")
+        db_path = os.path.join(tmp, 'per_file.db')
+        seconds = timed(lambda: [import_jobs_from_json(path, db_path) for path in paths])
+        print(f"{'one run per file':<22} {seconds:>9.2f} {rows / seconds:>11,.0f}")
+
+        for workers in worker_counts:
+            db_path = os.path.join(tmp, f"directory_{workers}.db")
+            seconds = timed(lambda: ingest_directory(exports, db_path, workers=workers))
+            print(f"{f'directory, {workers} workers':<22} {seconds:>9.2f} {rows / seconds:>11,.0f}")
+        seconds = timed(lambda: ingest_directory(exports, db_path, workers=worker_counts[-1]))
+        print(f"{'directory, rerun':<22} {seconds:>9.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the directory ingest of json_importer.py.")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--files', type=int, default=24)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, min(4, os.cpu_count() or 1)])
+    args = parser.parse_args()
+    run(args.rows, args.files, args.workers)
@@ -0,0 +1,91 @@
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the app modules importable when run as `python benchmarks/bench_partitions.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+import job_snapshot
+from job_export import (FragmentCache, FRAGMENT_CACHE_CHARS, iter_export, iter_job_rows, iter_json_array,
+                        load_partitions, partition_rows)
+from mock_up_data_script import generate_mock_data
+
+# --- Compares range exports over the monthly partitions with the plain snapshot scan ---
+# Per size: finding the rows of RANGE with a scan of the whole snapshot and inside
+# the id ranges of its months, then the JSON export of RANGE without partitions,
+# with an empty fragment cache (cold), again (warm) and after one status update
+# in the range, which re-encodes only that job's month.
+# Usage: python benchmarks/bench_partitions.py [--sizes 10000 100000 1000000] [--repeat 5]
+
+RANGE = ('2024-01-01', '2024-12-31')
+
+
+def median_ms(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def partitioned_export(conn, path, cache):
+    snapshot = job_snapshot.get_snapshot(conn, path)
+    version, partitions = load_partitions(conn, *RANGE)
+    return ''.join(iter_export(snapshot, partitions, version, *RANGE, cache=cache))
+
+
+def update_one_job(conn):
+    conn.execute('UPDATE jobs SET status = ? WHERE id = (SELECT id FROM jobs WHERE date_of_apply BETWEEN ? AND ? '
+                 'ORDER BY random() LIMIT 1)', ('Rejected', *RANGE))
+    conn.commit()
+
+
+def run(sizes, repeat, cache_chars):
+    print(f"{'rows':>9} {'scan rows':>10} {'part rows':>10} {'plain':>10} {'cold':>10} {'warm':>10} "
+          f"{'1 update':>10} {'MB':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"bench_{rows}.db")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_mock_data(path, rows, '2020-01-01', '2025-12-31', seed=rows, allow_duplicates=True)
+            conn = db.connect(path)
+            snapshot = job_snapshot.get_snapshot(conn, path)
+            version, partitions = load_partitions(conn, *RANGE)
+
+            scan, _ = median_ms(lambda: snapshot.in_range(*RANGE), repeat)
+            windowed, _ = median_ms(lambda: partition_rows(snapshot, partitions, version, *RANGE), repeat)
+            plain, expected = median_ms(lambda: ''.join(iter_json_array(iter_job_rows(snapshot, *RANGE))), repeat)
+            cold, _ = median_ms(lambda: partitioned_export(conn, path, FragmentCache(cache_chars)), repeat)
+            cache = FragmentCache(cache_chars)
+            partitioned_export(conn, path, cache)
+            warm, output = median_ms(lambda: partitioned_export(conn, path, cache), repeat)
+            if output != expected:
+                print(f"❌ {rows}: partitioned export differs from the plain one")
+
+            timings = []
+            for _ in range(repeat):
+                update_one_job(conn)
+                started = time.perf_counter()
+                partitioned_export(conn, path, cache)
+                timings.append((time.perf_counter() - started) * 1000)
+            updated = statistics.median(timings)
+            print(f"{rows:>9} {scan:>8.1f}ms {windowed:>8.1f}ms {plain:>8.0f}ms {cold:>8.0f}ms {warm:>8.1f}ms "
+                  f"{updated:>8.1f}ms {len(expected) / 1e6:>6.1f}")
+            conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark range exports over the monthly partitions.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cache-chars', type=int, default=FRAGMENT_CACHE_CHARS,
+                        help="size of the fragment cache (EXPORT_CACHE_CHARS)")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.cache_chars)
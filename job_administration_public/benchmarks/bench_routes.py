@@ -0,0 +1,238 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+# Make the app modules importable when run as `python benchmarks/bench_routes.py`
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import app as tracker
+import http_cache
+import reports
+from job_export import MONTH_MAP
+from json_importer import import_jobs_from_json
+from mock_up_data_script import generate_mock_data, iter_job_chunks
+
+# --- Route and script benchmarks at realistic data sizes ---
+# Builds a database per size with mock_up_data_script, drives the routes through
+# Flask's test client and reports latency percentiles, peak Python memory
+# (tracemalloc) and rows/sec. Results are saved as JSON; --compare prints the
+# change against an earlier result file.
+# Usage: python benchmarks/bench_routes.py [--sizes 1000 10000 100000 1000000] [--repeat 10]
+#                                          [--output results.json] [--compare old.json]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+START_DATE, END_DATE = '2020-01-01', '2025-12-31'
+IMPORT_ROWS = 10_000  # records per json_importer run (capped at the database size)
+MONTH_LABELS = {number: name for name, number in MONTH_MAP.items()}
+
+
+def percentile_summary(latencies_ms):
+    values = np.array(latencies_ms)
+    return {
+        'n': len(values),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3),
+    }
+
+
+def measure(call, repeat, rows=None):
+    """Times `call` `repeat` times after one warm-up call, then once more under tracemalloc for the peak memory.
+
+    `rows` (the number of rows one call handles) adds rows/sec at the median latency.
+    """
+    call()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = percentile_summary(latencies)
+    summary['peak_memory_mb'] = round(peak / 2 ** 20, 2)
+    if rows is not None:
+        summary['rows'] = rows
+        summary['rows_per_sec'] = round(rows / (summary['p50_ms'] / 1000), 1) if summary['p50_ms'] else None
+    return summary
+
+
+def checked(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.path} returned {response.status_code}")
+    return response
+
+
+def drain(response):
+    """Consumes a streamed (buffered=False) response chunk by chunk, so the client never holds the whole body."""
+    checked(response)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    return size
+
+
+def write_import_file(path, rows, seed):
+    """An NDJSON file of `rows` new applications for json_importer."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in iter_job_chunks(rows, '2026-01-01', '2026-12-31', np.random.default_rng(seed)):
+            for job in chunk:
+                f.write(json.dumps(dict(zip(('job_tittle', 'company', 'city', 'date_of_apply', 'status',
+                                             'last_status_update', 'tags'), job)), ensure_ascii=False) + '\n')
+
+
+def bench_size(tmp, rows, repeat):
+    db_path = os.path.join(tmp, f"bench_{rows}.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_mock_data(db_path, rows, START_DATE, END_DATE, seed=rows, allow_duplicates=True)
+
+    tracker.app.config['DATABASE'] = db_path
+    client = tracker.app.test_client()
+    conn = sqlite3.connect(db_path)
+    busiest_month, month_rows = conn.execute('''
+        SELECT substr(date_of_apply, 1, 7) AS month, COUNT(*) FROM jobs GROUP BY month ORDER BY 2 DESC LIMIT 1
+    ''').fetchone()
+    job_ids = [row[0] for row in conn.execute('SELECT id FROM jobs ORDER BY random() LIMIT 1000')]
+    search_rows = conn.execute("SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH '\"saab\"*'").fetchone()[0]
+    conn.close()
+
+    year, month = busiest_month.split('-')
+    month_label = f"{MONTH_LABELS[month]} {year}"
+    month_range = {'start_date': f"{busiest_month}-01", 'end_date': f"{busiest_month}-31"}
+    results = {}
+
+    def uncached(path):
+        # The dashboard keeps rendered pages in http_cache.response_cache; empty it to time the route itself
+        http_cache.response_cache.clear()
+        return checked(client.get(path))
+
+    results['index'] = measure(lambda: uncached('/'), repeat, rows=tracker.PAGE_SIZE)
+    results['index_cached'] = measure(lambda: checked(client.get('/')), repeat, rows=tracker.PAGE_SIZE)
+    etag = checked(client.get('/')).headers['ETag']
+    results['index_not_modified'] = measure(lambda: client.get('/', headers={'If-None-Match': etag}), repeat)
+    search_page = min(search_rows, tracker.PAGE_SIZE)
+    results['index_search'] = measure(lambda: uncached('/?search=saab'), repeat, rows=search_page)
+    results['index_search_cached'] = measure(lambda: checked(client.get('/?search=saab')), repeat, rows=search_page)
+    results['monthly_report_json'] = measure(
+        lambda: drain(client.post('/monthly_report_json', data={'month_selection': month_label}, buffered=False)),
+        repeat, rows=month_rows)
+
+    # Cold renders: a fresh report manager per call, so nothing comes from the PDF cache
+    wait = tracker.REPORT_WAIT_SECONDS
+    tracker.REPORT_WAIT_SECONDS = 3600
+
+    def render_cold():
+        tracker.report_manager = reports.ReportManager()
+        return checked(client.post('/render_report', data=month_range)).get_data()
+
+    results['render_report'] = measure(render_cold, max(1, repeat // 5), rows=month_rows)
+    results['render_report_cached'] = measure(
+        lambda: checked(client.post('/render_report', data=month_range)).get_data(), repeat, rows=month_rows)
+    tracker.REPORT_WAIT_SECONDS = wait
+
+    results['backup_db'] = measure(lambda: drain(client.get('/backup_db', buffered=False)), max(1, repeat // 5),
+                                   rows=rows)
+    status_ids = iter(job_ids * (repeat + 2))
+    results['update_status'] = measure(
+        lambda: checked(client.post(f'/update_status/{next(status_ids)}', data={'status': 'Rejected'})), repeat,
+        rows=1)
+
+    # A new file per run (written up front, outside the timings) so every run inserts new jobs
+    import_rows = min(IMPORT_ROWS, rows)
+    import_runs = max(1, repeat // 5)
+    import_files = []
+    for seed in range(import_runs + 2):
+        import_files.append(os.path.join(tmp, f"import_{rows}_{seed}.ndjson"))
+        write_import_file(import_files[-1], import_rows, seed)
+    import_files = iter(import_files)
+
+    def run_import():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return import_jobs_from_json(next(import_files), db_path)
+
+    results['import_jobs_from_json'] = measure(run_import, import_runs, rows=import_rows)
+
+    tracker.report_manager = reports.ReportManager()
+    return {'database_bytes': os.path.getsize(db_path), 'busiest_month': busiest_month, 'routes': results}
+
+
+def run_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def compare(current, previous):
+    """Prints the p50 change of every route against an earlier result file."""
+    print(f"\n{'rows':>9} {'route':<24} {'before':>10} {'after':>10} {'change':>8}")
+    for size, result in current['sizes'].items():
+        before = previous.get('sizes', {}).get(size)
+        if not before:
+            continue
+        for route, stats in result['routes'].items():
+            old = before['routes'].get(route)
+            if not old:
+                continue
+            change = (stats['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+            print(f"{size:>9} {route:<24} {old['p50_ms']:>8.2f}ms {stats['p50_ms']:>8.2f}ms {change:>+7.1f}%")
+
+
+def run(sizes, repeat):
+    result = {'meta': run_metadata(), 'repeat': repeat, 'sizes': {}}
+    print(f"{'rows':>9} {'route':<24} {'p50':>10} {'p95':>10} {'p99':>10} {'peak MB':>8} {'rows/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            size_result = result['sizes'][str(rows)] = bench_size(tmp, rows, repeat)
+            for route, stats in size_result['routes'].items():
+                rate = f"{stats['rows_per_sec']:,.0f}" if stats.get('rows_per_sec') else '-'
+                print(f"{rows:>9} {route:<24} {stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms "
+                      f"{stats['p99_ms']:>8.2f}ms {stats['peak_memory_mb']:>8.2f} {rate:>12}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the app routes and import script.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help="result file (default: benchmarks/results/routes_<timestamp>.json)")
+    parser.add_argument('--compare', help="an earlier result file to compare against")
+    args = parser.parse_args()
+
+    result = run(args.sizes, args.repeat)
+    output = args.output or os.path.join(RESULTS_DIR, f"routes_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=4)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(result, json.load(f))
@@ -0,0 +1,102 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Make the app modules importable when run as `python benchmarks/bench_search.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_search import install_search, build_match_query
+from mock_up_data_script import TITTLES_CONFIG, COMPANIES, CITIES, STATUS_OPTIONS
+
+# --- Compares the old LIKE '%...%' search with the FTS5 index ---
+# Usage: python benchmarks/bench_search.py [--sizes 10000 100000 1000000] [--repeat 5]
+
+SEARCH_TERMS = ["Saab", "system", "linköping", "second_line", "eng"]
+
+
+def build_database(path, rows, seed=42):
+    """Creates a jobs table with `rows` synthetic applications plus its search index."""
+    rng = np.random.default_rng(seed)
+    categories = list(TITTLES_CONFIG.keys())
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE jobs
+        (
+            id                 INTEGER PRIMARY KEY,
+            job_tittle         TEXT NOT NULL,
+            company            TEXT NOT NULL,
+            city               TEXT,
+            date_of_apply      TEXT,
+            status             TEXT,
+            last_status_update TEXT,
+            tags               TEXT
+        )
+    ''')
+    days = np.datetime64('2020-01-01') + rng.integers(0, 2000, size=rows)
+    tag_idx = rng.integers(0, len(categories), size=rows)
+    company_idx = rng.integers(0, len(COMPANIES), size=rows)
+    city_idx = rng.integers(0, len(CITIES), size=rows)
+    status_idx = rng.integers(0, len(STATUS_OPTIONS), size=rows)
+    title_pick = rng.integers(0, 1000, size=rows)
+
+    def generate():
+        for i in range(rows):
+            tag = categories[tag_idx[i]]
+            titles = TITTLES_CONFIG[tag]
+            day = str(days[i])
+            yield (titles[title_pick[i] % len(titles)], COMPANIES[company_idx[i]], CITIES[city_idx[i]],
+                   day, STATUS_OPTIONS[status_idx[i]], day, tag)
+
+    conn.executemany('''
+        INSERT INTO jobs (job_tittle, company, city, date_of_apply, status, last_status_update, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', generate())
+    conn.execute('CREATE INDEX idx_jobs_date_of_apply ON jobs (date_of_apply)')
+    install_search(conn)
+    conn.commit()
+    return conn
+
+
+def time_query(conn, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def run(sizes, repeat, page_size=50):
+    like_sql = '''SELECT * FROM jobs WHERE job_tittle LIKE ? OR company LIKE ? OR city LIKE ? OR tags LIKE ?
+                  ORDER BY date_of_apply DESC, id DESC LIMIT ?'''
+    fts_sql = '''SELECT jobs.* FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+                 WHERE jobs_fts MATCH ? ORDER BY jobs_fts.rank, jobs.id DESC LIMIT ?'''
+
+    print(f"{'rows':>9} {'term':<12} {'LIKE page':>10} {'FTS page':>10} {'LIKE all':>10} {'FTS all':>10} {'matches':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            conn = build_database(os.path.join(tmp, f"bench_{rows}.db"), rows)
+            for term in SEARCH_TERMS:
+                pattern = f'%{term}%'
+                match = build_match_query(term)
+                like_page, _ = time_query(conn, like_sql, (pattern,) * 4 + (page_size,), repeat)
+                fts_page, _ = time_query(conn, fts_sql, (match, page_size), repeat)
+                like_all, like_n = time_query(conn, like_sql, (pattern,) * 4 + (-1,), repeat)
+                fts_all, fts_n = time_query(conn, fts_sql, (match, -1), repeat)
+                print(f"{rows:>9} {term:<12} {like_page:>8.2f}ms {fts_page:>8.2f}ms "
+                      f"{like_all:>8.2f}ms {fts_all:>8.2f}ms {fts_n:>9}")
+            conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark LIKE vs FTS5 job search.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,91 @@
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Make the app modules importable when run as `python benchmarks/bench_snapshot.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics
+import db
+import job_snapshot
+from mock_up_data_script import generate_mock_data
+
+# --- Compares the in-memory job snapshot with reading the rows from SQLite ---
+# Per size: the time of a full snapshot load, the array memory per row, a delta
+# refresh applying only the latest 10 status updates, one year of export rows
+# from the snapshot against the same rows from SQL, and deriving the analytics columns.
+# Usage: python benchmarks/bench_snapshot.py [--sizes 10000 100000 1000000] [--repeat 5]
+
+RANGE = ('2024-01-01', '2024-12-31')
+SQL_RANGE = (f"SELECT id, {', '.join(job_snapshot.COLUMNS)} FROM jobs "
+             f"WHERE date_of_apply BETWEEN ? AND ? ORDER BY date_of_apply, id")
+
+
+def median_ms(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def sql_rows(conn):
+    columns = ('id',) + job_snapshot.COLUMNS
+    return [dict(zip(columns, row)) for row in conn.execute(SQL_RANGE, RANGE)]
+
+
+def snapshot_rows(snapshot):
+    return list(snapshot.iter_records(snapshot.in_range(*RANGE)))
+
+
+def update_jobs(conn, count=10):
+    conn.execute('UPDATE jobs SET status = ? WHERE id IN (SELECT id FROM jobs ORDER BY random() LIMIT ?)',
+                 ('Rejected', count))
+    conn.commit()
+
+
+def median_refresh_ms(conn, snapshot, repeat):
+    """Times one delta refresh per repeat, each over a fresh batch of updates applied to the previous refresh."""
+    timings = []
+    for _ in range(repeat):
+        update_jobs(conn)  # outside the timing
+        started = time.perf_counter()
+        snapshot = job_snapshot.refresh_snapshot(snapshot, conn)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), snapshot
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>9} {'load':>10} {'bytes/row':>10} {'refresh':>10} {'SQL range':>10} {'snap range':>10} "
+          f"{'analytics':>10} {'range rows':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"bench_{rows}.db")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_mock_data(path, rows, '2020-01-01', '2025-12-31', seed=rows, allow_duplicates=True)
+            conn = db.connect(path)
+            load, snapshot = median_ms(lambda: job_snapshot.load_snapshot(conn), repeat)
+            memory = snapshot.ids.nbytes + sum(codes.nbytes for codes in snapshot.codes.values())
+            refresh, snapshot = median_refresh_ms(conn, snapshot, repeat)
+            sql_range, expected = median_ms(lambda: sql_rows(conn), repeat)
+            snap_range, records = median_ms(lambda: snapshot_rows(snapshot), repeat)
+            derive, _ = median_ms(lambda: analytics.columns_from_snapshot(snapshot), repeat)
+            if records != expected:
+                print(f"❌ {rows}: snapshot rows differ from SQL")
+            print(f"{rows:>9} {load:>8.1f}ms {memory / max(len(snapshot), 1):>10.1f} {refresh:>8.2f}ms "
+                  f"{sql_range:>8.1f}ms {snap_range:>8.1f}ms {derive:>8.1f}ms {len(records):>11}")
+            conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory job snapshot against SQL reads.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
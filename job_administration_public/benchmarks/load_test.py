@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Make the app modules importable when run as `python benchmarks/load_test.py`
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from mock_up_data_script import generate_mock_data
+
+# --- HTTP load test of the serving modes ---
+# Starts the app in each mode on a free local port against the same generated
+# database, then lets --clients concurrent clients request a dashboard-like mix
+# of pages (and a share of status updates) for --seconds. Prints requests/sec and
+# latency percentiles per mode:
+#   dev       app.run(debug=True), the way `python app.py` serves (before)
+#   waitress  python wsgi.py (after, also on Windows)
+#   gunicorn  gunicorn -c gunicorn.conf.py wsgi:app (after, Linux/macOS)
+# Usage: python benchmarks/load_test.py [--modes dev waitress gunicorn] [--rows 100000] [--clients 16]
+#                                       [--seconds 15] [--write-share 0.05] [--output result.json]
+# The clients are threads of this process, so very fast servers can be client-bound;
+# run it on a machine with spare cores.
+
+# (path, weight): the dashboard, the next page, a search and the statistics API
+READ_MIX = (('/', 5), ('/api/jobs?per_page=50', 2), ('/?search=saab', 2), ('/api/analytics', 1))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(mode, port):
+    if mode == 'dev':
+        code = (f"import app; app.create_app(backups=False); "
+                f"app.app.run(port={port}, debug=True, use_reloader=False)")
+        return [sys.executable, '-c', code]
+    if mode == 'waitress':
+        return [sys.executable, 'wsgi.py']
+    if mode == 'gunicorn':
+        return [shutil.which('gunicorn') or 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    raise ValueError(f"unknown mode {mode!r}")
+
+
+def wait_until_up(url, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not answer on {url} within {timeout}s")
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # the status update answers with a redirect to /; don't follow it
+
+
+def run_clients(base_url, clients, seconds, write_share, job_ids, seed):
+    """Runs the clients for `seconds`; returns (latencies in ms, errors, reads, writes)."""
+    paths, weights = zip(*READ_MIX)
+    opener = urllib.request.build_opener(NoRedirect)
+    deadline = time.perf_counter() + seconds
+    lock = threading.Lock()
+    latencies, counts = [], {'errors': 0, 'reads': 0, 'writes': 0}
+
+    def client(index):
+        rng = random.Random(seed + index)
+        local, local_counts = [], {'errors': 0, 'reads': 0, 'writes': 0}
+        while time.perf_counter() < deadline:
+            write = rng.random() < write_share
+            if write:
+                data = b'status=Rejected'
+                request = urllib.request.Request(f"{base_url}/update_status/{rng.choice(job_ids)}", data=data)
+            else:
+                request = urllib.request.Request(base_url + rng.choices(paths, weights)[0])
+            started = time.perf_counter()
+            try:
+                with opener.open(request, timeout=30) as response:
+                    response.read()
+            except urllib.error.HTTPError as e:
+                if e.code != 302:
+                    local_counts['errors'] += 1
+                    continue
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                local_counts['errors'] += 1
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+            local_counts['writes' if write else 'reads'] += 1
+        with lock:
+            latencies.extend(local)
+            for key, value in local_counts.items():
+                counts[key] += value
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return latencies, counts
+
+
+def run_mode(mode, db_path, clients, seconds, write_share, job_ids):
+    port = free_port()
+    env = {**os.environ, 'JOB_TRACKER_DB': db_path, 'PORT': str(port), 'HOST': '127.0.0.1',
+           'PYTHONIOENCODING': 'utf-8'}
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(server_command(mode, port), cwd=APP_DIR, env=env, stdout=log,
+                               stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url + '/', process)
+        run_clients(base_url, clients, 2, 0.0, job_ids, seed=0)  # warm-up: caches, pools, imports
+        started = time.perf_counter()
+        latencies, counts = run_clients(base_url, clients, seconds, write_share, job_ids, seed=1)
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+    values = np.array(latencies) if latencies else np.array([0.0])
+    return {
+        'requests': len(latencies), **counts,
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+        'p99_ms': round(float(np.percentile(values, 99)), 2),
+    }
+
+
+def run(modes, rows, clients, seconds, write_share):
+    result = {'rows': rows, 'clients': clients, 'seconds': seconds, 'write_share': write_share, 'modes': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'load.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_mock_data(db_path, rows, '2020-01-01', '2025-12-31', seed=rows, allow_duplicates=True)
+        job_ids = list(range(1, rows + 1))
+
+        print(f"{'mode':<10} {'req/sec':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'errors':>7}")
+        for mode in modes:
+            try:
+                stats = run_mode(mode, db_path, clients, seconds, write_share, job_ids)
+            except (OSError, RuntimeError) as e:
+                print(f"{mode:<10} ❌ {e}")
+                result['modes'][mode] = {'error': str(e)}
+                continue
+            result['modes'][mode] = stats
+            print(f"{mode:<10} {stats['requests_per_sec']:>10,.1f} {stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms "
+                  f"{stats['p99_ms']:>8.2f}ms {stats['errors']:>7}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare requests/sec of the dev server, waitress and gunicorn.")
+    parser.add_argument('--modes', nargs='+', choices=['dev', 'waitress', 'gunicorn'],
+                        default=['dev', 'waitress', 'gunicorn'])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--write-share', type=float, default=0.05, help="fraction of requests that update a status")
+    parser.add_argument('--output', help="also save the result as JSON")
+    args = parser.parse_args()
+
+    result = run(args.modes, args.rows, args.clients, args.seconds, args.write_share)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=4)
+        print(f"\n💾 Results saved to {args.output}")
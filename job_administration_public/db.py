@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+
+from flask import current_app, g
+
+# --- Connection management ---
+# Connections are opened once with the pragmas below and reused through a small
+# per-database pool. Each request borrows one connection (stored on `g`) and
+# returns it on app-context teardown, even when the route raised.
+
+DB_NAME = 'job_tracker.db'
+POOL_SIZE = 8
+
+PRAGMAS = (
+    # WAL lets dashboard reads proceed while a status update or import is writing
+    "PRAGMA journal_mode = WAL",
+    # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",      # ~20 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",    # memory-map up to 256 MB of the database file
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",      # wait up to 5 s for the write lock instead of failing
+)
+
+
+def connect(db_path=DB_NAME, factory=sqlite3.Connection):
+    """Opens a tuned connection returning sqlite3.Row rows; `factory` is the Connection class to use."""
+    # Pooled connections move between worker threads, but only one request uses them at a time
+    conn = sqlite3.connect(db_path, check_same_thread=False, factory=factory)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def execute_script(conn, script):
+    """Runs the `;`-separated statements of `script` one by one.
+
+    Unlike conn.executescript, which commits any open transaction first, the
+    statements join the caller's transaction, so a migration can be rolled back whole.
+    """
+    *parts, rest = script.split(';')
+    statement = ''
+    for part in parts:
+        statement += part + ';'
+        if sqlite3.complete_statement(statement):  # not a ';' inside a trigger body, string or comment
+            conn.execute(statement)
+            statement = ''
+    if (statement + rest).strip():
+        conn.execute(statement + rest)
+
+
+def get_data_version(conn):
+    """Returns (version, updated_at) of the jobs data; version grows with every change."""
+    row = conn.execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+    return (row[0], row[1]) if row else (0, None)
+
+
+class ConnectionPool:
+    """A thread-safe LIFO pool of connections to one database file."""
+
+    def __init__(self, db_path, size=POOL_SIZE, factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.size = size
+        self.factory = factory
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return connect(self.db_path, self.factory)
+
+    def release(self, conn):
+        # Never hand a half-finished transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def get_pool(app=None):
+    """Returns the pool for the app's configured DATABASE, (re)creating it when the path changes."""
+    app = app or current_app
+    pool = app.extensions.get('db_pool')
+    db_path = app.config['DATABASE']
+    if pool is None or pool.db_path != db_path:
+        if pool is not None:
+            pool.close_all()
+        pool = app.extensions['db_pool'] = ConnectionPool(db_path, app.config.get('DB_POOL_SIZE', POOL_SIZE),
+                                                          app.extensions.get('db_connection_factory', sqlite3.Connection))
+    return pool
+
+
+def get_db():
+    """The connection bound to the current request, borrowed from the pool on first use."""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+
+def close_db(exc=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+
+def init_app(app):
+    app.config.setdefault('DATABASE', DB_NAME)
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+
+# --- gunicorn settings for wsgi:app ---
+# Usage: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# SQLite accepts one writer at a time; in WAL mode readers never wait for it.
+# Extra processes therefore only add read (and Python CPU) parallelism, while
+# every write still queues on the database lock (busy_timeout, see db.py). A few
+# processes with a few threads each covers the dashboard's read-heavy load;
+# more processes mostly add lock contention for imports and status updates.
+
+bind = f"{os.environ.get('HOST', '127.0.0.1')}:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count())))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 4))  # keep <= DB_POOL_SIZE (8) connections per process
+
+# Import wsgi.py once in the master: migrations run a single time before any
+# worker starts, and the backup snapshot thread lives only in the master.
+# (create_app opens no pooled connection, so no SQLite handle crosses the fork.)
+preload_app = True
+
+# Streams (exports, backups) and the PDF wait can take a while on large databases
+timeout = 120
+graceful_timeout = 30
+accesslog = '-'
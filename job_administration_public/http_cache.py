@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timezone
+from functools import wraps
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+
+import db
+
+# --- HTTP caching on the data version ---
+# Every change to `jobs` bumps data_version (triggers, see migrations.py). A view
+# wrapped in @conditional gets an ETag built from (database, route, parameters,
+# data version) and a Last-Modified from data_version.updated_at. A GET that
+# sends back a matching If-None-Match / If-Modified-Since is answered with
+# 304 Not Modified after a single-row read of data_version; the view (and the
+# jobs table) is never touched. With store=True the response itself is also
+# kept in an in-process LRU, so a client without a copy gets it just as cheaply.
+#
+# The version is read before the view runs, so a write that lands in between
+# can only make a stored body newer than its key, never older.
+
+CACHE_ENTRIES = 64
+CACHE_MAX_BODY = 4 * 2 ** 20  # larger responses are revalidated but never stored
+
+
+class ResponseCache:
+    """A thread-safe LRU of finished responses keyed by (database, route, parameters, day, version)."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES, max_body=CACHE_MAX_BODY):
+        self.max_entries = max_entries
+        self.max_body = max_body
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, response):
+        """Stores a buffered 200 response; streamed or oversized ones are skipped."""
+        if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+            return
+        body = response.get_data()
+        if len(body) > self.max_body:
+            return
+        *route, version = key
+        with self._lock:
+            # Entries for an older version of the same route can never be hit again
+            for old in [k for k in self._entries if k[:-1] == tuple(route) and k[-1] < version]:
+                del self._entries[old]
+            self._entries[key] = (body, response.status_code, list(response.headers.items()))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _last_modified(updated_at, daily):
+    """data_version.updated_at (UTC text) as a datetime; with `daily` never before local midnight."""
+    modified = datetime.fromisoformat(updated_at).replace(tzinfo=timezone.utc) if updated_at \
+        else datetime.fromtimestamp(0, timezone.utc)
+    if daily:
+        midnight = datetime.combine(date.today(), time()).astimezone(timezone.utc)
+        modified = max(modified, midnight)
+    return modified
+
+
+def conditional(store=False, daily=False):
+    """ETag / Last-Modified and 304 handling for a GET view whose output depends only on the jobs data.
+
+    store: keep the response in the in-process LRU (for small, buffered pages).
+    daily: the output also depends on today's date (e.g. 'time waiting'), so the
+           day is part of the ETag and Last-Modified never lies before midnight.
+    Other methods (form posts) are passed straight to the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            version, updated_at = db.get_data_version(db.get_db())
+            route = (current_app.config['DATABASE'], request.endpoint, tuple(sorted(request.args.items(multi=True))),
+                     date.today().isoformat() if daily else None)
+            etag = hashlib.sha1(repr((*route, version)).encode('utf-8')).hexdigest()[:20]
+            last_modified = _last_modified(updated_at, daily)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                cached = response_cache.get((*route, version)) if store else None
+                if cached is not None:
+                    body, status, headers = cached
+                    response = Response(body, status, headers)
+                else:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    # Responses that must not be reused (e.g. 'report still rendering') opt out with no-store
+                    if response.status_code != 200 or response.cache_control.no_store:
+                        return response
+                    if store:
+                        response_cache.put((*route, version), response)
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            # Revalidate on every use: the ETag is cheap to check and the data can change at any time
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
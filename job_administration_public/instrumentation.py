@@ -0,0 +1,273 @@
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, before_render_template, g, has_request_context, request, template_rendered
+
+# --- Opt-in request instrumentation ---
+# Enabled with INSTRUMENTATION=1. Every request is split into three phases:
+#   db       time inside SQLite (execute + fetch, measured by TimedCursor)
+#   render   Jinja template rendering (Flask template signals)
+#   app      everything else (Python processing in the route)
+# The phases are sent in a Server-Timing header (visible in the browser dev
+# tools) and aggregated in Prometheus text format on /metrics. With SQL_LOG=1
+# every statement is logged with its time (execute + fetch, including the
+# triggers it fires) on the 'job_tracker.sql' logger once its rows are read.
+# Streamed responses (exports, backups) are timed up to their first byte.
+
+SQL_LOG = logging.getLogger('job_tracker.sql')
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('db', 'render', 'app')
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels=''):
+        """Prometheus text lines: cumulative buckets, sum and count."""
+        sep = ',' if labels else ''
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.sum:.6f}')
+        lines.append(f'{name}_count{suffix} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """Thread-safe counters and histograms, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}          # (endpoint, method, status) -> count
+        self.request_seconds = {}   # endpoint -> Histogram
+        self.phase_seconds = {}     # (endpoint, phase) -> total seconds
+        self.sql_seconds = Histogram()
+        self.report_seconds = Histogram()
+        self.write_batch_seconds = Histogram()
+        self.writes = 0
+
+    def observe_request(self, endpoint, method, status, seconds, phases):
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_seconds.setdefault(endpoint, Histogram()).observe(seconds)
+            for phase, value in phases.items():
+                self.phase_seconds[endpoint, phase] = self.phase_seconds.get((endpoint, phase), 0.0) + value
+
+    def observe_sql(self, seconds):
+        with self._lock:
+            self.sql_seconds.observe(seconds)
+
+    def observe_report(self, seconds):
+        with self._lock:
+            self.report_seconds.observe(seconds)
+
+    def observe_write_batch(self, writes, seconds):
+        with self._lock:
+            self.writes += writes
+            self.write_batch_seconds.observe(seconds)
+
+    def render(self):
+        with self._lock:
+            lines = ['# HELP job_tracker_requests_total HTTP requests handled.',
+                     '# TYPE job_tracker_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'job_tracker_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            lines += ['# HELP job_tracker_request_duration_seconds Request latency up to the first response byte.',
+                      '# TYPE job_tracker_request_duration_seconds histogram']
+            for endpoint, histogram in sorted(self.request_seconds.items()):
+                lines += histogram.lines('job_tracker_request_duration_seconds', f'endpoint="{endpoint}"')
+
+            lines += ['# HELP job_tracker_request_phase_seconds_total Time spent per request phase (db, render, app).',
+                      '# TYPE job_tracker_request_phase_seconds_total counter']
+            for (endpoint, phase), seconds in sorted(self.phase_seconds.items()):
+                lines.append(f'job_tracker_request_phase_seconds_total{{endpoint="{endpoint}",phase="{phase}"}} '
+                             f'{seconds:.6f}')
+
+            lines += ['# HELP job_tracker_sql_query_duration_seconds SQLite statement time (execute + fetch).',
+                      '# TYPE job_tracker_sql_query_duration_seconds histogram']
+            lines += self.sql_seconds.lines('job_tracker_sql_query_duration_seconds')
+
+            lines += ['# HELP job_tracker_report_render_seconds FPDF rendering time of activity reports.',
+                      '# TYPE job_tracker_report_render_seconds histogram']
+            lines += self.report_seconds.lines('job_tracker_report_render_seconds')
+
+            lines += ['# HELP job_tracker_writes_total Status updates and deletes committed by the write queue.',
+                      '# TYPE job_tracker_writes_total counter',
+                      f'job_tracker_writes_total {self.writes}',
+                      '# HELP job_tracker_write_batch_seconds Transaction time of one write queue batch.',
+                      '# TYPE job_tracker_write_batch_seconds histogram']
+            lines += self.write_batch_seconds.lines('job_tracker_write_batch_seconds')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+# --- SQL timing ---
+
+def _add_db_time(seconds, statement=False):
+    metrics.observe_sql(seconds)
+    if has_request_context() and 'timings' in g:
+        g.timings['db'] += seconds
+        g.sql_queries += statement
+
+
+class TimedCursor(sqlite3.Cursor):
+    """A cursor that adds the time spent executing and fetching to the current request.
+
+    With SQL_LOG a statement is logged with its time once all its rows are
+    fetched, or when the cursor is closed, re-executed or dropped before that.
+    """
+
+    _statement = None  # the statement waiting to be logged
+    _elapsed = 0.0
+
+    def _timed(self, method, *args, statement=False):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            _add_db_time(elapsed, statement)
+            if self._statement is not None:
+                self._elapsed += elapsed
+
+    def _log(self):
+        if self._statement is not None:
+            SQL_LOG.debug('%.2f ms  %s', self._elapsed * 1000, self._statement)
+            self._statement = None
+
+    def _run(self, method, sql, *args):
+        self._log()
+        if TimedConnection.trace_sql:
+            self._statement, self._elapsed = sql, 0.0
+        try:
+            self._timed(method, sql, *args, statement=True)
+        except sqlite3.Error:
+            self._log()
+            raise
+        if self.description is None:  # no rows to fetch
+            self._log()
+        return self
+
+    def execute(self, sql, *args):
+        return self._run(super().execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return self._run(super().executemany, sql, *args)
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._log()
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(super().fetchmany, *args)
+        if not rows:
+            self._log()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._log()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._log()
+            raise
+
+    def close(self):
+        self._log()
+        super().close()
+
+    def __del__(self):
+        self._log()
+
+
+class TimedConnection(sqlite3.Connection):
+    """A connection whose execute shortcuts use TimedCursor, which can log every statement with its time."""
+
+    trace_sql = False  # set from the SQL_LOG config in init_app
+
+    def execute(self, *args):
+        return self.cursor(TimedCursor).execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor(TimedCursor).executemany(*args)
+
+
+# --- Request hooks ---
+
+def _start_request():
+    g.timings = dict.fromkeys(PHASES, 0.0)
+    g.sql_queries = 0
+    g.request_started = time.perf_counter()
+
+
+def _before_render(sender, template, context, **extra):
+    if 'timings' in g:
+        g.render_started = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    if 'timings' in g and 'render_started' in g:
+        g.timings['render'] += time.perf_counter() - g.pop('render_started')
+
+
+def _finish_request(response):
+    if 'timings' not in g:
+        return response
+    total = time.perf_counter() - g.request_started
+    timings = g.timings
+    timings['app'] = max(0.0, total - timings['db'] - timings['render'])
+
+    response.headers['Server-Timing'] = ', '.join(
+        [f'db;dur={timings["db"] * 1000:.2f};desc="SQLite ({g.sql_queries} queries)"',
+         f'render;dur={timings["render"] * 1000:.2f};desc="Jinja"',
+         f'app;dur={timings["app"] * 1000:.2f};desc="Python"',
+         f'total;dur={total * 1000:.2f}'])
+    metrics.observe_request(request.endpoint or 'unknown', request.method, response.status_code, total, timings)
+    return response
+
+
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app, report_manager=None, write_queue=None):
+    """Turns instrumentation on for `app`. Must run before the first database connection is pooled."""
+    TimedConnection.trace_sql = app.config.get('SQL_LOG', False)
+    if TimedConnection.trace_sql:
+        logging.basicConfig()
+        SQL_LOG.setLevel(logging.DEBUG)
+    app.extensions['db_connection_factory'] = TimedConnection
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
+    if report_manager is not None:
+        report_manager.on_rendered = metrics.observe_report
+    if write_queue is not None:
+        write_queue.factory = TimedConnection
+        write_queue.on_batch = metrics.observe_write_batch
@@ -0,0 +1,201 @@
+import json
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+import db
+
+# --- Streaming exports ---
+# Exports select a date range from the in-memory job snapshot (job_snapshot.py)
+# and yield the response piece by piece, so the download starts before the last
+# row has been encoded.
+
+# The columns users see in exports (natural_key is internal)
+EXPORT_COLUMNS = ('id', 'job_tittle', 'company', 'city', 'date_of_apply', 'status', 'last_status_update', 'tags')
+
+MONTH_MAP = {'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04', 'Maj': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
+             'Sep': '09', 'Okt': '10', 'Nov': '11', 'Dec': '12'}
+
+
+def month_label_to_range(label):
+    """'Okt 2025' -> ('2025-10-01', '2025-10-31'), an inclusive date range. Raises ValueError."""
+    m_name, year = label.split(' ')
+    if m_name not in MONTH_MAP or not year.isdigit():
+        raise ValueError(f"Unknown month label: {label}")
+    return f"{year}-{MONTH_MAP[m_name]}-01", f"{year}-{MONTH_MAP[m_name]}-31"
+
+
+def iter_job_rows(snapshot, start, end):
+    """Yields jobs applied for between start and end (inclusive) as dicts, oldest first."""
+    return snapshot.iter_records(snapshot.in_range(start, end), EXPORT_COLUMNS)
+
+
+def _json_body(job):
+    """One job as an element of the pretty-printed list."""
+    return json.dumps(job, indent=4, ensure_ascii=False).replace('\n', '\n    ')
+
+
+def iter_json_array(jobs):
+    """Yields a pretty-printed JSON list (same layout as json.dumps(indent=4)) one job at a time."""
+    first = True
+    yield '['
+    for job in jobs:
+        yield ('\n    ' if first else ',\n    ') + _json_body(job)
+        first = False
+    yield '\n]' if not first else ']'
+
+
+def iter_ndjson(jobs):
+    for job in jobs:
+        yield json.dumps(job, ensure_ascii=False) + '\n'
+
+
+def iter_encoded(chunks, compress=False):
+    """UTF-8 encodes text chunks, optionally as one gzip stream."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+        return
+
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header and trailer
+    for chunk in chunks:
+        data = gzip.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield gzip.flush()
+
+
+# --- Monthly partitions ---
+# stats_month (job_stats.py) holds, per month, the job count, an id range that
+# covers the month's jobs and a revision that changes with every write to the
+# month. A range export reads the months of the range from it and searches the
+# snapshot only inside their id ranges. It then encodes month by month and keeps
+# each encoded month in a fragment cache under its revision: a yearly export after
+# one status update re-encodes the one month that changed and reuses the others.
+
+MONTH_PATTERN = re.compile(r'[0-9]{4}-[01][0-9]')  # the GLOB that gives a date its stats_month month
+FRAGMENT_CACHE_CHARS = 32_000_000
+
+
+class FragmentCache:
+    """Encoded months by key, least recently used dropped first, bounded by their total length in characters."""
+
+    def __init__(self, max_chars=FRAGMENT_CACHE_CHARS):
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._fragments = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        if len(fragment) > self.max_chars:
+            return
+        with self._lock:
+            if key in self._fragments:
+                return
+            self._fragments[key] = fragment
+            self._chars += len(fragment)
+            while self._chars > self.max_chars:
+                _, dropped = self._fragments.popitem(last=False)
+                self._chars -= len(dropped)
+
+
+fragment_cache = FragmentCache()
+
+
+def load_partitions(conn, start, end):
+    """The data version and the (month, count, min_id, max_id, revision) rows of the months the range touches."""
+    conn.execute('BEGIN')
+    try:
+        version, _ = db.get_data_version(conn)
+        partitions = conn.execute('''
+            SELECT month, count, min_id, max_id, revision FROM stats_month
+            WHERE count > 0 AND month BETWEEN substr(?, 1, 7) AND substr(?, 1, 7)
+            ORDER BY month
+        ''', (start, end)).fetchall()
+    finally:
+        conn.rollback()
+    return version, partitions
+
+
+def _partitioned(snapshot, version, start, end):
+    """Whether the partitions read at `version` describe the snapshot's rows of the range.
+
+    Not if either side has seen writes the other has not, or if the range holds a
+    date without a month (not YYYY-MM...), which no partition covers.
+    """
+    return version == snapshot.version and not any(
+        value is not None and start <= value <= end and not MONTH_PATTERN.match(value)
+        for value in snapshot.vocabulary('date_of_apply'))
+
+
+def _id_window(partitions):
+    """(lowest, highest) id over the partitions; an empty window without any."""
+    if not partitions:
+        return 0, -1
+    return min(p[2] for p in partitions), max(p[3] for p in partitions)
+
+
+def partition_rows(snapshot, partitions, version, start, end):
+    """The row positions of snapshot.in_range(start, end), searched only inside the id ranges of the partitions."""
+    if not _partitioned(snapshot, version, start, end):
+        return snapshot.in_range(start, end)
+    return snapshot.in_range(start, end, ids=_id_window(partitions))
+
+
+def _encode_month(snapshot, rows, ndjson):
+    """A month's jobs as they appear in the export; JSON elements each start with their ',' separator."""
+    jobs = snapshot.iter_records(rows, EXPORT_COLUMNS)
+    if ndjson:
+        return ''.join(iter_ndjson(jobs))
+    return ''.join(',\n    ' + _json_body(job) for job in jobs)
+
+
+def _iter_fragments(snapshot, partitions, start, end, ndjson, cache):
+    """The encoded months of the range in order, taken from `cache` where the month's revision is unchanged."""
+    rows = snapshot.in_range(start, end, ids=_id_window(partitions))
+    dates = snapshot.values('date_of_apply')[snapshot.codes['date_of_apply'][rows]]
+    # Rows are ordered by date, so each month is one slice of them
+    bounds = [int(np.searchsorted(dates, month, 'left')) for month, *_ in partitions] + [len(rows)]
+    for i, (month, _, _, _, revision) in enumerate(partitions):
+        # A month the range covers whole is stored once for every range that covers it
+        key = (snapshot.generation, month, revision, start if start[:7] == month else None,
+               end if end[:7] == month else None, ndjson)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = _encode_month(snapshot, rows[bounds[i]:bounds[i + 1]], ndjson)
+            cache.put(key, fragment)
+        yield fragment
+
+
+def iter_export(snapshot, partitions, version, start, end, ndjson=False, cache=fragment_cache):
+    """Yields the same text as iter_json_array/iter_ndjson over iter_job_rows, reusing cached months."""
+    if not _partitioned(snapshot, version, start, end):
+        jobs = iter_job_rows(snapshot, start, end)
+        yield from iter_ndjson(jobs) if ndjson else iter_json_array(jobs)
+        return
+    fragments = _iter_fragments(snapshot, partitions, start, end, ndjson, cache)
+    if ndjson:
+        yield from fragments
+        return
+    first = True
+    yield '['
+    for fragment in fragments:
+        if fragment:
+            yield fragment[1:] if first else fragment
+            first = False
+    yield '\n]' if not first else ']'
@@ -0,0 +1,93 @@
+import re
+from datetime import date, datetime
+
+# --- Writing job rows ---
+# Every job carries a deterministic natural key (normalized title + company +
+# application date) backed by a unique index, so re-importing an exported
+# Report_<month>.json or re-submitting the form never duplicates a job.
+
+# The 7 data columns plus the natural key, in the order used by job rows
+JOB_COLUMNS = ('job_tittle', 'company', 'city', 'date_of_apply', 'status', 'last_status_update', 'tags',
+               'natural_key')
+
+# An existing job is only updated when the incoming row carries a newer status
+# update; older or identical data (e.g. an old export) is skipped.
+UPSERT_SQL = f'''
+    INSERT INTO jobs ({', '.join(JOB_COLUMNS)})
+    VALUES ({', '.join('?' * len(JOB_COLUMNS))})
+    ON CONFLICT(natural_key) DO UPDATE SET
+        city               = excluded.city,
+        status             = excluded.status,
+        last_status_update = excluded.last_status_update,
+        tags               = excluded.tags
+    WHERE excluded.last_status_update > IFNULL(jobs.last_status_update, '')
+'''
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', str(text or '')).strip().casefold()
+
+
+def normalize_date(value):
+    """'2025-10-05', '2025/10/5', '20251005' or '2025-10-05T14:30' -> '2025-10-05'.
+
+    Dates are stored as ISO 'YYYY-MM-DD' so SQLite can compare, group and
+    subtract them (julianday, strftime) without parsing in Python. Raises
+    ValueError for anything that is not a valid date.
+    """
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value or '').strip().replace('/', '-')
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        # (strptime also accepts unpadded months and days: '2025-1-5')
+        return datetime.strptime(text, '%Y-%m-%d').date().isoformat()
+
+
+def natural_key(job_tittle, company, date_of_apply):
+    """'  Systemingenjör ', 'SAAB', '2025-10-05' -> 'systemingenjör|saab|2025-10-05'."""
+    return f"{_normalize(job_tittle)}|{_normalize(company)}|{(date_of_apply or '').strip()}"
+
+
+def with_natural_key(row):
+    """Appends the natural key to a 7-column job row."""
+    return (*row, natural_key(row[0], row[1], row[3]))
+
+
+def collapse_duplicates(rows):
+    """Keeps one row per natural key, preferring the newest last_status_update.
+
+    Returns (unique_rows, duplicate_count). Rows must include the natural key.
+    """
+    best = {}
+    for row in rows:
+        current = best.get(row[7])
+        if current is None or (row[5] or '') > (current[5] or ''):
+            best[row[7]] = row
+    return list(best.values()), len(rows) - len(best)
+
+
+def classify_rows(conn, rows):
+    """Counts how UPSERT_SQL would treat `rows` (unique natural keys) in one joined query.
+
+    Returns (to_insert, to_update, to_skip) without modifying `jobs`.
+    """
+    conn.execute('''
+                 CREATE TEMP TABLE IF NOT EXISTS incoming_keys
+                 (
+                     natural_key        TEXT PRIMARY KEY,
+                     last_status_update TEXT
+                 )
+                 ''')
+    conn.execute('DELETE FROM incoming_keys')
+    conn.executemany('INSERT INTO incoming_keys VALUES (?, ?)', ((row[7], row[5]) for row in rows))
+    inserts, updates = conn.execute('''
+        SELECT IFNULL(SUM(jobs.id IS NULL), 0),
+               IFNULL(SUM(jobs.id IS NOT NULL
+                   AND incoming_keys.last_status_update > IFNULL(jobs.last_status_update, '')), 0)
+        FROM incoming_keys LEFT JOIN jobs ON jobs.natural_key = incoming_keys.natural_key
+    ''').fetchone()
+    return inserts, updates, len(rows) - inserts - updates
@@ -0,0 +1,88 @@
+import re
+import sqlite3
+import sys
+
+import db
+
+# --- Full-text search over jobs (SQLite FTS5) ---
+# `jobs_fts` is an external-content index on the searchable columns of `jobs`.
+# Triggers keep it in sync with every writer, so search never scans `jobs`.
+# The schema itself is installed by migrations.py.
+
+DB_NAME = 'job_tracker.db'
+SEARCH_COLUMNS = ('job_tittle', 'company', 'city', 'tags')
+
+# Title matches weigh most, then company, tags and city.
+RANK_FUNCTION = 'bm25(10.0, 5.0, 1.0, 2.0)'
+
+SEARCH_TABLE = f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        {', '.join(SEARCH_COLUMNS)},
+        content='jobs',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    );
+'''
+
+_NEW_VALUES = ', '.join(f'NEW.{col}' for col in SEARCH_COLUMNS)
+_OLD_VALUES = ', '.join(f'OLD.{col}' for col in SEARCH_COLUMNS)
+_COLUMNS = ', '.join(SEARCH_COLUMNS)
+
+SEARCH_TRIGGERS = f'''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs
+    BEGIN
+        INSERT INTO jobs_fts (rowid, {_COLUMNS}) VALUES (NEW.id, {_NEW_VALUES});
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs
+    BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_OLD_VALUES});
+    END;
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF {_COLUMNS} ON jobs
+    BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, {_COLUMNS}) VALUES ('delete', OLD.id, {_OLD_VALUES});
+        INSERT INTO jobs_fts (rowid, {_COLUMNS}) VALUES (NEW.id, {_NEW_VALUES});
+    END;
+'''
+
+
+def install_search(conn):
+    """Creates the FTS index and its triggers and (re)indexes all existing rows. Caller commits."""
+    db.execute_script(conn, SEARCH_TABLE + SEARCH_TRIGGERS)
+    rebuild_search(conn)
+
+
+def rebuild_search(conn):
+    """Re-indexes every row of `jobs` and re-applies the ranking weights. Caller commits."""
+    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', ?)", (RANK_FUNCTION,))
+
+
+def index_jobs(conn, after_id):
+    """Adds every job with id > after_id to the index (bulk inserts with triggers suspended)."""
+    conn.execute(f'INSERT INTO jobs_fts (rowid, {_COLUMNS}) SELECT id, {_COLUMNS} FROM jobs WHERE id > ?',
+                 (after_id,))
+
+
+def build_match_query(search_query):
+    """Turns free text into an FTS5 query: every word must match, as a prefix.
+
+    'sys lin' -> '"sys"* "lin"*'. Returns None when the text has no searchable words.
+    """
+    words = re.findall(r'\w+', search_query)
+    if not words:
+        return None
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+if __name__ == '__main__':
+    # Usage: python job_search.py [database]   (rebuilds the search index)
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    from migrations import migrate
+
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    rebuild_search(conn)
+    conn.commit()
+    conn.close()
+    print(f"✅ Search index rebuilt for {db_path}.")
@@ -0,0 +1,240 @@
+import sqlite3
+import sys
+
+import db
+
+# --- Materialized statistics for the dashboard ---
+# The summary tables below are kept consistent by triggers on `jobs` and
+# `job_tags`, so every writer (app routes, json_importer, mock_up_data_script)
+# updates them for free and index() can read the statistics panel without
+# scanning the jobs table. The schema itself is installed by migrations.py.
+#
+# stats_month doubles as the monthly partition metadata of `jobs`: next to the
+# count it keeps an id range covering every job of the month (it may get wider
+# than needed after deletes, never narrower) and a revision that grows with every
+# write touching the month. Range exports use it to look only at the months and
+# id windows of a range, and to reuse what they encoded for unchanged months.
+
+DB_NAME = 'job_tracker.db'
+DEFAULT_STATUS = 'Waiting for response'
+
+STATS_TABLES = '''
+    CREATE TABLE IF NOT EXISTS stats_status
+    (
+        status TEXT PRIMARY KEY,
+        count  INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS stats_month
+    (
+        month    TEXT PRIMARY KEY,  -- 'YYYY-MM'
+        count    INTEGER NOT NULL DEFAULT 0,
+        min_id   INTEGER,           -- NULL while the month has no jobs
+        max_id   INTEGER,
+        revision INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS stats_tag
+    (
+        tag   TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+'''
+
+STATS_TRIGGERS = ('jobs_stats_insert', 'jobs_stats_delete', 'jobs_stats_update', 'jobs_stats_revision',
+                  'job_tags_stats_insert', 'job_tags_stats_delete')
+
+# Widens a month's id range to include excluded.min_id/max_id (ON CONFLICT clauses of stats_month)
+_WIDEN_ID_RANGE = ('min_id = min(IFNULL(min_id, excluded.min_id), excluded.min_id), '
+                   'max_id = max(IFNULL(max_id, excluded.max_id), excluded.max_id)')
+
+
+def _status_expr(ref):
+    return f"IFNULL({ref}.status, '{DEFAULT_STATUS}')"
+
+
+def _month_select(ref):
+    """Selects the 'YYYY-MM' bucket of a row, or nothing for malformed dates."""
+    return (f"SELECT substr({ref}.date_of_apply, 1, 7) AS month "
+            f"WHERE {ref}.date_of_apply GLOB '[0-9][0-9][0-9][0-9]-[01][0-9]*'")
+
+
+def _add_row(ref):
+    """Trigger statements that count row `ref` (NEW/OLD) into the summary tables."""
+    return f'''
+        INSERT INTO stats_status (status, count) VALUES ({_status_expr(ref)}, 1)
+            ON CONFLICT(status) DO UPDATE SET count = count + 1;
+        INSERT INTO stats_month (month, count, min_id, max_id, revision)
+            SELECT month, 1, {ref}.id, {ref}.id, 1 FROM ({_month_select(ref)}) WHERE true
+            ON CONFLICT(month) DO UPDATE SET count = count + 1, {_WIDEN_ID_RANGE}, revision = revision + 1;
+    '''
+
+
+def _remove_row(ref):
+    """Trigger statements that remove row `ref` (NEW/OLD) from the summary tables."""
+    return f'''
+        UPDATE stats_status SET count = count - 1 WHERE status = {_status_expr(ref)};
+        -- Empty months are kept, so their revision keeps growing if jobs come back
+        UPDATE stats_month SET count = count - 1, revision = revision + 1,
+            min_id = CASE WHEN count > 1 THEN min_id END, max_id = CASE WHEN count > 1 THEN max_id END
+            WHERE month IN ({_month_select(ref)});
+        DELETE FROM stats_status WHERE count <= 0;
+    '''
+
+
+def _trigger_sql():
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_insert AFTER INSERT ON jobs
+        BEGIN
+            {_add_row('NEW')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_delete AFTER DELETE ON jobs
+        BEGIN
+            {_remove_row('OLD')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_update AFTER UPDATE OF status, date_of_apply ON jobs
+        BEGIN
+            {_remove_row('OLD')}
+            {_add_row('NEW')}
+        END;
+        -- Any other column changed (city, tags, ...) also changes the month's exports
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_revision AFTER UPDATE ON jobs
+        BEGIN
+            UPDATE stats_month SET revision = revision + 1
+                WHERE month IN ({_month_select('OLD')}) OR month IN ({_month_select('NEW')});
+        END;
+        CREATE TRIGGER IF NOT EXISTS job_tags_stats_insert AFTER INSERT ON job_tags
+        BEGIN
+            INSERT INTO stats_tag (tag, count) VALUES (NEW.tag, 1)
+                ON CONFLICT(tag) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS job_tags_stats_delete AFTER DELETE ON job_tags
+        BEGIN
+            UPDATE stats_tag SET count = count - 1 WHERE tag = OLD.tag;
+            DELETE FROM stats_tag WHERE tag = OLD.tag AND count <= 0;
+        END;
+    '''
+
+
+def _compute_from_jobs(conn):
+    """Recomputes all aggregates with a full scan of `jobs` (used for rebuild/check)."""
+    status = conn.execute(f'''
+        SELECT IFNULL(status, '{DEFAULT_STATUS}'), COUNT(*) FROM jobs GROUP BY 1
+    ''').fetchall()
+    month = conn.execute('''
+        SELECT substr(date_of_apply, 1, 7), COUNT(*), MIN(id), MAX(id) FROM jobs
+        WHERE date_of_apply GLOB '[0-9][0-9][0-9][0-9]-[01][0-9]*'
+        GROUP BY 1
+    ''').fetchall()
+    tag = conn.execute('SELECT tag, COUNT(*) FROM job_tags GROUP BY tag').fetchall()
+    return {'stats_status': dict(status), 'stats_month': {row[0]: tuple(row[1:]) for row in month},
+            'stats_tag': dict(tag)}
+
+
+def _read_tables(conn):
+    tables = {table: dict(conn.execute(f'SELECT * FROM {table}').fetchall()) for table in ('stats_status', 'stats_tag')}
+    tables['stats_month'] = {row[0]: tuple(row[1:]) for row in conn.execute(
+        'SELECT month, count, min_id, max_id FROM stats_month WHERE count > 0')}
+    return tables
+
+
+def rebuild_stats(conn):
+    """Rebuilds the summary tables from scratch. Caller commits."""
+    fresh = _compute_from_jobs(conn)
+    for table in ('stats_status', 'stats_tag'):
+        conn.execute(f'DELETE FROM {table}')
+        conn.executemany(f'INSERT INTO {table} VALUES (?, ?)', fresh[table].items())
+    # Month rows stay, with a new revision, so nothing encoded for the old contents can be reused
+    conn.execute('UPDATE stats_month SET count = 0, min_id = NULL, max_id = NULL, revision = revision + 1')
+    conn.executemany('''
+        INSERT INTO stats_month (month, count, min_id, max_id, revision) VALUES (?, ?, ?, ?, 1)
+        ON CONFLICT(month) DO UPDATE SET count = excluded.count, min_id = excluded.min_id, max_id = excluded.max_id
+    ''', ((month, *values) for month, values in fresh['stats_month'].items()))
+
+
+def _month_consistent(stored, actual):
+    """Same count, and the stored id range covers the actual one (deletes may leave it wider)."""
+    if stored is None or actual is None:
+        return stored == actual
+    return stored[0] == actual[0] and stored[1] <= actual[1] and stored[2] >= actual[2]
+
+
+def check_stats(conn):
+    """Returns a list of (table, key, stored, actual) for every inconsistent aggregate."""
+    fresh = _compute_from_jobs(conn)
+    stored = _read_tables(conn)
+    mismatches = []
+    for table, actual in fresh.items():
+        for key in sorted(set(actual) | set(stored[table]), key=str):
+            if table == 'stats_month':
+                consistent = _month_consistent(stored[table].get(key), actual.get(key))
+            else:
+                consistent = actual.get(key, 0) == stored[table].get(key, 0)
+            if not consistent:
+                mismatches.append((table, key, stored[table].get(key, 0), actual.get(key, 0)))
+    return mismatches
+
+
+def add_jobs_to_stats(conn, after_id):
+    """Counts every job with id > after_id into the status and month summaries in one pass.
+
+    Used for bulk inserts that run with the per-row insert trigger suspended
+    (tag counts still follow job_tags through its own trigger). Caller commits.
+    """
+    conn.execute(f'''
+        INSERT INTO stats_status (status, count)
+        SELECT IFNULL(status, '{DEFAULT_STATUS}'), COUNT(*) FROM jobs WHERE id > ? GROUP BY 1
+        ON CONFLICT(status) DO UPDATE SET count = count + excluded.count
+    ''', (after_id,))
+    conn.execute(f'''
+        INSERT INTO stats_month (month, count, min_id, max_id, revision)
+        SELECT substr(date_of_apply, 1, 7), COUNT(*), MIN(id), MAX(id), 1 FROM jobs
+        WHERE id > ? AND date_of_apply GLOB '[0-9][0-9][0-9][0-9]-[01][0-9]*'
+        GROUP BY 1
+        ON CONFLICT(month) DO UPDATE SET count = count + excluded.count, {_WIDEN_ID_RANGE}, revision = revision + 1
+    ''', (after_id,))
+
+
+def install_stats(conn):
+    """(Re)creates the summary tables and triggers and rebuilds the aggregates. Caller commits."""
+    db.execute_script(conn, STATS_TABLES)
+    for trigger in STATS_TRIGGERS:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    db.execute_script(conn, _trigger_sql())
+    rebuild_stats(conn)
+
+
+def load_stats(conn):
+    """Reads the dashboard statistics from the summary tables.
+
+    Returns (total_jobs, status_counts, tag_counts, monthly_counts) where
+    monthly_counts is keyed by 'YYYY-MM', newest month first.
+    """
+    status_counts = dict(conn.execute('SELECT status, count FROM stats_status ORDER BY count DESC, status').fetchall())
+    tag_counts = dict(conn.execute('SELECT tag, count FROM stats_tag').fetchall())
+    monthly_counts = dict(conn.execute(
+        'SELECT month, count FROM stats_month WHERE count > 0 ORDER BY month DESC').fetchall())
+    return sum(status_counts.values()), status_counts, tag_counts, monthly_counts
+
+
+if __name__ == '__main__':
+    # Usage: python job_stats.py [--check | --rebuild] [database]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    db_path = args[0] if args else DB_NAME
+    from migrations import migrate
+
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+
+    if '--rebuild' in sys.argv:
+        rebuild_stats(conn)
+        conn.commit()
+        print(f"✅ Statistics rebuilt for {db_path}.")
+    else:
+        problems = check_stats(conn)
+        if problems:
+            for table, key, stored, actual in problems:
+                print(f"❌ {table}[{key}]: stored {stored}, actual {actual}")
+            print("Run with --rebuild to fix.")
+            conn.close()
+            sys.exit(1)
+        print(f"✅ Statistics are consistent for {db_path}.")
+    conn.close()
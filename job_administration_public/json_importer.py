@@ -1,91 +1,515 @@
+import argparse
+import fnmatch
+import hashlib
+import io
 import sqlite3
-from datetime import date
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
 import sys
 import json
 import os
+import time
+
+import db
+from job_records import UPSERT_SQL, with_natural_key, normalize_date, collapse_duplicates, classify_rows
+from migrations import migrate, bulk_insert_mode, suspended_triggers, BULK_UPDATE_SUSPENDED_TRIGGERS
 
 # --- CONFIGURATION ---
-# Using the absolute path you provided to ensure we hit the correct file
-DB_NAME = r'C:\Users\svanb\OneDrive\Python\Job_administration\job_administration_public\job_tracker.db'
+# The database next to this script, unless another path is passed with --db
+DB_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_tracker.db')
+BATCH_SIZE = 5000
+READ_CHUNK_SIZE = 1 << 16
+INGEST_PATTERNS = ('*.json', '*.ndjson', '*.jsonl')
+REJECT_SUFFIX = '.rejected.ndjson'
+WATCH_INTERVAL = 5.0  # seconds between directory polls
+
+
 
-def get_db_connection():
+def get_db_connection(db_path=DB_NAME):
     """Returns a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect(db_path)
+
+
+# --- Streaming readers (constant memory, one record at a time) ---
+
+def iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+    """Yields the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def skip_whitespace():
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+
+    def read_more():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError("JSON must be a list of job objects.")
+    pos += 1
+
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of file inside the JSON list.")
+        if buf[pos] == ']':
+            return
+        if not expect_value:
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON list, found {buf[pos]!r}.")
+            pos += 1
+            expect_value = True
+            continue
+
+        # Decode the next element, pulling in more text until it is complete.
+        # A value only counts as complete once the following ',' or ']' is buffered,
+        # otherwise a number cut at the chunk boundary ("2." + "5") would decode early.
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                after = end
+                while after < len(buf) and buf[after] in ' \t\r\n':
+                    after += 1
+                if eof or (after < len(buf) and buf[after] in ',]'):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more()
+        pos = end
+        expect_value = False
+        yield value
+
+
+def iter_ndjson(f):
+    """Yields one JSON value per non-empty line."""
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_no}: {e}") from e
+
+
+def iter_records(f, fmt='auto'):
+    """Picks the reader for `fmt` ('json', 'ndjson' or 'auto' = sniff the first character)."""
+    if fmt == 'auto':
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        fmt = 'json' if first == '[' else 'ndjson'
+    return iter_json_array(f) if fmt == 'json' else iter_ndjson(f)
+
+
+# --- Import ---
+
+TEXT_FIELDS = ('job_tittle', 'company', 'city', 'status', 'tags')
+
+
+def job_to_row(job_data, today_str):
+    """Validates one record and maps it to the 7 data columns of `jobs` plus its natural key.
 
-def import_jobs_from_json(file_path):
+    Returns (row, None) on success or (None, reason) when the record is rejected.
     """
-    Reads a JSON file and inserts data into the 7 data columns of the 'jobs' table.
+    if not isinstance(job_data, dict):
+        return None, "Record is not a JSON object."
+    # A list of tags is stored like the form sends it; any other non-text value is rejected
+    if isinstance(job_data.get('tags'), list) and all(isinstance(tag, str) for tag in job_data['tags']):
+        job_data = {**job_data, 'tags': ', '.join(job_data['tags'])}
+    for field in TEXT_FIELDS:
+        if not isinstance(job_data.get(field), (str, type(None))):
+            return None, f"{field} must be text, not {type(job_data[field]).__name__}."
+
+    # 1. Extract required fields
+    job_tittle = job_data.get('job_tittle')
+    company = job_data.get('company')
+    if not job_tittle or not company:
+        return None, "Missing job_tittle or company."
+
+    # 2. Extract optional fields with defaults
+    city = job_data.get('city', 'Unknown')
+    status = job_data.get('status', 'Applied')
+    tags = job_data.get('tags', '')
+
+    # 3. Dates are stored as YYYY-MM-DD; last_status_update defaults to the application date
+    try:
+        date_of_apply = normalize_date(job_data.get('date_of_apply') or today_str)
+    except ValueError:
+        return None, f"Invalid date_of_apply: {job_data.get('date_of_apply')!r}."
+    try:
+        last_status_update = normalize_date(job_data.get('last_status_update') or date_of_apply)
+    except ValueError:
+        return None, f"Invalid last_status_update: {job_data.get('last_status_update')!r}."
+
+    return with_natural_key((job_tittle, company, city, date_of_apply, status, last_status_update, tags)), None
+
+
+def upsert_batch(conn, batch, counts, after_id=None):
+    """Upserts one batch of job_to_row rows and adds them to the inserted/updated/skipped counts.
+
+    Inside bulk_insert_mode pass its `after_id`: a row updating a job that an earlier
+    batch of the same run inserted is then written without the update triggers, as
+    that job's tags, statistics and search entry are only added when the block ends.
+    """
+    rows, duplicates = collapse_duplicates(batch)
+    inserts, updates, skips = classify_rows(conn, rows)
+    fresh = set()
+    if after_id is not None and updates:
+        fresh = {key for key, in conn.execute(
+            'SELECT natural_key FROM incoming_keys JOIN jobs USING (natural_key) WHERE jobs.id > ?', (after_id,))}
+    if fresh:
+        conn.executemany(UPSERT_SQL, (row for row in rows if row[7] not in fresh))
+        with suspended_triggers(conn, BULK_UPDATE_SUSPENDED_TRIGGERS):
+            conn.executemany(UPSERT_SQL, (row for row in rows if row[7] in fresh))
+    else:
+        conn.executemany(UPSERT_SQL, rows)
+    counts['inserted'] += inserts
+    counts['updated'] += updates
+    counts['skipped'] += skips + duplicates
+
+
+def import_jobs_from_json(file_path, db_path=DB_NAME, batch_size=BATCH_SIZE, fmt='auto', reject_log_path=None,
+                          dry_run=False):
+    """
+    Streams a JSON list or NDJSON file into the 7 data columns of the 'jobs' table.
     (The 8th column, 'id', is handled automatically by SQLite).
+
+    Rows are upserted on their natural key with executemany in batches of
+    `batch_size`, all inside one transaction, so either the whole file is imported
+    or nothing is. Jobs that already exist are only updated when the file has a
+    newer last_status_update, so re-importing an export is a no-op. Tags,
+    statistics and the search index are updated once for all new rows
+    (bulk_insert_mode). Rejected records are written to `reject_log_path`
+    (default: <file>.rejected.ndjson). With `dry_run` the same work is done and
+    then rolled back and no reject log is written, so only the counts are reported.
+    Returns a summary dict, or None when the file could not be imported.
     """
     if not os.path.exists(file_path):
         print(f"❌ Error: File not found at path: {file_path}")
-        return
+        return None
 
-    conn = get_db_connection()
+    reject_log_path = reject_log_path or f"{file_path}.rejected.ndjson"
+    reject_log = None
+    conn = get_db_connection(db_path)
+    migrate(conn)
     today_str = date.today().isoformat()
-    success_count = 0
-    failure_count = 0
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'rejected': 0}
+    started = time.perf_counter()
 
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
+            conn.execute('BEGIN')
+            with bulk_insert_mode(conn) as after_id:
+                batch = []
+                for i, job_data in enumerate(iter_records(f, fmt)):
+                    row, reason = job_to_row(job_data, today_str)
+                    if row is None:
+                        counts['rejected'] += 1
+                        if dry_run:
+                            continue
+                        if reject_log is None:
+                            reject_log = open(reject_log_path, 'w', encoding='utf-8')
+                        reject_log.write(json.dumps({'record': i + 1, 'reason': reason, 'data': job_data},
+                                                    ensure_ascii=False) + '\n')
+                        continue
+
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        upsert_batch(conn, batch, counts, after_id)
+                        batch = []
+
+                if batch:
+                    upsert_batch(conn, batch, counts, after_id)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+
+    except (ValueError, UnicodeDecodeError) as e:
+        conn.rollback()
         print(f"❌ File Error: Could not read JSON. Details: {e}")
+        return None
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"❌ Database Error: {e}")
+        return None
+    finally:
         conn.close()
-        return
+        if reject_log is not None:
+            reject_log.close()
+
+    elapsed = time.perf_counter() - started
+    processed = counts['inserted'] + counts['updated'] + counts['skipped']
+    rows_per_sec = processed / elapsed if elapsed > 0 else 0.0
+    if dry_run:
+        print(f"\n=== Dry Run for {db_path} (nothing was written) ===")
+        print(f"➕ Would insert: {counts['inserted']} jobs.")
+        print(f"🔄 Would update: {counts['updated']} jobs.")
+        print(f"⏭️ Would skip (already present): {counts['skipped']} jobs.")
+    else:
+        print(f"\n=== Import Summary for {db_path} ===")
+        print(f"✅ Successfully inserted: {counts['inserted']} jobs.")
+        print(f"🔄 Updated with newer status: {counts['updated']} jobs.")
+        print(f"⏭️ Skipped (already present): {counts['skipped']} jobs.")
+    print(f"❌ Rejected: {counts['rejected']}")
+    if counts['rejected'] and not dry_run:
+        print(f"📝 Rejected records logged to: {reject_log_path}")
+    print(f"⏱️ {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+    return {**counts, 'seconds': elapsed, 'rows_per_sec': rows_per_sec}
+
+
+# --- Directory ingest ---
+# `python json_importer.py <directory>` imports every export in a folder. Worker
+# processes read, hash and validate the files in parallel; this process is the
+# only SQLite writer and upserts each file's rows in batches, in one transaction
+# per file that also records the file in ingested_files (migration 11). A file is
+# therefore either fully ingested and recorded, or not at all. Unchanged files
+# (same path, size and mtime) are not read again, and a file whose content hash
+# is already recorded (a copy or a touched file) is skipped without writing.
+# With --watch the folder is polled and new files are ingested as they appear.
+
+def find_files(directory, patterns=INGEST_PATTERNS):
+    """The export files directly inside `directory` (absolute paths, sorted), without reject logs."""
+    paths = []
+    for entry in os.scandir(directory):
+        if (entry.is_file() and not entry.name.endswith(REJECT_SUFFIX)
+                and any(fnmatch.fnmatch(entry.name, pattern) for pattern in patterns)):
+            paths.append(os.path.abspath(entry.path))
+    return sorted(paths)
 
-    if not isinstance(data, list):
-        print("❌ Data Structure Error: JSON must be a list of job objects.")
-        conn.close()
-        return
 
+def parse_file(path, fmt='auto', today_str=None):
+    """Reads, hashes and validates one file; runs in a worker process.
+
+    Returns a dict with the file's path, content hash, size and mtime, its valid
+    rows (see job_to_row), its rejects as (record number, reason, data) and the
+    error that made the whole file unreadable, if any.
+    """
+    today_str = today_str or date.today().isoformat()
+    mtime = os.stat(path).st_mtime
+    with open(path, 'rb') as f:
+        data = f.read()
+    result = {'path': path, 'hash': hashlib.sha256(data).hexdigest(), 'size': len(data), 'mtime': mtime,
+              'rows': [], 'rejects': [], 'error': None}
     try:
-        for i, job_data in enumerate(data):
-            # 1. Extract required fields
-            job_tittle = job_data.get('job_tittle')
-            company = job_data.get('company')
-
-            if not job_tittle or not company:
-                print(f"🛑 Skipped Record {i + 1}: Missing job_tittle or company.")
-                failure_count += 1
-                continue
+        for i, job_data in enumerate(iter_records(io.StringIO(data.decode('utf-8')), fmt)):
+            row, reason = job_to_row(job_data, today_str)
+            if row is None:
+                result['rejects'].append((i + 1, reason, job_data))
+            else:
+                result['rows'].append(row)
+    except (ValueError, UnicodeDecodeError) as e:
+        result.update(rows=[], rejects=[], error=str(e))
+    return result
+
+
+def parse_files(paths, fmt='auto', workers=1):
+    """Yields parse_file results in the order of `paths`.
 
-            # 2. Extract optional fields with defaults
-            city = job_data.get('city', 'Unknown')
-            date_of_apply = job_data.get('date_of_apply', today_str)
-            status = job_data.get('status', 'Applied')
-            tags = job_data.get('tags', '')
+    With several workers the files are parsed in a process pool, at most
+    2 x workers files ahead of the writer, so memory stays bounded.
+    """
+    today_str = date.today().isoformat()
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield parse_file(path, fmt, today_str)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(parse_file, path, fmt, today_str))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
-            # 3. Handle last_status_update logic
-            last_status_update = job_data.get('last_status_update')
-            if not last_status_update or last_status_update == "":
-                last_status_update = date_of_apply
 
-            # 4. Execute Insert (7 columns of data)
-            conn.execute('''
-                INSERT INTO jobs 
-                (job_tittle, company, city, date_of_apply, status, last_status_update, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (job_tittle, company, city, date_of_apply, status, last_status_update, tags))
+def is_busy_error(e):
+    """True for a database that was only locked by another writer; worth retrying as is."""
+    return isinstance(e, sqlite3.OperationalError) and ('locked' in str(e) or 'busy' in str(e))
 
-            success_count += 1
 
+def write_parsed_file(conn, result, batch_size=BATCH_SIZE, dry_run=False):
+    """Upserts one parsed file and records it in ingested_files, in one transaction.
+
+    Returns the file's counts, or None if its content was ingested before.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'rejected': len(result['rejects'])}
+    conn.execute('BEGIN')
+    try:
+        seen = conn.execute('SELECT 1 FROM ingested_files WHERE content_hash = ?', (result['hash'],)).fetchone()
+        if seen:
+            # The same content again (a copy or a touched file): remember this path too, keeping earlier counts
+            conn.execute('UPDATE ingested_files SET content_hash = ?, size = ?, mtime = ? WHERE path = ?',
+                         (result['hash'], result['size'], result['mtime'], result['path']))
+        else:
+            rows = result['rows']
+            with bulk_insert_mode(conn) as after_id:
+                for start in range(0, len(rows), batch_size):
+                    upsert_batch(conn, rows[start:start + batch_size], counts, after_id)
+        conn.execute(f'''
+            INSERT OR {'IGNORE' if seen else 'REPLACE'} INTO ingested_files
+                (path, content_hash, size, mtime, inserted, updated, skipped, rejected, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (result['path'], result['hash'], result['size'], result['mtime'], counts['inserted'],
+              counts['updated'], counts['skipped'], counts['rejected'], datetime.now().isoformat(timespec='seconds')))
+    except BaseException:
+        conn.rollback()
+        raise
+    if dry_run:
+        conn.rollback()
+    else:
         conn.commit()
-        print(f"\n=== Import Summary for {DB_NAME} ===")
-        print(f"✅ Successfully inserted: {success_count} jobs.")
-        print(f"❌ Skipped/Failed: {failure_count}")
+    return None if seen else counts
+
+
+def ingest_directory(directory, db_path=DB_NAME, workers=1, batch_size=BATCH_SIZE, fmt='auto', dry_run=False,
+                     stable=None):
+    """Imports the new and changed export files of `directory` (see the section comment).
 
+    `stable` (used by watch_directory) maps path -> (size, mtime) seen at the
+    previous poll; files are then only taken once they stopped changing, and the
+    dict is updated in place. A file that cannot be read or written is counted
+    as failed and skipped, the others are still imported; in watch mode it is
+    not retried until it changes (unless the database was only busy).
+
+    Returns a summary dict whose 'results' list holds each file's path, state
+    ('ingested', 'duplicate' or 'failed'), error and counts, or None if the
+    database itself could not be used.
+    """
+    conn = get_db_connection(db_path)
+    migrate(conn)
+    started = time.perf_counter()
+    totals = {'files': 0, 'unchanged': 0, 'duplicates': 0, 'failed': 0,
+              'inserted': 0, 'updated': 0, 'skipped': 0, 'rejected': 0, 'results': []}
+    try:
+        recorded = {row[0]: (row[1], row[2]) for row in conn.execute('SELECT path, size, mtime FROM ingested_files')}
+        paths = []
+        for path in find_files(directory):
+            stat = os.stat(path)
+            current = (stat.st_size, stat.st_mtime)
+            if recorded.get(path) == current:
+                totals['unchanged'] += 1
+            elif stable is None or stable.get(path) == current:
+                paths.append(path)
+            if stable is not None and stable.get(path) != (current, 'failed'):
+                stable[path] = current
+
+        for result in parse_files(paths, fmt, workers):
+            path, name = result['path'], os.path.basename(result['path'])
+            error, busy = result['error'], False
+            if error:
+                print(f"❌ {name}: could not read JSON. Details: {error}")
+            else:
+                try:
+                    counts = write_parsed_file(conn, result, batch_size, dry_run)
+                except sqlite3.Error as e:
+                    error, busy = str(e), is_busy_error(e)
+                    print(f"❌ {name}: could not be written, nothing of it was imported. Details: {e}")
+            if error:
+                totals['failed'] += 1
+                totals['results'].append({'path': path, 'state': 'failed', 'error': error})
+                if stable is not None and not busy:  # not retried until the file changes
+                    stable[path] = ((result['size'], result['mtime']), 'failed')
+                continue
+            if counts is None:
+                totals['duplicates'] += 1
+                totals['results'].append({'path': path, 'state': 'duplicate', 'error': None})
+                print(f"⏭️ {name}: already ingested (same content).")
+                continue
+            totals['files'] += 1
+            totals['results'].append({'path': path, 'state': 'ingested', 'error': None, **counts})
+            for key, value in counts.items():
+                totals[key] += value
+            if result['rejects'] and not dry_run:
+                with open(path + REJECT_SUFFIX, 'w', encoding='utf-8') as log:
+                    for record, reason, data in result['rejects']:
+                        log.write(json.dumps({'record': record, 'reason': reason, 'data': data},
+                                             ensure_ascii=False) + '\n')
+            print(f"📄 {name}: ➕ {counts['inserted']} new, 🔄 {counts['updated']} updated, "
+                  f"⏭️ {counts['skipped']} skipped, ❌ {counts['rejected']} rejected")
     except sqlite3.Error as e:
-        conn.rollback()
         print(f"❌ Database Error: {e}")
+        return None
     finally:
         conn.close()
 
+    elapsed = time.perf_counter() - started
+    processed = totals['inserted'] + totals['updated'] + totals['skipped']
+    totals.update(seconds=elapsed, rows_per_sec=processed / elapsed if elapsed > 0 else 0.0)
+    return totals
+
+
+def print_ingest_summary(directory, db_path, totals, dry_run=False):
+    title = "Dry Run" if dry_run else "Ingest Summary"
+    print(f"\n=== {title} for {directory} -> {db_path} ===")
+    print(f"📂 Files ingested: {totals['files']} (unchanged: {totals['unchanged']}, "
+          f"same content: {totals['duplicates']}, failed: {totals['failed']})")
+    print(f"✅ Inserted: {totals['inserted']}  🔄 Updated: {totals['updated']}  "
+          f"⏭️ Skipped: {totals['skipped']}  ❌ Rejected: {totals['rejected']}")
+    print(f"⏱️ {totals['seconds']:.2f}s ({totals['rows_per_sec']:,.0f} rows/sec)")
+
+
+def watch_directory(directory, db_path=DB_NAME, interval=WATCH_INTERVAL, **options):
+    """Ingests `directory` now and then every `interval` seconds until Ctrl+C."""
+    totals = ingest_directory(directory, db_path, **options)
+    if totals is not None:
+        print_ingest_summary(directory, db_path, totals, options.get('dry_run', False))
+    print(f"\n👀 Watching {directory} every {interval:g}s (Ctrl+C to stop)...")
+    stable = {}
+    try:
+        while True:
+            time.sleep(interval)
+            totals = ingest_directory(directory, db_path, stable=stable, **options)
+            if totals and (totals['files'] or totals['failed']):
+                print_ingest_summary(directory, db_path, totals, options.get('dry_run', False))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print('Usage: python json_importer.py <your_file.json>')
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Import job applications from a JSON list or NDJSON file, "
+                                                 "or from every such file in a directory.")
+    parser.add_argument('path', help="JSON list (.json), one object per line (.ndjson/.jsonl) or a directory "
+                                     "of such files")
+    parser.add_argument('--db', default=DB_NAME, help="SQLite database to import into")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="rows per executemany batch")
+    parser.add_argument('--format', choices=['auto', 'json', 'ndjson'], default='auto')
+    parser.add_argument('--reject-log', help="where to write rejected records (NDJSON, single file only)")
+    parser.add_argument('--dry-run', action='store_true', help="only report what would be inserted/updated/skipped")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help="processes parsing the files of a directory")
+    parser.add_argument('--watch', action='store_true', help="keep polling the directory for new files")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL, help="seconds between polls with --watch")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.path):
+        if args.watch:
+            parser.error("--watch needs a directory")
+        summary = import_jobs_from_json(args.path, args.db, args.batch_size, args.format, args.reject_log,
+                                        args.dry_run)
+        sys.exit(0 if summary is not None else 1)
 
-    import_jobs_from_json(sys.argv[1])
\ No newline at end of file
+    options = {'workers': args.workers, 'batch_size': args.batch_size, 'fmt': args.format, 'dry_run': args.dry_run}
+    if args.watch:
+        watch_directory(args.path, args.db, args.interval, **options)
+    else:
+        totals = ingest_directory(args.path, args.db, **options)
+        if totals is not None:
+            print_ingest_summary(args.path, args.db, totals, args.dry_run)
+        sys.exit(0 if totals is not None and not totals['failed'] else 1)
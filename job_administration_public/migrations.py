@@ -0,0 +1,413 @@
+import sqlite3
+import sys
+from contextlib import contextmanager, suppress
+from datetime import datetime
+
+import db
+from job_records import natural_key, normalize_date
+from job_search import install_search, index_jobs
+from job_stats import install_stats, add_jobs_to_stats
+
+# --- Versioned schema migrations ---
+# Every database records the migrations it has received in `schema_version`.
+# migrate() applies the missing ones in order, so app.py, json_importer.py and
+# mock_up_data_script.py always work against the same schema. Append new
+# migrations to MIGRATIONS; never edit or reorder one that has shipped.
+# Each migration runs in its own transaction, so one that fails halfway leaves
+# no partial schema behind; use db.execute_script, never conn.executescript
+# (which commits). Databases created before this runner existed have no version
+# table, so all migrations must also be idempotent (IF NOT EXISTS, rebuild from `jobs`).
+
+DB_NAME = 'job_tracker.db'
+
+
+def _create_jobs(conn):
+    conn.execute('''
+                 CREATE TABLE IF NOT EXISTS jobs
+                 (
+                     id                 INTEGER PRIMARY KEY,
+                     job_tittle         TEXT NOT NULL,
+                     company            TEXT NOT NULL,
+                     city               TEXT,
+                     date_of_apply      TEXT,
+                     status             TEXT,
+                     last_status_update TEXT,
+                     tags               TEXT
+                 )
+                 ''')
+
+
+def _create_job_indexes(conn):
+    # date_of_apply also covers the keyset pagination order (date_of_apply, id)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_date_of_apply ON jobs (date_of_apply)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company)')
+
+
+# Splits the comma-joined `tags` column of a row into one tag per result row
+_SPLIT_TAGS = '''
+    WITH RECURSIVE split(tag, rest) AS (
+        SELECT '', IFNULL({tags}, '') || ','
+        UNION ALL
+        SELECT trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+        FROM split WHERE rest <> ''
+    )
+    SELECT tag FROM split WHERE tag <> ''
+'''
+
+
+def _create_job_tags(conn):
+    """Normalizes `jobs.tags` into a (tag, job_id) join table kept in sync by triggers.
+
+    The comma-joined `tags` column stays the source of truth for the forms and
+    exports; `job_tags` is what queries and statistics use.
+    """
+    db.execute_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS job_tags
+        (
+            tag    TEXT    NOT NULL,
+            job_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, job_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_job_tags_job_id ON job_tags (job_id);
+
+        CREATE TRIGGER IF NOT EXISTS jobs_tags_insert AFTER INSERT ON jobs
+        BEGIN
+            INSERT OR IGNORE INTO job_tags (tag, job_id)
+            SELECT tag, NEW.id FROM ({_SPLIT_TAGS.format(tags='NEW.tags')});
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_tags_delete AFTER DELETE ON jobs
+        BEGIN
+            DELETE FROM job_tags WHERE job_id = OLD.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_tags_update AFTER UPDATE OF tags ON jobs
+        BEGIN
+            DELETE FROM job_tags WHERE job_id = OLD.id;
+            INSERT OR IGNORE INTO job_tags (tag, job_id)
+            SELECT tag, NEW.id FROM ({_SPLIT_TAGS.format(tags='NEW.tags')});
+        END;
+    ''')
+    conn.execute('DELETE FROM job_tags')
+    index_job_tags(conn, 0)
+
+
+def index_job_tags(conn, after_id):
+    """Fills job_tags for every job with id > after_id in one set-based statement."""
+    conn.execute('''
+        INSERT OR IGNORE INTO job_tags (tag, job_id)
+        WITH RECURSIVE split(job_id, tag, rest) AS (
+            SELECT id, '', IFNULL(tags, '') || ',' FROM jobs WHERE id > ?
+            UNION ALL
+            SELECT job_id, trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest <> ''
+        )
+        SELECT tag, job_id FROM split WHERE tag <> ''
+    ''', (after_id,))
+
+
+def _add_natural_key(conn):
+    """Adds jobs.natural_key with a unique index for idempotent imports and inserts.
+
+    Jobs that already share a key keep their data; all but the oldest get the
+    job id appended to their key so the unique index can be created.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+    if 'natural_key' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN natural_key TEXT')
+
+    seen, updates = set(), []
+    for job_id, job_tittle, company, date_of_apply in conn.execute(
+            'SELECT id, job_tittle, company, date_of_apply FROM jobs ORDER BY id'):
+        key = natural_key(job_tittle, company, date_of_apply)
+        if key in seen:
+            key = f"{key}#{job_id}"
+        seen.add(key)
+        updates.append((key, job_id))
+    conn.executemany('UPDATE jobs SET natural_key = ? WHERE id = ?', updates)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_natural_key ON jobs (natural_key)')
+
+
+def _create_data_version(conn):
+    """A single-row counter bumped on every change to `jobs`.
+
+    Caches (rendered reports, HTTP responses) key on it to know when their data changed.
+    """
+    db.execute_script(conn, '''
+        CREATE TABLE IF NOT EXISTS data_version
+        (
+            id         INTEGER PRIMARY KEY CHECK (id = 1),
+            version    INTEGER NOT NULL,
+            updated_at TEXT    NOT NULL
+        );
+        INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 0, datetime('now'));
+
+        CREATE TRIGGER IF NOT EXISTS jobs_version_insert AFTER INSERT ON jobs
+        BEGIN
+            UPDATE data_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_version_update AFTER UPDATE ON jobs
+        BEGIN
+            UPDATE data_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_version_delete AFTER DELETE ON jobs
+        BEGIN
+            UPDATE data_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1;
+        END;
+    ''')
+
+
+def _create_af_uploads(conn):
+    """Per-job upload state for af_uploader.py, so a rerun skips jobs that already reached AF."""
+    db.execute_script(conn, '''
+        CREATE TABLE IF NOT EXISTS af_uploads
+        (
+            job_id      INTEGER PRIMARY KEY,
+            state       TEXT    NOT NULL CHECK (state IN ('pending', 'uploaded', 'failed')),
+            attempts    INTEGER NOT NULL DEFAULT 0,
+            last_error  TEXT,
+            uploaded_at TEXT,
+            updated_at  TEXT    NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_af_uploads_state ON af_uploads (state);
+
+        CREATE TRIGGER IF NOT EXISTS jobs_af_uploads_delete AFTER DELETE ON jobs
+        BEGIN
+            DELETE FROM af_uploads WHERE job_id = old.id;
+        END;
+    ''')
+
+
+def _normalize_job_dates(conn):
+    """Rewrites date_of_apply and last_status_update that are not YYYY-MM-DD yet (e.g. '2025/10/5').
+
+    The natural key follows the new application date (keeping a '#<id>' suffix
+    from migration 6); a job whose new key is already taken keeps its old dates.
+    Dates that cannot be parsed stay as they are: SQL date functions return
+    NULL for them and the dashboard shows 'N/A'.
+    """
+    pattern = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+    updates = []
+    for job_id, job_tittle, company, date_of_apply, last_status_update, key in conn.execute(f'''
+            SELECT id, job_tittle, company, date_of_apply, last_status_update, natural_key FROM jobs
+            WHERE date_of_apply NOT GLOB '{pattern}' OR last_status_update NOT GLOB '{pattern}'
+    ''').fetchall():
+        try:
+            date_of_apply = normalize_date(date_of_apply)
+        except ValueError:
+            pass
+        try:
+            last_status_update = normalize_date(last_status_update)
+        except ValueError:
+            pass
+        suffix = f"#{job_id}" if (key or '').endswith(f"#{job_id}") else ''
+        updates.append((date_of_apply, last_status_update, natural_key(job_tittle, company, date_of_apply) + suffix,
+                        job_id))
+    conn.executemany('''
+        UPDATE OR IGNORE jobs SET date_of_apply = ?, last_status_update = ?, natural_key = ? WHERE id = ?
+    ''', updates)
+
+
+# Change-log entries kept for refreshing in-memory snapshots; older ones are pruned
+CHANGE_LOG_KEEP = 100_000
+
+
+def _create_job_changes(conn):
+    """An append-only log of changed job ids, so job_snapshot.py can refresh only what changed.
+
+    A NULL job id means 'everything may have changed' (large bulk inserts, restores).
+    """
+    db.execute_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS job_changes
+        (
+            seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER
+        );
+
+        CREATE TRIGGER IF NOT EXISTS jobs_changes_insert AFTER INSERT ON jobs
+        BEGIN
+            INSERT INTO job_changes (job_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_changes_update AFTER UPDATE ON jobs
+        BEGIN
+            INSERT INTO job_changes (job_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS jobs_changes_delete AFTER DELETE ON jobs
+        BEGIN
+            INSERT INTO job_changes (job_id) VALUES (OLD.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS job_changes_prune AFTER INSERT ON job_changes WHEN NEW.seq % 1000 = 0
+        BEGIN
+            DELETE FROM job_changes WHERE seq <= NEW.seq - {CHANGE_LOG_KEEP};
+        END;
+    ''')
+
+
+def log_all_jobs_changed(conn, after_seq=0):
+    """Appends a full-reload marker to job_changes, numbered above `after_seq` and every existing entry."""
+    conn.execute('''
+        INSERT INTO job_changes (seq, job_id)
+        VALUES (MAX(?, (SELECT IFNULL(MAX(seq), 0) FROM job_changes)) + 1, NULL)
+    ''', (after_seq,))
+
+
+def _create_ingested_files(conn):
+    """Files taken in by `json_importer.py <directory>`, so a rerun skips content it has already seen."""
+    db.execute_script(conn, '''
+        CREATE TABLE IF NOT EXISTS ingested_files
+        (
+            path         TEXT PRIMARY KEY,
+            content_hash TEXT    NOT NULL,
+            size         INTEGER NOT NULL,
+            mtime        REAL    NOT NULL,
+            inserted     INTEGER NOT NULL,
+            updated      INTEGER NOT NULL,
+            skipped      INTEGER NOT NULL,
+            rejected     INTEGER NOT NULL,
+            ingested_at  TEXT    NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_ingested_files_hash ON ingested_files (content_hash);
+    ''')
+
+
+def _add_month_partitions(conn):
+    """Turns stats_month into monthly partition metadata: an id range and a revision per month (see job_stats.py)."""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(stats_month)')}
+    for column, definition in (('min_id', 'INTEGER'), ('max_id', 'INTEGER'), ('revision', 'INTEGER NOT NULL DEFAULT 0')):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE stats_month ADD COLUMN {column} {definition}')
+    install_stats(conn)
+
+
+def bump_data_version(conn):
+    conn.execute("UPDATE data_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1")
+
+
+# (version, description, function) - applied in order, each exactly once per database
+MIGRATIONS = [
+    (1, 'create jobs table', _create_jobs),
+    (2, 'indexes on date_of_apply, status and company', _create_job_indexes),
+    (3, 'normalized job_tags table', _create_job_tags),
+    (4, 'dashboard statistics summary tables', install_stats),
+    (5, 'full-text search index', install_search),
+    (6, 'natural key for deduplication', _add_natural_key),
+    (7, 'data version counter', _create_data_version),
+    (8, 'AF upload state', _create_af_uploads),
+    (9, 'ISO application and status dates', _normalize_job_dates),
+    (10, 'change log for in-memory snapshots', _create_job_changes),
+    (11, 'ingested files by content hash', _create_ingested_files),
+    (12, 'monthly partition ranges and revisions', _add_month_partitions),
+]
+
+
+def get_schema_version(conn):
+    conn.execute('''
+                 CREATE TABLE IF NOT EXISTS schema_version
+                 (
+                     version     INTEGER PRIMARY KEY,
+                     description TEXT NOT NULL,
+                     applied_at  TEXT NOT NULL
+                 )
+                 ''')
+    return conn.execute('SELECT IFNULL(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def migrate(conn, verbose=False):
+    """Applies every pending migration in order. Returns the resulting schema version."""
+    current = get_schema_version(conn)
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        # One transaction per migration: it is applied whole, with its version row, or not at all
+        conn.execute('BEGIN')
+        try:
+            apply(conn)
+            conn.execute('INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                         (version, description, datetime.now().isoformat(timespec='seconds')))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        current = version
+        if verbose:
+            print(f"✅ Applied migration {version}: {description}")
+    return current
+
+
+# Per-row triggers that maintain job_tags, the statistics, the search index, the data version and the
+# change log on INSERT
+BULK_SUSPENDED_TRIGGERS = ('jobs_tags_insert', 'jobs_stats_insert', 'jobs_fts_insert', 'jobs_version_insert',
+                           'jobs_changes_insert')
+# Their UPDATE counterparts for job_tags, the statistics and the search index (see upsert_batch in json_importer.py)
+BULK_UPDATE_SUSPENDED_TRIGGERS = ('jobs_tags_update', 'jobs_stats_update', 'jobs_stats_revision', 'jobs_fts_update')
+
+
+@contextmanager
+def suspended_triggers(conn, names):
+    """Drops the named triggers for the duration of the block and recreates them afterwards.
+
+    Must be used inside an open transaction, so that a rollback restores the
+    triggers too. If the block raises, the triggers are recreated before the
+    error propagates, so the connection is usable again even without a rollback.
+    """
+    assert conn.in_transaction, "suspended_triggers needs an open transaction"
+    saved = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({','.join('?' * len(names))})",
+        names).fetchall()
+    for name, _ in saved:
+        conn.execute(f'DROP TRIGGER {name}')
+
+    try:
+        yield
+    except BaseException:
+        # A failed restore must not hide the original error; the caller's rollback restores them anyway
+        with suppress(sqlite3.Error):
+            recreate_missing_triggers(conn, saved)
+        raise
+    recreate_missing_triggers(conn, saved)
+
+
+def recreate_missing_triggers(conn, saved):
+    """Recreates the (name, sql) triggers of `saved` that are not in the schema (any more)."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    for name, sql in saved:
+        if name not in existing:
+            conn.execute(sql)
+
+
+@contextmanager
+def bulk_insert_mode(conn):
+    """Runs large inserts into `jobs` without the per-row insert triggers; yields the max id on entry.
+
+    Must be used inside an open transaction. On exit the derived tables are filled
+    with set-based statements for the new rows (id > the max id on entry) and the
+    triggers are recreated. If the block raises, only the triggers are recreated
+    and the transaction should be rolled back (see suspended_triggers).
+    A new row that is updated again inside the block must be updated with
+    BULK_UPDATE_SUSPENDED_TRIGGERS suspended too, as it has no derived rows yet.
+    """
+    after_id = conn.execute('SELECT IFNULL(MAX(id), 0) FROM jobs').fetchone()[0]
+    with suspended_triggers(conn, BULK_SUSPENDED_TRIGGERS):
+        yield after_id
+
+        index_job_tags(conn, after_id)
+        add_jobs_to_stats(conn, after_id)
+        index_jobs(conn, after_id)
+        bump_data_version(conn)
+        # Log the new jobs one by one unless there are so many that a snapshot reload is cheaper anyway
+        new_jobs = conn.execute('SELECT COUNT(*) FROM jobs WHERE id > ?', (after_id,)).fetchone()[0]
+        if new_jobs > CHANGE_LOG_KEEP:
+            log_all_jobs_changed(conn)
+        else:
+            conn.execute('INSERT INTO job_changes (job_id) SELECT id FROM jobs WHERE id > ? ORDER BY id',
+                         (after_id,))
+
+
+if __name__ == '__main__':
+    # Usage: python migrations.py [database]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    conn = sqlite3.connect(db_path)
+    version = migrate(conn, verbose=True)
+    conn.close()
+    print(f"Schema of {db_path} is at version {version}.")
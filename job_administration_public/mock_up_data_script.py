@@ -1,10 +1,21 @@
+import argparse
 import sqlite3
+import sys
+import time
+
 import numpy as np
-from datetime import datetime, timedelta
+
+import db
+from job_records import JOB_COLUMNS, natural_key
+from json_importer import upsert_batch
+from migrations import migrate, bulk_insert_mode
 
 # --- Configuration ---
 DB_NAME = "job_tracker.db"
 TARGET_TOTAL_JOBS = 100
+START_DATE = "2025-04-01"
+END_DATE = "2025-11-30"
+CHUNK_SIZE = 100_000  # rows generated and inserted per step
 
 # The Key is the Category (Main Tag), the Value is the pool of job titles
 TITTLES_CONFIG = {
@@ -33,108 +44,160 @@ tag_options = ["devops", "it_service_specialist", "it_manager", "second_line", "
 
 # --- Helper Functions ---
 
-def generate_monthly_distribution(total_target, min_per_month, max_per_month):
-    """Generates a list of job counts per month that sum up to exactly total_target."""
-    # Define range from April to November 2025
-    months = np.arange('2025-04', '2025-12', dtype='datetime64[M]')
-    n_months = len(months)
-
-    # Initialize with random values within constraints
-    counts = np.random.randint(min_per_month, max_per_month + 1, size=n_months)
-
-    # Adjust counts iteratively until the sum matches the target (100)
-    while counts.sum() != total_target:
-        if counts.sum() < total_target:
-            counts[np.random.randint(0, n_months)] += 1
-        else:
-            idx = np.random.randint(0, n_months)
-            if counts[idx] > min_per_month:
-                counts[idx] -= 1
-    return list(zip(months, counts))
-
-
-def generate_mock_data():
-    """Main function to create the database and populate it with randomized data."""
-    conn = sqlite3.connect(DB_NAME)
+def generate_monthly_distribution(total_target, n_months, rng):
+    """Splits total_target over n_months with random weights; the counts sum to exactly total_target."""
+    weights = rng.uniform(0.6, 1.4, size=n_months)
+    exact = total_target * weights / weights.sum()
+    counts = np.floor(exact).astype(np.int64)
+    # Hand the rows lost to rounding to the months with the largest remainders
+    remainder = total_target - counts.sum()
+    counts[np.argsort(exact - counts)[::-1][:remainder]] += 1
+    return counts
+
+
+def month_day_ranges(start, end):
+    """First day and number of days of every month between start and end (inclusive), clipped to the span."""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1, dtype='datetime64[M]')
+    first = np.maximum(months.astype('datetime64[D]'), start)
+    last = np.minimum((months + 1).astype('datetime64[D]') - 1, end)
+    return first, (last - first).astype(np.int64) + 1
+
+
+def iter_job_chunks(rows, start, end, rng, chunk_size=CHUNK_SIZE):
+    """Yields lists of 7-column job rows in chronological order, `chunk_size` rows at a time.
+
+    Every column is drawn for the whole chunk at once with NumPy; only the final
+    tuples are built in Python.
+    """
+    categories = np.array(list(TITTLES_CONFIG.keys()), dtype=object)
+    titles = np.array([title for category in categories for title in TITTLES_CONFIG[category]], dtype=object)
+    companies, cities = np.array(COMPANIES, dtype=object), np.array(CITIES, dtype=object)
+    statuses = np.array(STATUS_OPTIONS, dtype=object)
+    title_counts = np.array([len(TITTLES_CONFIG[category]) for category in categories])
+    title_offsets = np.concatenate(([0], np.cumsum(title_counts)[:-1]))
+
+    first_day, days = month_day_ranges(start, end)
+    # Row i belongs to month month_of_row[i]; rows are generated month by month, so chunks stay in date order
+    month_of_row = np.repeat(np.arange(len(days)), generate_monthly_distribution(rows, len(days), rng))
+
+    for chunk_start in range(0, rows, chunk_size):
+        month = month_of_row[chunk_start:chunk_start + chunk_size]
+        n = len(month)
+
+        # Application day within the month, sorted to keep a chronological timeline
+        apply_dt = np.sort(first_day[month] + (rng.random(n) * days[month]).astype(np.int64))
+        # Status update occurs 0-10 days after application
+        update_dt = apply_dt + rng.integers(0, 11, size=n)
+
+        # 1. Category (the dictionary KEY) is also the tag; 2. a title from that category's values
+        category = rng.integers(0, len(categories), size=n)
+        title = title_offsets[category] + (rng.random(n) * title_counts[category]).astype(np.int64)
+
+        yield list(zip(
+            titles[title].tolist(),
+            companies[rng.integers(0, len(companies), size=n)].tolist(),
+            cities[rng.integers(0, len(cities), size=n)].tolist(),
+            np.datetime_as_string(apply_dt, unit='D').tolist(),
+            statuses[rng.integers(0, len(statuses), size=n)].tolist(),
+            np.datetime_as_string(update_dt, unit='D').tolist(),
+            categories[category].tolist(),
+        ))
+
+
+def with_natural_keys(chunk, key_prefixes, first_id=None):
+    """Appends the natural key to every row of the chunk.
+
+    The (title, company) part of the key comes from `key_prefixes`, as the pools
+    are small. With `first_id` every key gets a '#<id>' suffix, the way migration
+    6 keeps legacy duplicates apart, so every generated row becomes its own job.
+    """
+    if first_id is None:
+        return [(*row, key_prefixes[row[0], row[1]] + row[3]) for row in chunk]
+    return [(*row, f"{key_prefixes[row[0], row[1]]}{row[3]}#{first_id + i}") for i, row in enumerate(chunk)]
+
+
+def generate_mock_data(db_path=DB_NAME, rows=TARGET_TOTAL_JOBS, start=START_DATE, end=END_DATE, seed=None,
+                       mode='new', allow_duplicates=False, chunk_size=CHUNK_SIZE):
+    """Creates/updates the database and populates it with randomized data.
+
+    mode: 'new' refuses to touch a database that already has jobs, 'reset'
+    deletes all jobs first, 'append' adds to them. Jobs with the same title,
+    company and date collapse into one (natural key) unless `allow_duplicates`.
+    Returns the number of jobs in the database afterwards, or None if nothing was done.
+    """
+    rng = np.random.default_rng(seed)
+    conn = db.connect(db_path)
 
     # Ensure the database uses UTF-8 encoding for Swedish characters
     conn.execute("PRAGMA encoding = 'UTF-8';")
-    cursor = conn.cursor()
-
-    # Reset the database table
-    cursor.execute("DROP TABLE IF EXISTS jobs")
-    cursor.execute('''
-                   CREATE TABLE jobs
-                   (
-                       id                 INTEGER PRIMARY KEY AUTOINCREMENT,
-                       job_tittle         TEXT NOT NULL,
-                       company            TEXT NOT NULL,
-                       city               TEXT,
-                       date_of_apply      TEXT,
-                       status             TEXT,
-                       last_status_update TEXT,
-                       tags               TEXT
-                   )
-                   ''')
-
-    # Get the randomized monthly counts (between 10 and 18 per month)
-    distribution = generate_monthly_distribution(TARGET_TOTAL_JOBS, 10, 18)
-
-    # Extract the Keys (categories) from the configuration
-    categories = list(TITTLES_CONFIG.keys())
-    all_entries = []
-
-    for month_dt, count in distribution:
-        # Define the start and end of the specific month
-        next_month = month_dt + np.timedelta64(1, 'M')
-        days_in_month = np.arange(month_dt, next_month, dtype='datetime64[D]')
-
-        # Pick 'count' random days within this specific month
-        chosen_days = np.random.choice(days_in_month, size=count, replace=True)
-
-        for day in chosen_days:
-            # 1. Select the Category (The Dictionary KEY)
-            category_key = np.random.choice(categories)
-
-            # 2. Select a Title from the chosen category's list (The Dictionary VALUE)
-            title = np.random.choice(TITTLES_CONFIG[category_key])
-
-            # 3. Use the Category Key as the Tag (ensures perfect matching in Flask)
-            tag = category_key
-
-            apply_date_str = str(day)
-            apply_dt = datetime.strptime(apply_date_str, '%Y-%m-%d')
-
-            # Status update occurs 0-10 days after application
-            update_gap = np.random.randint(0, 11)
-            update_dt = apply_dt + timedelta(days=int(update_gap))
-
-            all_entries.append((
-                title,
-                np.random.choice(COMPANIES),
-                np.random.choice(CITIES),
-                apply_date_str,
-                np.random.choice(STATUS_OPTIONS),
-                update_dt.strftime('%Y-%m-%d'),
-                tag
-            ))
-
-    # Sort entries by application date to maintain a chronological timeline
-    all_entries.sort(key=lambda x: x[3])
-
-    # Bulk insert all generated jobs into the SQLite database
-    cursor.executemany('''
-                       INSERT INTO jobs (job_tittle, company, city, date_of_apply, status, last_status_update, tags)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)
-                       ''', all_entries)
-
-    conn.commit()
+
+    # Bring the schema up to date
+    migrate(conn)
+    existing = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    if existing and mode == 'new':
+        conn.close()
+        print(f"❌ '{db_path}' already contains {existing} jobs. Use --reset to replace them, --append to add to "
+              f"them, or --db to write to another file.")
+        return None
+
+    key_prefixes = {(title, company): natural_key(title, company, '')
+                    for titles in TITTLES_CONFIG.values() for title in titles for company in COMPANIES}
+    insert_sql = f"INSERT INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' * len(JOB_COLUMNS))})"
+    started = time.perf_counter()
+
+    try:
+        conn.execute('BEGIN')
+        if mode == 'reset':
+            # (triggers clear the tag, statistics and search tables along with it)
+            conn.execute("DELETE FROM jobs")
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        with bulk_insert_mode(conn) as after_id:
+            next_id = conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM jobs").fetchone()[0]
+            for chunk in iter_job_chunks(rows, start, end, rng, chunk_size):
+                if allow_duplicates:
+                    # Plain inserts get consecutive ids, which the key suffix mirrors
+                    conn.executemany(insert_sql, with_natural_keys(chunk, key_prefixes, next_id))
+                    next_id += len(chunk)
+                else:
+                    # (the rare random duplicate of title + company + date collapses into one job)
+                    upsert_batch(conn, with_natural_keys(chunk, key_prefixes), counts, after_id)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        conn.close()
+        raise
+
+    created = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
     conn.close()
+    elapsed = time.perf_counter() - started
 
-    print(f"✅ SUCCESS: Created {len(all_entries)} jobs in '{DB_NAME}'.")
+    print(f"✅ SUCCESS: {created} jobs in '{db_path}' ({rows} generated between {start} and {end}).")
+    print(f"⏱️ {elapsed:.2f}s ({rows / elapsed:,.0f} rows/sec)")
     print(f"✅ LOGIC: Titles selected from values, categories used as tags.")
     print(f"✅ ENCODING: UTF-8 (Support for Swedish characters confirmed).")
+    return created
 
 
 if __name__ == "__main__":
-    generate_mock_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fill a job tracker database with randomized applications.")
+    parser.add_argument('--rows', type=int, default=TARGET_TOTAL_JOBS, help="number of applications to generate")
+    parser.add_argument('--start', default=START_DATE, help="first application date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=END_DATE, help="last application date (YYYY-MM-DD)")
+    parser.add_argument('--seed', type=int, help="random seed for reproducible data")
+    parser.add_argument('--db', default=DB_NAME, help="database file (created if missing)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--reset', dest='mode', action='store_const', const='reset',
+                      help="delete the existing jobs first")
+    mode.add_argument('--append', dest='mode', action='store_const', const='append',
+                      help="add to the existing jobs")
+    parser.add_argument('--allow-duplicates', action='store_true',
+                        help="keep jobs with the same title, company and date as separate rows "
+                             "(needed to reach large row counts)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.set_defaults(mode='new')
+    args = parser.parse_args()
+
+    created = generate_mock_data(args.db, args.rows, args.start, args.end, args.seed, args.mode,
+                                 args.allow_duplicates, args.chunk_size)
+    sys.exit(0 if created is not None else 1)
@@ -0,0 +1,195 @@
+import io
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import job_snapshot
+from job_export import load_partitions, partition_rows
+
+# --- PDF activity reports ---
+# Reports are rendered by a small worker pool so a multi-year range never blocks
+# a Flask worker. Finished PDFs are cached by (start, end, data version), so a
+# repeated download is instant until the underlying rows change.
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+REPORT_WORKERS = 2
+CACHE_SIZE = 16          # rendered PDFs kept in memory
+FINISHED_JOBS_KEPT = 64  # finished jobs remembered for status polling
+
+MONTH_NAMES = {
+    1: "January", 2: "February", 3: "March", 4: "April", 5: "May", 6: "June",
+    7: "July", 8: "August", 9: "September", 10: "October", 11: "November", 12: "December"
+}
+
+def new_document():
+    """An empty FPDF document with the DejaVu fonts registered.
+
+    Fonts are registered per document: fpdf subsets the parsed font in place when
+    writing, so a parsed font cannot be shared between reports.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_font("DejaVu", "", os.path.join(FONT_DIR, "DejaVuSansCondensed.ttf"))
+    pdf.add_font("DejaVu", "B", os.path.join(FONT_DIR, "DejaVuSansCondensed-Bold.ttf"))
+    return pdf
+
+
+def build_report_pdf(data):
+    """Renders the activity report for `data` to PDF bytes.
+
+    Rows need date_of_apply, job_tittle, company and the year and month of the
+    application date as integers (see load_report_rows).
+    """
+    pdf = new_document()
+    pdf.add_page()
+    pdf.set_font("DejaVu", "", 12)
+
+    # Group applications by year → month
+    applications_by_year_month = {}
+
+    for app in data:
+        year, month = app['year'], app['month']
+
+        applications_by_year_month.setdefault(year, {})
+        applications_by_year_month[year].setdefault(month, [])
+        applications_by_year_month[year][month].append(app)
+
+    # --- Build PDF content ---
+    for year in sorted(applications_by_year_month.keys()):
+        for month in sorted(applications_by_year_month[year].keys()):
+            apps = applications_by_year_month[year][month]
+            month_name = MONTH_NAMES[month]
+            total = len(apps)
+
+            # Header
+            pdf.set_font("DejaVu", "B", 14)
+            header = f"===== {month_name} {year} - Total Applications: {total} ====="
+            pdf.cell(0, 10, header, new_x="LMARGIN", new_y="NEXT")
+
+            # Table header...
+            pdf.set_font("DejaVu", "B", 10)
+            pdf.set_fill_color(220, 220, 220)
+            pdf.cell(40, 8, "Date", border=1, fill=True)
+            pdf.cell(80, 8, "Job Title", border=1, fill=True)
+            pdf.cell(70, 8, "Company", border=1, fill=True, new_x="LMARGIN", new_y="NEXT")
+
+            # Table rows
+            pdf.set_font('', '', 10)
+            for app in apps:
+                pdf.cell(40, 8, app['date_of_apply'], border=1)
+                pdf.cell(80, 8, app['job_tittle'], border=1)
+                pdf.cell(70, 8, app['company'], border=1, new_x="LMARGIN", new_y="NEXT")
+
+            pdf.ln(5)  # spacing after each month
+
+    buf = io.BytesIO()
+    pdf.output(buf)
+    return buf.getvalue()
+
+
+def load_report_rows(conn, db_path, start, end):
+    """The data version and the rows of the range, read from the shared job snapshot.
+
+    Rows whose date_of_apply is not a valid date are left out of the report.
+    """
+    snapshot = job_snapshot.get_snapshot(conn, db_path)
+    version, partitions = load_partitions(conn, start, end)
+    rows = partition_rows(snapshot, partitions, version, start, end)
+    years, months = snapshot.date_parts(rows)
+    valid = years > 0
+    rows, years, months = rows[valid], years[valid], months[valid]
+    data = [{'date_of_apply': applied, 'job_tittle': title, 'company': company, 'year': year, 'month': month}
+            for applied, title, company, year, month in zip(snapshot.column('date_of_apply', rows),
+                                                             snapshot.column('job_tittle', rows),
+                                                             snapshot.column('company', rows),
+                                                             years.tolist(), months.tolist())]
+    return snapshot.version, data
+
+
+class ReportJob:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.state = 'pending'  # pending -> running -> done | failed
+        self.pdf = None
+        self.error = None
+        self.render_seconds = None  # time spent in FPDF
+        self.done = threading.Event()
+
+
+class ReportManager:
+    """Renders reports on a thread pool and caches the PDFs by (start, end, data version)."""
+
+    def __init__(self, workers=REPORT_WORKERS, cache_size=CACHE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report')
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.on_rendered = None  # optional callback(seconds) after every FPDF render (see instrumentation.py)
+
+    def submit(self, db_path, start, end, version):
+        """Returns a ReportJob for the range; finished at once if the PDF is cached."""
+        key = (start, end, version)
+        with self._lock:
+            # Same range already rendering for this data version: share it
+            for job in self._jobs.values():
+                if job.key == key and job.state in ('pending', 'running'):
+                    return job
+            job = ReportJob(key)
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._finish(job, cached)
+                return job
+        self._executor.submit(self._render, job, db_path, start, end)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _render(self, job, db_path, start, end):
+        job.state = 'running'
+        try:
+            conn = db.connect(db_path)
+            try:
+                version, data = load_report_rows(conn, db_path, start, end)
+            finally:
+                conn.close()
+            started = time.perf_counter()
+            pdf = build_report_pdf(data)
+            job.render_seconds = time.perf_counter() - started
+        except Exception as e:
+            job.error = str(e)
+            job.state = 'failed'
+            job.done.set()
+            return
+
+        if self.on_rendered is not None:
+            self.on_rendered(job.render_seconds)
+        with self._lock:
+            # Stored under the version actually read, which may be newer than requested
+            self._cache[(start, end, version)] = pdf
+            self._cache.move_to_end((start, end, version))
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            self._finish(job, pdf)
+
+    @staticmethod
+    def _finish(job, pdf):
+        job.pdf = pdf
+        job.state = 'done'
+        job.done.set()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job_id]
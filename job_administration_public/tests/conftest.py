@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Make the app modules importable when running `python -m pytest` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """An empty, fully migrated database."""
+    path = str(tmp_path / 'jobs.db')
+    conn = db.connect(path)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = db.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def add_job(conn, title, date_of_apply, status='Waiting for response', company='Acme', city='Malmö', tags='python'):
+    """Inserts one job through the normal (trigger-maintained) path and returns its id."""
+    with conn:
+        cursor = conn.execute(
+            'INSERT INTO jobs (job_tittle, company, city, date_of_apply, status, last_status_update, tags) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)', (title, company, city, date_of_apply, status, date_of_apply, tags))
+    return cursor.lastrowid
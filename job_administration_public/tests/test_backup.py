@@ -0,0 +1,54 @@
+import os
+import sqlite3
+
+import pytest
+
+import db
+from backup import SNAPSHOT_KEEP, list_snapshots, restore, snapshot
+
+from conftest import add_job
+
+
+def job_count(db_path):
+    conn = db.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_snapshots_taken_in_the_same_second_are_kept_apart(db_path, tmp_path):
+    backup_dir = str(tmp_path / 'backups')
+    paths = [snapshot(db_path, backup_dir) for _ in range(3)]
+
+    assert len(set(paths)) == 3
+    assert sorted(list_snapshots(backup_dir)) == sorted(paths)
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_restore_the_oldest_snapshot_at_the_keep_limit(conn, db_path, tmp_path, compress):
+    backup_dir = str(tmp_path / 'backups')
+    for i in range(20):
+        add_job(conn, f'Job {i}', '2025-01-01')
+    for _ in range(SNAPSHOT_KEEP):
+        snapshot(db_path, backup_dir, compress=compress)
+    with conn:
+        conn.execute('DELETE FROM jobs')
+    oldest = list_snapshots(backup_dir)[-1]
+
+    safety_copy = restore(oldest, db_path, backup_dir)
+
+    assert job_count(db_path) == 20
+    # The restored snapshot was not pruned to make room for the safety copy
+    assert os.path.exists(oldest) and safety_copy in list_snapshots(backup_dir)
+    assert len(list_snapshots(backup_dir)) == SNAPSHOT_KEEP + 1
+
+
+def test_restore_of_a_missing_file_leaves_the_database_alone(conn, db_path, tmp_path):
+    add_job(conn, 'Developer', '2025-01-01')
+
+    with pytest.raises(sqlite3.OperationalError):
+        restore(str(tmp_path / 'missing.db'), db_path, str(tmp_path / 'backups'))
+
+    assert job_count(db_path) == 1
+    assert not os.path.exists(tmp_path / 'missing.db')
@@ -0,0 +1,26 @@
+import logging
+import re
+import sqlite3
+
+from instrumentation import TimedConnection
+
+from conftest import add_job
+
+
+def test_sql_log_has_each_statement_once_with_its_duration(db_path, monkeypatch, caplog):
+    monkeypatch.setattr(TimedConnection, 'trace_sql', True)
+    caplog.set_level(logging.DEBUG, logger='job_tracker.sql')
+    conn = sqlite3.connect(db_path, factory=TimedConnection)
+
+    add_job(conn, 'Developer', '2025-01-01')
+    assert conn.execute('SELECT job_tittle FROM jobs').fetchall() == [('Developer',)]
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone() == (1,)  # dropped before its rows run out
+    conn.close()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 3
+    assert all(re.match(r'\d+\.\d\d ms  ', message) for message in messages)
+    assert messages[0].endswith('  INSERT INTO jobs (job_tittle, company, city, date_of_apply, status, '
+                                'last_status_update, tags) VALUES (?, ?, ?, ?, ?, ?, ?)')
+    assert messages[1].endswith('  SELECT job_tittle FROM jobs')
+    assert messages[2].endswith('  SELECT COUNT(*) FROM jobs')
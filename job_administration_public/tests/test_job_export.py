@@ -0,0 +1,92 @@
+import json
+
+import job_snapshot
+from job_export import EXPORT_COLUMNS, FragmentCache, iter_export, iter_json_array, iter_ndjson, load_partitions
+from job_stats import check_stats
+
+from conftest import add_job
+
+RANGE = ('2025-01-01', '2025-03-31')
+
+
+def sql_export(conn, ndjson=False):
+    """The export of RANGE built straight from the table."""
+    jobs = [dict(row) for row in conn.execute(
+        f"SELECT {', '.join(EXPORT_COLUMNS)} FROM jobs WHERE date_of_apply BETWEEN ? AND ? ORDER BY date_of_apply, id",
+        RANGE)]
+    return ''.join(iter_ndjson(jobs) if ndjson else iter_json_array(jobs))
+
+
+def partitioned_export(conn, db_path, cache, ndjson=False):
+    snapshot = job_snapshot.get_snapshot(conn, db_path)
+    version, partitions = load_partitions(conn, *RANGE)
+    return ''.join(iter_export(snapshot, partitions, version, *RANGE, ndjson=ndjson, cache=cache))
+
+
+def month_rows(conn):
+    return {row[0]: tuple(row[1:])
+            for row in conn.execute('SELECT month, count, min_id, max_id, revision FROM stats_month')}
+
+
+def test_partition_metadata_follows_writes(conn):
+    jan = add_job(conn, 'Jan', '2025-01-10')
+    feb = [add_job(conn, f'Feb {i}', '2025-02-10') for i in range(3)]
+    assert month_rows(conn) == {'2025-01': (1, jan, jan, 1), '2025-02': (3, feb[0], feb[2], 3)}
+
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'Rejected' WHERE id = ?", (feb[1],))
+    feb_month = month_rows(conn)['2025-02']
+    assert feb_month[:3] == (3, feb[0], feb[2]) and feb_month[3] > 3
+
+    # Moving a job to another month counts it there, widening that month's id range
+    with conn:
+        conn.execute("UPDATE jobs SET date_of_apply = '2025-01-20' WHERE id = ?", (feb[2],))
+    rows = month_rows(conn)
+    assert rows['2025-01'][:3] == (2, jan, feb[2]) and rows['2025-02'][0] == 2
+    assert rows['2025-01'][3] > 1 and rows['2025-02'][3] > feb_month[3]
+
+    with conn:
+        conn.execute('DELETE FROM jobs WHERE id = ?', (jan,))
+        conn.execute('DELETE FROM jobs WHERE id IN (?, ?)', feb[:2])
+    rows = month_rows(conn)
+    assert rows['2025-01'][0] == 1 and rows['2025-02'][:3] == (0, None, None)
+    assert check_stats(conn) == []
+
+
+def test_partitioned_export_matches_sql_after_writes(conn, db_path):
+    ids = [add_job(conn, f'Job {i}', f'2025-0{1 + i % 3}-{10 + i:02d}', city='Göteborg' if i % 2 else None)
+           for i in range(12)]
+    add_job(conn, 'Outside', '2024-12-31')
+    cache = FragmentCache()
+    for ndjson in (False, True):
+        assert partitioned_export(conn, db_path, cache, ndjson) == sql_export(conn, ndjson)
+    assert cache.misses == 6  # three months, twice: the partitioned path was taken
+
+    add_job(conn, 'New', '2025-02-28', tags='rust, "quoted"')
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'Rejected', city = 'Lund' WHERE id = ?", (ids[3],))
+        conn.execute("UPDATE jobs SET date_of_apply = '2025-03-01' WHERE id = ?", (ids[4],))
+        conn.execute("UPDATE jobs SET date_of_apply = '2024-11-01' WHERE id = ?", (ids[6],))
+        conn.execute('DELETE FROM jobs WHERE id IN (?, ?)', (ids[5], ids[8]))
+    for ndjson in (False, True):
+        assert partitioned_export(conn, db_path, cache, ndjson) == sql_export(conn, ndjson)
+    assert len(json.loads(partitioned_export(conn, db_path, cache))) == 10
+
+    with conn:
+        conn.execute('DELETE FROM jobs WHERE date_of_apply BETWEEN ? AND ?', RANGE)
+    assert partitioned_export(conn, db_path, cache) == sql_export(conn) == '[]'
+
+
+def test_status_change_reencodes_only_its_month(conn, db_path):
+    ids = {month: [add_job(conn, f'Job {month}-{i}', f'2025-{month}-1{i}') for i in range(3)]
+           for month in ('01', '02', '03')}
+    cache = FragmentCache()
+    partitioned_export(conn, db_path, cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+    partitioned_export(conn, db_path, cache)
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'Interview' WHERE id = ?", (ids['02'][1],))
+    assert partitioned_export(conn, db_path, cache) == sql_export(conn)
+    assert (cache.hits, cache.misses) == (5, 4)
@@ -0,0 +1,57 @@
+import job_snapshot
+from job_export import EXPORT_COLUMNS, iter_job_rows
+
+from conftest import add_job
+
+SQL_RANGE = (f"SELECT {', '.join(EXPORT_COLUMNS)} FROM jobs WHERE date_of_apply BETWEEN ? AND ? "
+             f"ORDER BY date_of_apply, id")
+
+
+def sql_rows(conn, start='0000', end='9999'):
+    return [dict(row) for row in conn.execute(SQL_RANGE, (start, end))]
+
+
+def snapshot_rows(snapshot, start='0000', end='9999'):
+    return list(iter_job_rows(snapshot, start, end))
+
+
+def test_separator_and_null_marker_in_values(conn, db_path):
+    add_job(conn, 'A\x1fB', '2025-01-01')
+    add_job(conn, 'C', '2025-01-02', city=None)
+    add_job(conn, '\x1e', '2025-01-03')
+
+    snapshot = job_snapshot.load_snapshot(conn)
+
+    assert snapshot_rows(snapshot) == sql_rows(conn)
+    assert [job['job_tittle'] for job in snapshot_rows(snapshot)] == ['A\x1fB', 'C', '\x1e']
+
+
+def test_refresh_follows_inserts_updates_and_deletes(conn, db_path):
+    ids = [add_job(conn, f'Job {i}', f'2025-0{1 + i % 3}-1{i % 10}') for i in range(12)]
+    snapshot = job_snapshot.get_snapshot(conn, db_path)
+    assert snapshot_rows(snapshot) == sql_rows(conn)
+
+    add_job(conn, 'New', '2024-12-24')
+    with conn:
+        conn.execute("UPDATE jobs SET status = 'Rejected', city = 'Lund' WHERE id = ?", (ids[3],))
+        conn.execute("UPDATE jobs SET date_of_apply = '2025-03-01' WHERE id = ?", (ids[4],))
+        conn.execute('DELETE FROM jobs WHERE id = ?', (ids[5],))
+    refreshed = job_snapshot.get_snapshot(conn, db_path)
+
+    assert refreshed is not snapshot
+    assert refreshed.generation == snapshot.generation  # a delta refresh, not a reload
+    assert snapshot_rows(refreshed) == sql_rows(conn)
+    assert snapshot_rows(refreshed, '2025-02-01', '2025-02-28') == sql_rows(conn, '2025-02-01', '2025-02-28')
+
+
+def test_older_snapshot_still_works_after_the_vocabulary_grew(conn, db_path):
+    add_job(conn, 'First', '2025-01-01')
+    old = job_snapshot.get_snapshot(conn, db_path)
+    expected = snapshot_rows(old)
+
+    add_job(conn, 'Second', '2025-06-30')  # a date the old snapshot has never seen
+    new = job_snapshot.get_snapshot(conn, db_path)
+
+    assert snapshot_rows(old) == expected
+    assert old.values('date_of_apply').tolist() == ['2025-01-01']
+    assert snapshot_rows(new) == sql_rows(conn)
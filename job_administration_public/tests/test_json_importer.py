@@ -0,0 +1,109 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from job_stats import check_stats
+from json_importer import import_jobs_from_json, ingest_directory
+
+
+def write_json(path, jobs):
+    path.write_text(json.dumps(jobs), encoding='utf-8')
+    return str(path)
+
+
+def repeated_jobs(count=30, distinct=10):
+    """`count` records over `distinct` natural keys, each repeat with a newer status date."""
+    return [{'job_tittle': f'Developer {i % distinct}', 'company': 'Acme', 'city': 'Malmö',
+             'date_of_apply': '2025-01-01', 'last_status_update': f'2025-02-{i + 1:02d}',
+             'status': f'Status {i}', 'tags': f'python, round{i}'} for i in range(count)]
+
+
+@pytest.mark.parametrize('batch_size', [1, 7, 5000])
+def test_duplicate_keys_across_batches_keep_indexes_intact(tmp_path, batch_size):
+    db_path = str(tmp_path / 'jobs.db')
+    summary = import_jobs_from_json(write_json(tmp_path / 'jobs.json', repeated_jobs()), db_path,
+                                    batch_size=batch_size)
+
+    assert summary is not None
+    assert summary['inserted'] == 10
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES('integrity-check')")
+    assert check_stats(conn) == []
+    # The newest record of each key wins, in the table and in the search index
+    assert conn.execute("SELECT status FROM jobs WHERE job_tittle = 'Developer 3'").fetchone() == ('Status 23',)
+    assert conn.execute("SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH 'round23'").fetchone() == (1,)
+    assert conn.execute("SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH 'round3'").fetchone() == (0,)
+    assert conn.execute("SELECT COUNT(*) FROM job_tags WHERE tag = 'python'").fetchone() == (10,)
+    conn.close()
+
+
+def test_reimport_updates_existing_jobs(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    jobs = repeated_jobs()
+    import_jobs_from_json(write_json(tmp_path / 'first.json', jobs[:10]), db_path, batch_size=7)
+    summary = import_jobs_from_json(write_json(tmp_path / 'second.json', jobs), db_path, batch_size=7)
+
+    assert summary['inserted'] == 0
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT status FROM jobs WHERE job_tittle = 'Developer 3'").fetchone() == ('Status 23',)
+    conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES('integrity-check')")
+    assert check_stats(conn) == []
+    conn.close()
+
+
+def test_records_with_non_text_fields_are_rejected_one_by_one(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    jobs = [{'job_tittle': 'Developer', 'company': 'Acme', 'tags': ['python', 'sql']},
+            {'job_tittle': {'sv': 'Utvecklare'}, 'company': 'Acme'},
+            {'job_tittle': 'Tester', 'company': 'Acme', 'tags': [1, 2]},
+            {'job_tittle': 'Analyst', 'company': 'Acme', 'city': None}]
+    path = write_json(tmp_path / 'jobs.json', jobs)
+    summary = import_jobs_from_json(path, db_path)
+
+    assert (summary['inserted'], summary['rejected']) == (2, 2)
+    rejects = [json.loads(line) for line in open(path + '.rejected.ndjson', encoding='utf-8')]
+    assert [reject['record'] for reject in rejects] == [2, 3]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT tags FROM jobs WHERE job_tittle = 'Developer'").fetchone() == ('python, sql',)
+    conn.close()
+
+
+def test_dry_run_writes_no_reject_log(tmp_path):
+    path = write_json(tmp_path / 'jobs.json', [{'job_tittle': 'Developer'}, {'job_tittle': 'Tester', 'company': 'Acme'}])
+    summary = import_jobs_from_json(path, str(tmp_path / 'jobs.db'), dry_run=True)
+
+    assert (summary['inserted'], summary['rejected']) == (1, 1)
+    assert not os.path.exists(path + '.rejected.ndjson')
+
+
+def test_a_file_that_fails_to_write_does_not_stop_the_others(tmp_path, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TRIGGER reject_bad BEFORE INSERT ON jobs WHEN NEW.status = 'Bad' "
+                 "BEGIN SELECT RAISE(ABORT, 'bad status'); END")
+    conn.commit()
+    conn.close()
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    jobs = repeated_jobs(distinct=30)
+    write_json(inbox / 'a.json', jobs[:10])
+    write_json(inbox / 'b.json', jobs[10:19] + [{'job_tittle': 'Broken', 'company': 'Acme', 'status': 'Bad'}])
+    write_json(inbox / 'c.json', jobs[20:28])
+
+    totals = ingest_directory(str(inbox), db_path)
+
+    assert (totals['files'], totals['failed'], totals['inserted']) == (2, 1, 18)
+    states = {os.path.basename(result['path']): result['state'] for result in totals['results']}
+    assert states == {'a.json': 'ingested', 'b.json': 'failed', 'c.json': 'ingested'}
+    conn = sqlite3.connect(db_path)
+    # Nothing of the failed file was kept, and the indexes are intact
+    assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone() == (18,)
+    assert check_stats(conn) == []
+    conn.close()
+
+    # Watching: the failed file is tried once, then left alone until it changes
+    stable = {}
+    ingest_directory(str(inbox), db_path, stable=stable)
+    assert ingest_directory(str(inbox), db_path, stable=stable)['failed'] == 1
+    assert ingest_directory(str(inbox), db_path, stable=stable)['results'] == []
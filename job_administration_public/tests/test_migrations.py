@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+import db
+import migrations
+
+from conftest import add_job
+from job_stats import check_stats
+from migrations import BULK_SUSPENDED_TRIGGERS, bulk_insert_mode, get_schema_version, migrate, suspended_triggers
+
+
+def trigger_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def test_bulk_insert_mode_restores_triggers_after_a_failed_block(conn):
+    before = trigger_names(conn)
+    conn.execute('BEGIN')
+    with pytest.raises(ZeroDivisionError):
+        with bulk_insert_mode(conn):
+            conn.execute("INSERT INTO jobs (job_tittle, company, date_of_apply) VALUES ('Lost', 'Acme', '2025-01-01')")
+            1 / 0
+    # Recreated before the rollback ...
+    assert trigger_names(conn) == before
+    conn.rollback()
+    # ... and still there after it, so the next insert maintains the derived tables again
+    assert trigger_names(conn) == before
+    add_job(conn, 'Developer', '2025-01-02')
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 1
+    assert check_stats(conn) == []
+
+
+def test_suspended_triggers_without_a_rollback(conn):
+    before = trigger_names(conn)
+    conn.execute('BEGIN')
+    with pytest.raises(ValueError):
+        with suspended_triggers(conn, BULK_SUSPENDED_TRIGGERS):
+            assert not trigger_names(conn) & set(BULK_SUSPENDED_TRIGGERS)
+            raise ValueError
+    conn.commit()
+    assert trigger_names(conn) == before
+
+
+def test_suspended_triggers_needs_a_transaction(conn):
+    with pytest.raises(AssertionError):
+        with suspended_triggers(conn, BULK_SUSPENDED_TRIGGERS):
+            pass
+    assert set(BULK_SUSPENDED_TRIGGERS) <= trigger_names(conn)
+
+
+def test_a_failing_migration_leaves_nothing_behind(conn, monkeypatch):
+    def half_done(conn):
+        db.execute_script(conn, '''
+            CREATE TABLE half (id INTEGER PRIMARY KEY);
+            CREATE TRIGGER half_insert AFTER INSERT ON jobs BEGIN INSERT INTO half (id) VALUES (NEW.id); END;
+        ''')
+        conn.execute('ALTER TABLE jobs ADD COLUMN half TEXT')
+        conn.execute('SELECT no_such_function()')
+
+    version = get_schema_version(conn)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [*migrations.MIGRATIONS, (version + 1, 'half done', half_done)])
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+
+    assert get_schema_version(conn) == version
+    assert 'half_insert' not in trigger_names(conn)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'half'").fetchone()[0] == 0
+    assert 'half' not in [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
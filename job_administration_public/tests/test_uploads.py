@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from uploads import PID_FILE_GRACE_SECONDS, UploadInProgress, claim_pid_file, read_pid_file
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_only_one_of_simultaneous_claims_wins(tmp_path):
+    path = str(tmp_path / 'upload.pid')
+
+    def claim(_):
+        try:
+            claim_pid_file(path)
+            return True
+        except UploadInProgress:
+            return False
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(claim, range(16)))
+
+    assert results.count(True) == 1
+    assert read_pid_file(path) == os.getpid()
+
+
+def test_claim_breaks_only_a_dead_upload(tmp_path):
+    path = tmp_path / 'upload.pid'
+    path.write_text(str(os.getpid()))
+    with pytest.raises(UploadInProgress) as running:
+        claim_pid_file(str(path))
+    assert running.value.pid == os.getpid()
+
+    path.write_text(str(dead_pid()))
+    claim_pid_file(str(path))
+    assert read_pid_file(str(path)) == os.getpid()
+
+
+def test_an_empty_pid_file_is_only_stale_after_the_grace_period(tmp_path):
+    path = tmp_path / 'upload.pid'
+    path.write_text('')
+    with pytest.raises(UploadInProgress):
+        claim_pid_file(str(path))
+
+    past = time.time() - PID_FILE_GRACE_SECONDS - 1
+    os.utime(path, (past, past))
+    claim_pid_file(str(path))
+    assert read_pid_file(str(path)) == os.getpid()
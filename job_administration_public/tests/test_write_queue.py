@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from conftest import add_job
+from write_queue import WriteQueue
+
+
+def test_one_failing_write_does_not_fail_the_rest_of_its_batch(conn, db_path):
+    ids = [add_job(conn, f'Job {i}', '2025-01-01') for i in range(3)]
+    with conn:
+        conn.execute("CREATE TRIGGER reject_bad BEFORE UPDATE ON jobs WHEN NEW.status = 'Bad' "
+                     "BEGIN SELECT RAISE(ABORT, 'bad status'); END")
+    queue = WriteQueue(interval=0.2)  # long enough for all three writes to share one batch
+
+    good = queue.update_status(db_path, [ids[0]], 'Rejected', '2025-02-01')
+    bad = queue.update_status(db_path, [ids[1]], 'Bad', '2025-02-01')
+    deleted = queue.delete(db_path, [ids[2]])
+
+    assert queue.wait(good)
+    with pytest.raises(sqlite3.IntegrityError):
+        queue.wait(bad)
+    assert queue.wait(deleted)
+    rows = dict(tuple(row) for row in conn.execute('SELECT id, status FROM jobs'))
+    assert rows == {ids[0]: 'Rejected', ids[1]: 'Waiting for response'}
+
+
+def test_last_status_wins_and_delete_wins_within_a_batch(conn, db_path):
+    ids = [add_job(conn, f'Job {i}', '2025-01-01') for i in range(2)]
+    queue = WriteQueue(interval=0.2)
+
+    queue.update_status(db_path, ids, 'Interview 1 Scheduled', '2025-02-01')
+    queue.update_status(db_path, [ids[0]], 'Rejected', '2025-02-02')
+    queue.delete(db_path, [ids[1]])
+    assert queue.flush() == (True, 3)
+
+    assert [tuple(row) for row in conn.execute('SELECT id, status FROM jobs')] == [(ids[0], 'Rejected')]
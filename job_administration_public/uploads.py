@@ -0,0 +1,233 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# --- AF upload supervision ---
+# The app starts af_uploader.py as a child process and keeps track of it: the
+# jobs are handed over in a temp file (no argv length limit), the child reports
+# progress as JSON lines on its stdout pipe, and only one upload runs at a time.
+# A PID file makes the guard hold across app restarts and worker processes as
+# well, and a status file lets any worker answer the progress page. The PID file
+# is created exclusively (O_EXCL), so of two workers starting an upload at the
+# same moment only one gets it; it first holds the worker's PID, then the child's.
+
+UPLOADER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'af_uploader.py')
+PID_FILE = os.path.join(tempfile.gettempdir(), 'job_tracker_af_upload.pid')
+# The supervising process mirrors the upload state here, so every worker process can report it
+STATUS_FILE = os.path.join(tempfile.gettempdir(), 'job_tracker_af_upload.json')
+PROGRESS_PREFIX = 'PROGRESS '  # af_uploader.py prefixes machine-readable progress lines with this
+LOG_LINES_KEPT = 50
+PID_FILE_GRACE_SECONDS = 10  # an empty PID file younger than this is still being written by its creator
+
+
+class UploadInProgress(Exception):
+    """Raised when an upload is requested while another one is still running."""
+
+    def __init__(self, pid):
+        super().__init__(f"An AF upload is already running (PID {pid})." if pid is not None
+                         else "An AF upload is already running.")
+        self.pid = pid
+
+
+def pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows, so ask the kernel instead
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, but belongs to another user
+    except OSError:
+        return False
+    return True
+
+
+def read_pid_file(path=PID_FILE):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def claim_pid_file(path=PID_FILE):
+    """Creates the PID file with this process's PID, atomically. Raises UploadInProgress if another upload holds it.
+
+    A PID file whose process is gone (a crashed upload or worker) is removed and
+    the exclusive create retried once.
+    """
+    for attempt in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            other_pid = read_pid_file(path)
+            if other_pid is None:
+                try:
+                    fresh = time.time() - os.path.getmtime(path) < PID_FILE_GRACE_SECONDS
+                except OSError:
+                    fresh = False  # removed in the meantime
+                if fresh:
+                    raise UploadInProgress(None)
+            elif pid_alive(other_pid):
+                raise UploadInProgress(other_pid)
+            if attempt:
+                raise UploadInProgress(other_pid)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return
+
+
+def write_pid_file(pid, path=PID_FILE):
+    """Replaces the content of a claimed PID file in one step, so readers never see it empty."""
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'w') as f:
+        f.write(str(pid))
+    os.replace(temp, path)
+
+
+class Upload:
+    def __init__(self, process, jobs_file, total):
+        self.process = process
+        self.pid = process.pid
+        self.jobs_file = jobs_file
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.state = 'starting'  # starting -> waiting_for_login -> uploading -> done | failed
+        self.total = total
+        self.todo = None
+        self.skipped = 0
+        self.uploaded = 0
+        self.failed = 0
+        self.current = None
+        self.returncode = None
+        self.log = deque(maxlen=LOG_LINES_KEPT)
+
+    def to_dict(self):
+        return {
+            'pid': self.pid, 'state': self.state, 'started_at': self.started_at, 'total': self.total,
+            'todo': self.todo, 'skipped': self.skipped, 'uploaded': self.uploaded, 'failed': self.failed,
+            'current': self.current, 'returncode': self.returncode, 'log': list(self.log),
+        }
+
+    def apply(self, event):
+        """Updates the counters from one progress event of af_uploader.py."""
+        kind = event.get('event')
+        if kind == 'login':
+            self.state = 'waiting_for_login'
+        elif kind == 'start':
+            self.state = 'uploading'
+            self.todo, self.skipped = event['todo'], event['skipped']
+        elif kind == 'job_started':
+            self.current = event.get('company')
+        elif kind == 'job_done':
+            self.uploaded, self.failed = event['uploaded'], event['failed']
+            self.current = None
+
+
+class UploadManager:
+    """Starts af_uploader.py for a list of jobs and supervises the single running upload."""
+
+    def __init__(self, pid_file=PID_FILE, status_file=STATUS_FILE):
+        self.pid_file = pid_file
+        self.status_file = status_file
+        self.current = None
+        self._lock = threading.Lock()
+
+    def start(self, db_path, jobs):
+        """Starts an upload of `jobs` (dicts with an id). Raises UploadInProgress if one is running."""
+        with self._lock:
+            if self.current is not None and self.current.returncode is None:
+                raise UploadInProgress(self.current.pid)
+            claim_pid_file(self.pid_file)
+            try:
+                fd, jobs_file = tempfile.mkstemp(prefix='af_upload_', suffix='.json')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(jobs, f, ensure_ascii=False)
+
+                process = subprocess.Popen(
+                    [sys.executable, '-u', UPLOADER_SCRIPT, '--jobs-file', jobs_file, '--db', db_path, '--progress'],
+                    cwd=os.path.dirname(UPLOADER_SCRIPT),
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8',
+                    env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},  # the child prints emoji into the pipe
+                )
+            except BaseException:
+                os.remove(self.pid_file)
+                raise
+            write_pid_file(process.pid, self.pid_file)
+
+            upload = self.current = Upload(process, jobs_file, len(jobs))
+            self._write_status(upload)
+        threading.Thread(target=self._supervise, args=(upload,), name=f'af-upload-{upload.pid}', daemon=True).start()
+        return upload
+
+    def status(self):
+        """The state of the current (or last) upload as a dict, or None if none was started.
+
+        Uploads started by another worker process are read from the status file.
+        """
+        with self._lock:
+            if self.current is not None:
+                return self.current.to_dict()
+        try:
+            with open(self.status_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_status(self, upload):
+        """Replaces the status file with the upload's state; call with the lock held."""
+        temp = f"{self.status_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(upload.to_dict(), f, ensure_ascii=False)
+            os.replace(temp, self.status_file)
+        except OSError:
+            pass  # the status page of other workers lags behind; the upload itself is unaffected
+
+    def _supervise(self, upload):
+        for line in upload.process.stdout:
+            line = line.rstrip('\n')
+            if line.startswith(PROGRESS_PREFIX):
+                try:
+                    event = json.loads(line[len(PROGRESS_PREFIX):])
+                except json.JSONDecodeError:
+                    continue
+                with self._lock:
+                    upload.apply(event)
+                    self._write_status(upload)
+            elif line:
+                print(line)
+                with self._lock:
+                    upload.log.append(line)
+                    self._write_status(upload)
+
+        returncode = upload.process.wait()
+        with self._lock:
+            upload.returncode = returncode
+            upload.state = 'done' if returncode == 0 else 'failed'
+            self._write_status(upload)
+        if os.path.exists(upload.jobs_file):
+            os.remove(upload.jobs_file)
+        if read_pid_file(self.pid_file) == upload.pid:
+            os.remove(self.pid_file)
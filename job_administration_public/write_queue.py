@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+
+import db
+
+# --- Batched writes for status updates and deletes ---
+# Routes hand their status updates and deletes to one writer thread instead of
+# each taking SQLite's write lock for a single-statement transaction. The writer
+# waits BATCH_INTERVAL after the first queued write, then applies everything
+# queued by then in one transaction per database: the last status per job wins,
+# and a delete wins over any status update of the same job.
+# If that transaction fails, the writes are retried one by one, so a single bad
+# write only fails its own request.
+#
+# Every write gets a sequence number. The writer acknowledges a sequence number
+# once its transaction has committed, so a route can wait for its own write
+# before redirecting and the dashboard it redirects to already shows the change.
+# Each process (gunicorn worker) has its own writer; SQLite serializes the writers.
+
+BATCH_INTERVAL = 0.02  # seconds to collect writes before committing them together
+WAIT_SECONDS = 5       # how long a route waits for the acknowledgement of its write
+ERRORS_KEPT = 256      # errors of failed writes kept for their waiters
+
+
+class WriteQueue:
+    """A single writer thread that commits queued status updates and deletes in batches."""
+
+    def __init__(self, interval=BATCH_INTERVAL, factory=sqlite3.Connection):
+        self.interval = interval
+        self.factory = factory  # connection class for the writer (see instrumentation.py)
+        self.on_batch = None    # optional callback(writes, seconds) after every committed batch
+        self._pending = []      # (seq, db_path, job_id, status or None for a delete, date)
+        self._queued_seq = 0    # last sequence number handed out
+        self._acked_seq = 0     # every write up to this one is committed (or failed)
+        self._errors = {}       # seq -> exception of a failed batch, until its waiter collects it
+        self._connections = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def update_status(self, db_path, job_ids, status, day):
+        """Queues a status update of `job_ids`; returns the sequence number to wait for."""
+        return self._submit(db_path, [(job_id, status, day) for job_id in job_ids])
+
+    def delete(self, db_path, job_ids):
+        """Queues the deletion of `job_ids`; returns the sequence number to wait for."""
+        return self._submit(db_path, [(job_id, None, None) for job_id in job_ids])
+
+    def wait(self, seq, timeout=WAIT_SECONDS):
+        """Blocks until write `seq` is committed. Returns False on timeout; re-raises the error of a failed batch."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._acked_seq >= seq, timeout):
+                return False
+            error = self._errors.pop(seq, None)
+        if error is not None:
+            raise error
+        return True
+
+    def flush(self, timeout=WAIT_SECONDS):
+        """Waits until every write queued so far is committed; returns (all committed, last committed seq)."""
+        with self._condition:
+            seq = self._queued_seq
+        try:
+            committed = self.wait(seq, timeout)
+        except Exception:
+            committed = True  # failed writes are acknowledged too; their routes report the error
+        return committed, self.acknowledged()
+
+    def acknowledged(self):
+        with self._condition:
+            return self._acked_seq
+
+    def _submit(self, db_path, writes):
+        with self._condition:
+            if not writes:
+                return self._acked_seq
+            self._queued_seq += 1
+            seq = self._queued_seq
+            self._pending.extend((seq, db_path, job_id, status, day) for job_id, status, day in writes)
+            # Started on first use, so a process forked after create_app (gunicorn) starts its own writer
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return seq
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            time.sleep(self.interval)  # let concurrent requests join the batch
+            with self._condition:
+                batch, self._pending = self._pending, []
+
+            errors = {}
+            for db_path in dict.fromkeys(write[1] for write in batch):
+                writes = [write for write in batch if write[1] == db_path]
+                try:
+                    self._commit(db_path, writes)
+                except Exception:
+                    self._close(db_path)
+                    errors.update(self._commit_one_by_one(db_path, writes))
+
+            with self._condition:
+                self._errors.update(errors)
+                while len(self._errors) > ERRORS_KEPT:  # drop errors nobody waited for
+                    del self._errors[min(self._errors)]
+                self._acked_seq = max(write[0] for write in batch)
+                self._condition.notify_all()
+
+    def _commit(self, db_path, writes):
+        """Applies one database's writes in a single transaction."""
+        final = {}  # job_id -> (status, day), or None once deleted
+        for _, _, job_id, status, day in writes:
+            if status is None:
+                final[job_id] = None
+            elif final.get(job_id, ()) is not None:
+                final[job_id] = (status, day)
+        updates = [(*change, job_id) for job_id, change in final.items() if change is not None]
+        deletes = [(job_id,) for job_id, change in final.items() if change is None]
+
+        conn = self._connections.get(db_path)
+        if conn is None:
+            conn = self._connections[db_path] = db.connect(db_path, self.factory)
+        started = time.perf_counter()
+        with conn:
+            conn.executemany('UPDATE jobs SET status = ?, last_status_update = ? WHERE id = ?', updates)
+            conn.executemany('DELETE FROM jobs WHERE id = ?', deletes)
+        if self.on_batch is not None:
+            self.on_batch(len(writes), time.perf_counter() - started)
+
+    def _commit_one_by_one(self, db_path, writes):
+        """Retries a failed batch one queued write (sequence number) at a time, in order.
+
+        Returns {seq: exception} for the writes that fail on their own; the others are committed.
+        """
+        errors = {}
+        for seq in dict.fromkeys(write[0] for write in writes):
+            try:
+                self._commit(db_path, [write for write in writes if write[0] == seq])
+            except Exception as e:  # handed to the waiting route; the writer keeps running
+                errors[seq] = e
+                self._close(db_path)
+        return errors
+
+    def _close(self, db_path):
+        conn = self._connections.pop(db_path, None)
+        if conn is not None:
+            conn.close()
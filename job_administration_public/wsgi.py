@@ -0,0 +1,24 @@
+import os
+
+from app import create_app
+
+# --- Production entry point ---
+# Linux/macOS:  gunicorn -c gunicorn.conf.py wsgi:app
+# Windows:      python wsgi.py   (waitress)
+# Settings come from the environment: JOB_TRACKER_DB (database file), HOST and
+# PORT, WEB_THREADS (waitress threads), plus the app settings read in app.py
+# (BACKUP_INTERVAL_HOURS, INSTRUMENTATION, ...).
+
+HOST = os.environ.get('HOST', '127.0.0.1')
+PORT = int(os.environ.get('PORT', 8000))
+# One process, several threads: SQLite takes one writer at a time anyway, and WAL
+# lets the threads read in parallel while it writes.
+THREADS = int(os.environ.get('WEB_THREADS', 8))
+
+app = create_app(os.environ.get('JOB_TRACKER_DB'))
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    print(f"🚀 Serving {app.config['DATABASE']} on http://{HOST}:{PORT} ({THREADS} threads)")
+    serve(app, host=HOST, port=PORT, threads=THREADS)